@@ -0,0 +1,131 @@
+import ast
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import metrics
+
+ANALYSIS_PARSES = metrics.REGISTRY.register(metrics.Counter(
+    "travelbot_analysis_parses_total", "Query analysis responses by how they were parsed.", ("outcome",)
+))
+
+FIELDS = ("date", "intent", "search_type", "location", "specifics", "query")
+INTENTS = {
+    "set_date", "qa_about_place", "discover_places", "search_places", "add_to_itinerary",
+    "show_itinerary", "finalize", "thanking", "other"
+}
+# Intents from the older prompt and common model drift
+INTENT_ALIASES = {
+    "ask_question": "qa_about_place",
+    "question": "qa_about_place",
+    "show_interest": "discover_places",
+    "search": "discover_places",
+    "date": "set_date",
+    "add": "add_to_itinerary",
+    "thanks": "thanking"
+}
+_NULLS = {"", "null", "none", "n/a"}
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.I)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_LEGACY_FIELD = re.compile(
+    r"\b(INTENT|SEARCH_TYPE|LOCATION|SPECIFICS|QUERY|DATE)\s*:\s*(.*?)\s*(?=\|?\s*\b(?:INTENT|SEARCH_TYPE|LOCATION|SPECIFICS|QUERY|DATE)\s*:|$)",
+    re.S
+)
+_QUESTION = re.compile(r"\?|^\s*(?:what|where|when|how|who|which|tell me|is|are|can|does)\b", re.I)
+
+def _strict(data: Any) -> Optional[Dict[str, Any]]:
+    """The analysis exactly as the prompt asks for it, or None."""
+    if not isinstance(data, dict) or set(data) != set(FIELDS):
+        return None
+    if data["date"] is not None and not isinstance(data["date"], str):
+        return None
+    if any(not isinstance(data[field], str) for field in FIELDS[1:]):
+        return None
+    if data["intent"] not in INTENTS:
+        return None
+    return dict(data)
+
+def _text(value: Any) -> str:
+    if isinstance(value, dict):
+        return ", ".join(f"{k}={_text(v)}" for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return ",".join(_text(v) for v in value)
+    return "" if value is None else str(value).strip()
+
+def _coerce(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill missing fields and map near-miss values onto the expected ones."""
+    data = {str(k).strip().lower(): v for k, v in data.items()}
+    intent = _text(data.get("intent")).lower().replace(" ", "_").strip("[]")
+    intent = INTENT_ALIASES.get(intent, intent)
+    date = _text(data.get("date"))
+    return {
+        "date": None if date.lower() in _NULLS else date,
+        "intent": intent if intent in INTENTS else "other",
+        "search_type": _text(data.get("search_type")) or "any",
+        "location": _text(data.get("location")) or "any",
+        "specifics": _text(data.get("specifics")),
+        "query": _text(data.get("query"))
+    }
+
+def _repair(text: str) -> Optional[Dict[str, Any]]:
+    """Recover a JSON object wrapped in prose or fences, with trailing commas or single quotes."""
+    text = _FENCE.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    body = _TRAILING_COMMA.sub(r"\1", text[start:end + 1])
+    try:
+        data = json.loads(body)
+    except ValueError:
+        try:
+            # Python-style dicts: single quotes, None/True/False spelled the JSON way
+            data = ast.literal_eval(re.sub(r"\bnull\b", "None", body))
+        except (ValueError, SyntaxError):
+            return None
+    return _coerce(data) if isinstance(data, dict) else None
+
+def _legacy(text: str) -> Optional[Dict[str, Any]]:
+    """Read the older ``INTENT: ... | QUERY: ...`` format, field by field."""
+    fields = {name.lower(): value.strip(" |[]") for name, value in _LEGACY_FIELD.findall(text)}
+    if "intent" not in fields:
+        return None
+    return _coerce(fields)
+
+def fallback_analysis(user_input: str) -> Dict[str, Any]:
+    """Best guess when the model's answer can't be read: a question or a search for the raw text."""
+    return {
+        "date": None,
+        "intent": "qa_about_place" if _QUESTION.search(user_input) else "discover_places",
+        "search_type": "any",
+        "location": "any",
+        "specifics": "",
+        "query": user_input.strip()
+    }
+
+def parse_analysis(text: str, user_input: str = "") -> Tuple[Optional[Dict[str, Any]], str]:
+    """Parse a query analysis response into ``(fields, outcome)``.
+
+    Strict JSON is tried first, then a cheap local repair of malformed JSON,
+    then the pipe-delimited format of the older prompt. ``fields`` is None
+    when none of them can read it. An empty or missing query becomes
+    ``user_input``, so handlers never search for or answer an empty question.
+    """
+    outcome, fields = "failed", None
+    try:
+        fields = _strict(json.loads(text))
+    except ValueError:
+        pass
+    if fields is not None:
+        outcome = "strict"
+    else:
+        fields = _repair(text)
+        if fields is not None:
+            outcome = "repaired"
+        else:
+            fields = _legacy(text)
+            if fields is not None:
+                outcome = "legacy"
+    if fields is not None and not fields["query"]:
+        fields["query"] = user_input.strip()
+    ANALYSIS_PARSES.inc(outcome=outcome)
+    return fields, outcome
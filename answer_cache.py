@@ -0,0 +1,155 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+class _Answer:
+    __slots__ = ("vector", "answer", "content_hash", "created")
+
+    def __init__(self, vector: np.ndarray, answer: str, content_hash: str, created: float):
+        self.vector = vector
+        self.answer = answer
+        self.content_hash = content_hash
+        self.created = created
+
+# What a question asks about; E5 scores "hours of El Morro" and "history of El Morro"
+# close enough to pass the threshold, so answers are only shared within one aspect
+ASPECTS = [
+    ("hours", r"hours?|open|clos(?:e|es|ed|ing)|horarios?|abre|cierra"),
+    ("price", r"price|costs?|fees?|tickets?|admission|how much|precios?|cuesta|costo|entrada"),
+    ("history", r"histor\w*|built|founded|constru\w*|fundad\w*"),
+    ("directions", r"get there|directions|parking|how far|where is|llegar|estacionamiento|donde queda"),
+    ("food", r"eat|food|restaurants?|comer|comida|restaurantes?"),
+    ("timing", r"best time|when to|weather|crowd\w*|mejor epoca|mejor época|clima"),
+    ("activities", r"things to do|what to do|activities|tours?|que hacer|qué hacer|actividades")
+]
+_ASPECTS = [(name, re.compile(rf"\b(?:{pattern})\b", re.I)) for name, pattern in ASPECTS]
+
+def question_aspect(question: str) -> str:
+    """The first aspect whose keywords appear in the question, else ``general``."""
+    for name, pattern in _ASPECTS:
+        if pattern.search(question):
+            return name
+    return "general"
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def document_key(doc) -> str:
+    """Stable id for a retrieved document: its vector id, else name, else content hash."""
+    return getattr(doc, "id", None) or doc.metadata.get("name") or content_hash(doc.page_content)
+
+class SemanticAnswerCache:
+    """Grounded answers keyed by (document id, travel season, question aspect, question embedding).
+
+    A lookup hits when a cached question for the same document, season and
+    aspect (see ``question_aspect``) has cosine similarity >= ``threshold``
+    with the new question. Entries expire
+    after ``ttl_seconds`` and are dropped when the document's content changes.
+    Least recently used (document, season, aspect) buckets are evicted first once
+    ``max_entries`` answers are stored.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.92, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[Tuple[str, str, str], List[_Answer]]" = OrderedDict()
+        self._size = 0
+        self._labels: Dict[str, str] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self.invalidations = 0
+
+    async def embed(self, question: str) -> np.ndarray:
+        """Unit-length question vector (reuses the embeddings' query cache)."""
+        vector = np.asarray(await self.embeddings.aembed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, doc, season: str, vector: np.ndarray, aspect: str = "general") -> Optional[str]:
+        """Cached answer for a similar question about ``doc``, or None."""
+        key = (document_key(doc), season, aspect)
+        digest = content_hash(doc.page_content)
+        now = time.monotonic()
+        with self._lock:
+            self._labels[key[0]] = doc.metadata.get("name") or key[0]
+            bucket = self._buckets.get(key)
+            answer = None
+            if bucket:
+                fresh = [
+                    entry for entry in bucket
+                    if entry.content_hash == digest and now - entry.created < self.ttl_seconds
+                ]
+                if len(fresh) != len(bucket):
+                    self.invalidations += len(bucket) - len(fresh)
+                    self._size -= len(bucket) - len(fresh)
+                    self._buckets[key] = bucket = fresh
+                if bucket:
+                    scores = np.stack([entry.vector for entry in bucket]) @ vector
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.threshold:
+                        answer = bucket[best].answer
+                    self._buckets.move_to_end(key)
+                else:
+                    del self._buckets[key]
+
+            counts = self._hits if answer is not None else self._misses
+            counts[key[0]] = counts.get(key[0], 0) + 1
+            return answer
+
+    def store(self, doc, season: str, vector: np.ndarray, answer: str, aspect: str = "general") -> None:
+        """Remember the answer generated for this question about ``doc``."""
+        key = (document_key(doc), season, aspect)
+        entry = _Answer(vector, answer, content_hash(doc.page_content), time.monotonic())
+        with self._lock:
+            self._buckets.setdefault(key, []).append(entry)
+            self._buckets.move_to_end(key)
+            self._size += 1
+            while self._size > self.max_entries:
+                oldest_key, oldest = next(iter(self._buckets.items()))
+                oldest.pop(0)
+                self._size -= 1
+                if not oldest:
+                    del self._buckets[oldest_key]
+
+    def invalidate(self, doc_id: str) -> int:
+        """Drop every cached answer for a document, e.g. after re-ingesting it."""
+        with self._lock:
+            removed = 0
+            for key in [key for key in self._buckets if key[0] == doc_id]:
+                removed += len(self._buckets.pop(key))
+            self._size -= removed
+            self.invalidations += removed
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Overall and per-landmark hit rates."""
+        with self._lock:
+            hits = sum(self._hits.values())
+            lookups = hits + sum(self._misses.values())
+            by_landmark = {}
+            for doc_id in set(self._hits) | set(self._misses):
+                doc_hits = self._hits.get(doc_id, 0)
+                doc_lookups = doc_hits + self._misses.get(doc_id, 0)
+                by_landmark[self._labels.get(doc_id, doc_id)] = {
+                    "hits": doc_hits,
+                    "lookups": doc_lookups,
+                    "hit_rate": doc_hits / doc_lookups
+                }
+            return {
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": hits,
+                "misses": lookups - hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "by_landmark": by_landmark
+            }
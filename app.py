@@ -1,14 +1,29 @@
-from fastapi import FastAPI, WebSocket, Request
+from fastapi import Depends, FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 import asyncio
 import os
 from dotenv import load_dotenv
+from langchain_core.documents import Document
 from langchain_openai import ChatOpenAI
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone
-from bot import SimplePRTravelBot
+from bot import SimplePRTravelBot, build_shared_chains
+from conversation import ContextAssembler, llm_summarizer
+from state import StateManager
 from initialize import initialize_components
 from embeddings import E5Embeddings
+from vectorstore import LocalVectorStore
+from sessions import SessionRegistry
+from answer_cache import SemanticAnswerCache
+from search_filters import SearchFilters
+from place_index import PlaceIndex
+from geo_index import GeoIndex
+from corpus import load_corpus
+from reindex import load_manifest
+from streaming import StreamStats, send_stream
+import metrics
+from startup import Warmup
 
 # Initialize FastAPI app
 app = FastAPI()
@@ -16,32 +31,285 @@ app = FastAPI()
 # Setup Jinja2 templates
 templates = Jinja2Templates(directory="templates")
 
-# Initialize bot components
+# Bot components are built in the background at startup (see build_components)
 load_dotenv()
-pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-index = pc.Index(os.getenv("PINECONE_INDEX_NAME"))
-embeddings = E5Embeddings()
-vectorstore = PineconeVectorStore(index=index, embedding=embeddings, text_key="content")
-retriever = vectorstore.as_retriever()
-llm = ChatOpenAI(temperature=0, model_name="gpt-3.5-turbo")
+embeddings = None
+vectorstore = None
+index = None
+retriever = None
+llm = None
+answer_cache = None
+search_filters = None
+place_index = None
+geo_index = None
 
-# Create bot instance
-bot = None
+# Workers share one embedding server process instead of each loading the model
+EMBED_SERVER_SOCKET = os.getenv("EMBED_SERVER_SOCKET") or None
+EMBED_SERVER_WAIT_SECONDS = float(os.getenv("EMBED_SERVER_WAIT_SECONDS", "300"))
+
+# Session limits
+SESSION_MAX = int(os.getenv("SESSION_MAX", "5000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+SESSION_MEMORY_CAP_MB = float(os.getenv("SESSION_MEMORY_CAP_MB", "0"))
+# Close code sent when a live session is evicted, so the client knows its state is gone
+SESSION_EVICTED_CLOSE_CODE = 4000
+
+# Speculative QA trades extra LLM calls for lower question latency
+QA_SPECULATIVE = os.getenv("QA_SPECULATIVE", "0") == "1"
+
+# Answers to near-identical place questions are served from cache (size 0 disables)
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+
+# Searches push category/town slots down to the vector store as metadata filters
+SEARCH_FILTERS = os.getenv("SEARCH_FILTERS", "1") == "1"
+# A Pinecone index only gets filters when a reindex/loader manifest shows it carries corpus.py metadata
+PINECONE_MANIFEST = os.getenv("PINECONE_MANIFEST") or f"{os.getenv('PINECONE_INDEX_NAME')}.manifest.json"
+
+# Questions naming a known place go straight to its document
+PLACE_INDEX = os.getenv("PLACE_INDEX", "1") == "1"
+
+# "Near X" searches and the nearby-towns fallback use landmark coordinates
+GEO_INDEX = os.getenv("GEO_INDEX", "1") == "1"
+
+# Conversation memory: recent turns kept verbatim, older ones folded into a summary
+CONVERSATION_TURNS = int(os.getenv("CONVERSATION_TURNS", "8"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "400"))
+CONVERSATION_LLM_SUMMARY = os.getenv("CONVERSATION_LLM_SUMMARY", "0") == "1"
+
+# One JSON analysis call per turn extracts the date, intent and slots together
+STRUCTURED_ANALYSIS = os.getenv("STRUCTURED_ANALYSIS", "1") == "1"
+
+# How long a WebSocket waits for warm-up before being turned away
+READY_WAIT_SECONDS = float(os.getenv("READY_WAIT_SECONDS", "300"))
+
+# Per-connection sessions sharing the heavy components
+registry = None
+shared_chains = None
+stream_stats = StreamStats()
+warmup = Warmup()
+
+# LLM and retriever calls are timed through LangChain callbacks
+metrics_callbacks = [metrics.MetricsCallbackHandler()]
+
+async def build_components(warmup: Warmup):
+    """Load the model, connect the index and warm the first-call paths."""
+    global embeddings, vectorstore, index, retriever, llm, answer_cache, search_filters, place_index, geo_index, registry, shared_chains
+
+    with warmup.phase("embeddings"):
+        # Loading the model blocks, so keep it off the event loop
+        embeddings = await asyncio.to_thread(
+            E5Embeddings,
+            batch_size=int(os.getenv("EMBED_BATCH_SIZE", "32")),
+            batch_window_ms=float(os.getenv("EMBED_BATCH_WINDOW_MS", "5")),
+            executor=os.getenv("EMBED_EXECUTOR", "thread"),
+            workers=int(os.getenv("EMBED_WORKERS", "1")),
+            cache_size=int(os.getenv("EMBED_CACHE_SIZE", "2048")),
+            cache_dir=os.getenv("EMBED_CACHE_DIR") or None,
+            backend=os.getenv("EMBED_BACKEND", "torch"),
+            remote=EMBED_SERVER_SOCKET
+        )
+        if embeddings.remote is not None:
+            # Workers may start before the shared server has loaded the model
+            await asyncio.to_thread(embeddings.remote.wait_ready, EMBED_SERVER_WAIT_SECONDS)
+
+    with warmup.phase("vectorstore"):
+        if os.getenv("VECTOR_STORE", "pinecone") == "local":
+            # In-process index built from the notebooks' structured CSVs
+            index = None
+            vectorstore = await asyncio.to_thread(
+                LocalVectorStore.from_csv,
+                embeddings,
+                landmarks_csv=os.getenv("LANDMARKS_CSV"),
+                municipalities_csv=os.getenv("MUNICIPALITIES_CSV"),
+                index_path=os.getenv("LOCAL_INDEX_PATH") or None,
+                index_type=os.getenv("LOCAL_INDEX_TYPE", "flat")
+            )
+        else:
+            pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+            index = await asyncio.to_thread(pc.Index, os.getenv("PINECONE_INDEX_NAME"))
+            vectorstore = PineconeVectorStore(index=index, embedding=embeddings, text_key="content")
+        retriever = vectorstore.as_retriever().with_config(callbacks=metrics_callbacks)
+
+    with warmup.phase("lookup_indexes"):
+        # Filters, place names and coordinates come from the documents actually indexed
+        documents = []
+        if isinstance(vectorstore, LocalVectorStore):
+            documents = vectorstore.get_by_ids(vectorstore.ids)
+        elif os.getenv("LANDMARKS_CSV") or os.getenv("MUNICIPALITIES_CSV"):
+            records = await asyncio.to_thread(
+                load_corpus, os.getenv("LANDMARKS_CSV"), os.getenv("MUNICIPALITIES_CSV")
+            )
+            documents = [Document(id=r["id"], page_content=r["content"], metadata=r["metadata"]) for r in records]
+        # Notebook-built Pinecone indexes store location/details as dicts, so filters would match nothing
+        metadata_indexed = (
+            isinstance(vectorstore, LocalVectorStore) or bool(load_manifest(PINECONE_MANIFEST).get("records"))
+        )
+        if SEARCH_FILTERS and documents and metadata_indexed:
+            search_filters = SearchFilters.from_metadatas(d.metadata for d in documents)
+        elif SEARCH_FILTERS and documents:
+            print(f"Search filters disabled: no manifest at {PINECONE_MANIFEST} for the Pinecone index")
+        if PLACE_INDEX and documents:
+            place_index = await asyncio.to_thread(PlaceIndex, documents)
+        if GEO_INDEX and documents:
+            geo_index = await asyncio.to_thread(GeoIndex, documents)
+
+    with warmup.phase("llm"):
+        llm = ChatOpenAI(temperature=0, model_name="gpt-3.5-turbo", callbacks=metrics_callbacks)
+
+    with warmup.phase("warmup_encode"):
+        # Document path skips the query cache so the warm-up text is not cached
+        await embeddings.aembed_documents(["Puerto Rico beaches and historic sites"])
+
+    with warmup.phase("warmup_retrieval"):
+        try:
+            await retriever.ainvoke("Puerto Rico beaches and historic sites")
+        except Exception as e:
+            print(f"Warm-up retrieval failed: {str(e)}")
+
+    with warmup.phase("sessions"):
+        answer_cache = SemanticAnswerCache(
+            embeddings,
+            threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92")),
+            max_entries=ANSWER_CACHE_SIZE,
+            ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+        ) if ANSWER_CACHE_SIZE > 0 else None
+        location_chain = await initialize_components(llm, retriever)
+        shared_chains = build_shared_chains(
+            llm,
+            season_enrichment=os.getenv("SEASON_LLM_ENRICHMENT", "0") == "1",
+            answer_cache=answer_cache,
+            search_filters=search_filters,
+            place_index=place_index,
+            geo_index=geo_index,
+            context_assembler=ContextAssembler(
+                budgets={"query": CONTEXT_TOKEN_BUDGET},
+                summarizer=llm_summarizer(llm) if CONVERSATION_LLM_SUMMARY else None
+            ),
+            structured_analysis=STRUCTURED_ANALYSIS
+        )
+        registry = SessionRegistry(
+            lambda: SimplePRTravelBot(
+                llm, retriever, index, location_chain,
+                state_manager=StateManager(max_turns=CONVERSATION_TURNS),
+                chains=shared_chains, speculative_qa=QA_SPECULATIVE
+            ),
+            max_sessions=SESSION_MAX,
+            ttl_seconds=SESSION_TTL_SECONDS,
+            max_memory_bytes=int(SESSION_MEMORY_CAP_MB * 1024 * 1024) or None
+        )
+        asyncio.create_task(registry.run_sweeper(min(60, SESSION_TTL_SECONDS)))
+
+    # Existing stats endpoints, also exposed as gauges on /metrics
+    metrics.REGISTRY.register(metrics.Gauge(
+        "travelbot_sessions_active", "Live chat sessions.", lambda: registry.stats()["active_sessions"]
+    ))
+    metrics.REGISTRY.register(metrics.Gauge(
+        "travelbot_fast_path_skip_ratio", "Fraction of turns that skipped query analysis.",
+        lambda: shared_chains["fast_path"].stats()["skip_ratio"]
+    ))
+    if embeddings.cache is not None:
+        metrics.REGISTRY.register(metrics.Gauge(
+            "travelbot_embedding_cache_hit_rate", "Query embedding cache hit rate.",
+            lambda: embeddings.cache.stats()["hit_rate"]
+        ))
+    if answer_cache is not None:
+        metrics.REGISTRY.register(metrics.Gauge(
+            "travelbot_answer_cache_hit_rate", "Semantic answer cache hit rate.",
+            lambda: answer_cache.stats()["hit_rate"]
+        ))
+    if place_index is not None:
+        metrics.REGISTRY.register(metrics.Gauge(
+            "travelbot_place_resolution_rate", "Fraction of questions resolved by the place-name index.",
+            lambda: place_index.stats()["resolution_rate"]
+        ))
 
 @app.on_event("startup")
 async def startup_event():
-    global bot
-    location_chain = await initialize_components(llm, retriever)
-    bot = SimplePRTravelBot(llm, retriever, index, location_chain)
+    # Serve health checks while the model loads
+    asyncio.create_task(warmup.run(build_components))
+
+def require_ready():
+    if not warmup.ready.is_set():
+        raise HTTPException(status_code=503, detail=warmup.status())
+
+@app.get("/healthz")
+async def healthz():
+    # A failed warm-up never retries, so report the worker unhealthy and let it be restarted
+    if warmup.error:
+        return JSONResponse({"status": "failed", "error": warmup.error}, status_code=503)
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
 
 @app.get("/")
 async def get(request: Request):
     return templates.TemplateResponse("chat.html", {"request": request})
 
+@app.get("/stream")
+async def get_streaming(request: Request):
+    return templates.TemplateResponse("chat_streaming.html", {"request": request})
+
+@app.get("/sessions", dependencies=[Depends(require_ready)])
+async def sessions(detail: bool = False):
+    return registry.stats(include_sessions=detail)
+
+@app.get("/embeddings", dependencies=[Depends(require_ready)])
+async def embedding_stats():
+    return embeddings.stats()
+
+@app.get("/fastpath", dependencies=[Depends(require_ready)])
+async def fast_path_stats():
+    return shared_chains["fast_path"].stats()
+
+@app.get("/answers", dependencies=[Depends(require_ready)])
+async def answer_cache_stats():
+    return answer_cache.stats() if answer_cache else {"enabled": False}
+
+@app.get("/searchfilters", dependencies=[Depends(require_ready)])
+async def search_filter_stats():
+    return search_filters.stats() if search_filters else {"enabled": False}
+
+@app.get("/places", dependencies=[Depends(require_ready)])
+async def place_index_stats():
+    return place_index.stats() if place_index else {"enabled": False}
+
+@app.get("/geo", dependencies=[Depends(require_ready)])
+async def geo_index_stats():
+    return geo_index.stats() if geo_index else {"enabled": False}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/streaming")
+async def streaming_stats():
+    return stream_stats.stats()
+
+async def close_evicted(websocket: WebSocket, reason: str) -> None:
+    """Tell the client its session was evicted instead of silently starting a new one."""
+    try:
+        await websocket.close(code=SESSION_EVICTED_CLOSE_CODE, reason=f"session evicted: {reason}")
+    except RuntimeError:
+        # Already closed by the client or an earlier eviction notice
+        pass
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    
+
+    # Hold the connection until the model and index are warm
+    if not await warmup.wait_ready(READY_WAIT_SECONDS):
+        await websocket.close(code=1013)
+        return
+
+    # Server-generated and never shared, so one connection owns one session
+    session_id = registry.new_session_id()
+    # ?stream=1 sends each response as start/chunk/end JSON frames
+    stream = websocket.query_params.get("stream") == "1"
+
     # Send welcome message
     welcome = """
     ¡Hola! 😊 I'm your Puerto Rico Travel Assistant.
@@ -50,18 +318,37 @@ async def websocket_endpoint(websocket: WebSocket):
         When are you planning to visit our beautiful island🏝️? 
     """
     await websocket.send_text(welcome)
+
+    def on_evict(reason: str) -> None:
+        asyncio.get_running_loop().create_task(close_evicted(websocket, reason))
+
+    registry.open(session_id, on_evict=on_evict)
     
     try:
         while True:
             # Receive message from client
             message = await websocket.receive_text()
             
-            # Process message through bot
+            # Process message through this connection's bot
+            bot = registry.get(session_id)
+            if bot is None:
+                # Evicted while the message was in flight; don't start over with a blank bot
+                await close_evicted(websocket, "while a message was in flight")
+                return
+            if stream:
+                await send_stream(websocket, bot._process_input_stream(message), stream_stats)
+                registry.touch(session_id)
+                continue
             response = await bot._process_input(message)
+            registry.touch(session_id)
             
             # Send response back to client
-            await websocket.send_text(response)
+            with metrics.span("send"):
+                await websocket.send_text(response)
             
+    except WebSocketDisconnect:
+        registry.close(session_id)
     except Exception as e:
         print(f"Error: {str(e)}")
+        registry.close(session_id)
         await websocket.close() 
\ No newline at end of file
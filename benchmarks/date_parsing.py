@@ -0,0 +1,94 @@
+"""Benchmark the travel-date grammar against the dateparser path it replaces.
+
+Usage: python -m benchmarks.date_parsing [--corpus benchmarks/date_phrases.jsonl] [--repeats 20]
+
+Each corpus line is ``{"text": ..., "expected": "Month YYYY" | null}``, with
+expectations relative to the fixed base date below so results don't drift.
+For the grammar, dateparser alone (with the handler's input cleaning) and
+the combined ``DateHandler.parse_date`` reports accuracy, false positives on
+non-date chat text, the cold first call and per-phrase latency percentiles,
+plus how often the combined parser needed the fallback, as JSON.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from date_grammar import match_travel_date, parse_travel_date
+from handlers import DateHandler
+
+BASE_DATE = datetime(2026, 3, 15, 12, 0)
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "date_phrases.jsonl")
+
+def load_corpus(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {f"p{p}": round(ordered[int(round(p / 100 * last))], 1) for p in (50, 95, 99)}
+
+def bench(name: str, parse: Callable[[str], Optional[datetime]], corpus: List[Dict], repeats: int) -> Dict:
+    start = time.perf_counter()
+    parse(corpus[0]["text"])
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    correct, false_positives, misses = 0, 0, []
+    for row in corpus:
+        parsed = parse(row["text"])
+        got = parsed.strftime("%B %Y") if parsed else None
+        if got == row["expected"]:
+            correct += 1
+        else:
+            false_positives += row["expected"] is None
+            misses.append({"text": row["text"], "expected": row["expected"], "got": got})
+
+    timings = []
+    for _ in range(repeats):
+        for row in corpus:
+            start = time.perf_counter()
+            parse(row["text"])
+            timings.append((time.perf_counter() - start) * 1e6)
+    return {
+        "parser": name,
+        "accuracy": round(correct / len(corpus), 3),
+        "false_positives": false_positives,
+        "cold_first_call_ms": round(cold_ms, 2),
+        "latency_us": _percentiles(timings),
+        "mean_us": round(sum(timings) / len(timings), 1),
+        "misses": misses
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    handler = DateHandler(None, None)
+    # dateparser first, so its locale loading shows up as its cold call
+    results = [
+        bench("dateparser", lambda text: handler._dateparser_parse(text, BASE_DATE), corpus, args.repeats),
+        bench("grammar", lambda text: parse_travel_date(text, BASE_DATE), corpus, args.repeats),
+        bench("grammar+dateparser", lambda text: handler.parse_date(text, BASE_DATE), corpus, args.repeats)
+    ]
+    rules: Dict[str, int] = {}
+    for row in corpus:
+        rule = match_travel_date(row["text"], BASE_DATE)[1] or "fallback"
+        rules[rule] = rules.get(rule, 0) + 1
+    report = {
+        "phrases": len(corpus),
+        "base_date": BASE_DATE.isoformat(),
+        "repeats": args.repeats,
+        "grammar_rules": rules,
+        "fallback_rate": round(rules.get("fallback", 0) / len(corpus), 3),
+        "results": results
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare E5 CPU backends against the fp32 baseline on the landmark corpus.
+
+Usage: python -m benchmarks.embedding_backends --landmarks landmarks.csv
+       [--backends int8 onnx] [--k 5] [--limit 500]
+
+For each backend reports encode throughput, per-document cosine agreement
+with the fp32 vectors, and top-k overlap of query results against the
+fp32 ranking, as JSON.
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from corpus import load_landmarks
+from embeddings import BACKENDS, load_model
+
+QUERIES = [
+    "beaches in Culebra",
+    "historic forts in Old San Juan",
+    "rainforest hiking trails",
+    "bioluminescent bay tours",
+    "museums in Ponce",
+    "playas cerca de Rincón para surfear",
+    "iglesias históricas en San Germán",
+    "caves and waterfalls in the central mountains",
+    "family friendly attractions near Fajardo",
+    "where to see Taíno petroglyphs"
+]
+
+def _encode(model, texts: List[str], batch_size: int):
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+    return np.asarray(vectors, dtype=np.float32), time.perf_counter() - start
+
+def _top_k(queries: np.ndarray, docs: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ docs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+def compare(model_name: str, texts: List[str], queries: List[str], backends: List[str], k: int, batch_size: int) -> Dict:
+    baseline = load_model(model_name, "torch")
+    base_docs, base_seconds = _encode(baseline, texts, batch_size)
+    base_queries, _ = _encode(baseline, queries, batch_size)
+    base_top = _top_k(base_queries, base_docs, k)
+    del baseline
+
+    report = {
+        "model": model_name,
+        "documents": len(texts),
+        "queries": len(queries),
+        "k": k,
+        "backends": {
+            "torch": {"docs_per_second": round(len(texts) / base_seconds, 2)}
+        }
+    }
+    for backend in backends:
+        load_start = time.perf_counter()
+        model = load_model(model_name, backend)
+        load_seconds = time.perf_counter() - load_start
+        docs, seconds = _encode(model, texts, batch_size)
+        query_vectors, _ = _encode(model, queries, batch_size)
+        top = _top_k(query_vectors, docs, k)
+        del model
+
+        agreement = np.sum(docs * base_docs, axis=1)
+        overlap = [len(set(a) & set(b)) / k for a, b in zip(top, base_top)]
+        report["backends"][backend] = {
+            "load_seconds": round(load_seconds, 2),
+            "docs_per_second": round(len(texts) / seconds, 2),
+            "speedup": round(base_seconds / seconds, 2),
+            "cosine_agreement": {
+                "mean": round(float(agreement.mean()), 5),
+                "p5": round(float(np.percentile(agreement, 5)), 5),
+                "min": round(float(agreement.min()), 5)
+            },
+            f"top{k}_overlap": round(float(np.mean(overlap)), 4)
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--landmarks", required=True, help="Structured landmarks CSV")
+    parser.add_argument("--model", default="intfloat/multilingual-e5-large")
+    parser.add_argument("--backends", nargs="+", default=[b for b in BACKENDS if b != "torch"], choices=BACKENDS)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=0, help="Use only the first N landmarks")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    records = load_landmarks(args.landmarks)
+    if args.limit:
+        records = records[:args.limit]
+    texts = [record["text"] for record in records]
+    # Landmark names make realistic "tell me about" queries alongside the fixed set
+    queries = QUERIES + [f"tell me about {record['metadata']['name']}" for record in records[:40]]
+
+    report = compare(args.model, texts, queries, args.backends, args.k, args.batch_size)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Measure the shared embedding server's memory savings and added latency.
+
+Usage: python -m benchmarks.embedding_server [--model stub] [--stub-mb 512]
+       [--batch-sizes 1 8 32] [--requests 200] [--clients 8] [--workers 1 2 4 8]
+
+Starts ``embedding_server`` in a subprocess, then times encode requests of
+each batch size through the Unix socket against calling the same encoder
+in-process, and runs ``--clients`` concurrent single-query clients to show
+cross-client batching. Memory compares the RSS one in-process model adds
+per uvicorn worker with the server's RSS plus each client's overhead.
+``--model stub`` is a deterministic encoder holding ``--stub-mb`` of
+weights, for machines without sentence-transformers; pass a real model name
+(with ``--backend``) to measure E5 itself. Prints JSON.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from embedding_server import EmbeddingClient, EmbeddingServer
+
+QUERIES = [
+    "query: best beaches in Rincón for surfing",
+    "query: history of El Morro fortress in San Juan",
+    "query: restaurantes de comida criolla en Ponce",
+    "query: hiking trails in El Yunque rainforest",
+    "query: bioluminescent bay tours in Vieques",
+    "query: museos de arte en San Juan",
+    "query: family friendly beaches near Fajardo",
+    "query: coffee plantations in the central mountains"
+]
+
+def rss_mb(pid: str = "self") -> float:
+    """Resident set size from /proc, in MB."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def stub_encoder(stub_mb: int, dim: int = 1024) -> Callable[[List[str]], np.ndarray]:
+    """Hash words into rows of a ``stub_mb`` weight table and average them."""
+    rows = max(1, stub_mb * 1024 * 1024 // (dim * 4))
+    weights = np.random.default_rng(0).standard_normal((rows, dim), dtype=np.float32)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        vectors = []
+        for text in texts:
+            ids = [int(hashlib.md5(w.encode()).hexdigest()[:8], 16) % rows for w in text.split()] or [0]
+            vector = weights[ids].mean(axis=0)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.asarray(vectors, dtype=np.float32)
+    return encode
+
+def build_encoder(args) -> Callable[[List[str]], np.ndarray]:
+    if args.model == "stub":
+        return stub_encoder(args.stub_mb)
+    from embeddings import load_model
+    model = load_model(args.model, args.backend)
+    return lambda texts: model.encode(texts, convert_to_tensor=False)
+
+def serve(args) -> None:
+    server = EmbeddingServer(
+        build_encoder(args), socket_path=args.socket, model_name=args.model,
+        batch_size=args.server_batch_size, batch_window_ms=args.batch_window_ms
+    )
+    asyncio.run(server.serve())
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {f"p{p}": round(ordered[int(round(p / 100 * last))], 3) for p in (50, 95, 99)}
+
+def time_calls(encode: Callable[[List[str]], List[List[float]]], batch_size: int, requests: int) -> Dict[str, float]:
+    batch = [QUERIES[i % len(QUERIES)] for i in range(batch_size)]
+    encode(batch)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        encode(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+    return _percentiles(timings)
+
+def concurrent_clients(socket_path: str, clients: int, requests: int) -> Dict[str, float]:
+    """Single-query requests from ``clients`` connections at once, like workers serving chats."""
+    barrier = threading.Barrier(clients + 1)
+    timings: List[float] = []
+    lock = threading.Lock()
+
+    def run(worker: int) -> None:
+        client = EmbeddingClient(socket_path, connections=1)
+        client.encode([QUERIES[worker % len(QUERIES)]])
+        barrier.wait()
+        local = []
+        for i in range(requests):
+            start = time.perf_counter()
+            client.encode([QUERIES[(worker + i) % len(QUERIES)]])
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            timings.extend(local)
+        client.close()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "clients": clients,
+        "queries_per_second": round(clients * requests / elapsed, 1),
+        "latency_ms": _percentiles(timings)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="stub")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--stub-mb", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--server-batch-size", type=int, default=32)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    parser.add_argument("--socket", default=None)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    socket_path = args.socket or os.path.join(tempfile.mkdtemp(), "embed.sock")
+    command = [
+        sys.executable, "-m", "benchmarks.embedding_server", "--serve", "--socket", socket_path,
+        "--model", args.model, "--backend", args.backend, "--stub-mb", str(args.stub_mb),
+        "--server-batch-size", str(args.server_batch_size), "--batch-window-ms", str(args.batch_window_ms)
+    ]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        # Client side first, before this process loads its own copy of the model
+        before = rss_mb()
+        client = EmbeddingClient(socket_path, connections=1)
+        client.wait_ready(timeout=600)
+        remote = {size: time_calls(client.encode, size, args.requests) for size in args.batch_sizes}
+        client_overhead = rss_mb() - before
+        concurrency = concurrent_clients(socket_path, args.clients, max(1, args.requests // 4))
+        server_stats = client.info()
+        server_rss = rss_mb(str(server.pid))
+        client.close()
+
+        before = rss_mb()
+        encode = build_encoder(args)
+        # In-process E5Embeddings converts to lists too, as the Embeddings interface requires
+        local = {
+            size: time_calls(lambda texts: encode(texts).tolist(), size, args.requests)
+            for size in args.batch_sizes
+        }
+        model_mb = rss_mb() - before
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    report = {
+        "model": args.model,
+        "latency_ms": [
+            {
+                "batch_size": size,
+                "in_process": local[size],
+                "via_server": remote[size],
+                "added_p50_ms": round(remote[size]["p50"] - local[size]["p50"], 3)
+            }
+            for size in args.batch_sizes
+        ],
+        "concurrent": dict(concurrency, avg_server_batch=round(server_stats["batching"]["avg_batch_size"], 2)),
+        "memory_mb": {
+            "model_per_worker": round(model_mb, 1),
+            "server_rss": round(server_rss, 1),
+            "client_overhead_per_worker": round(client_overhead, 1),
+            "by_workers": [
+                {
+                    "workers": workers,
+                    "in_process": round(workers * model_mb, 1),
+                    "shared_server": round(server_rss + workers * client_overhead, 1),
+                    "saved": round(workers * model_mb - server_rss - workers * client_overhead, 1)
+                }
+                for workers in args.workers
+            ]
+        }
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
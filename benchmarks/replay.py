@@ -0,0 +1,146 @@
+"""Replay scripted conversations through SimplePRTravelBot with stub LLM and retriever.
+
+Usage: python -m benchmarks.replay [--conversations 50] [--llm-latency-ms 0]
+       [--retriever-latency-ms 0] [--concurrency 1] [--output results.json]
+
+Reports per-turn and per-handler latency percentiles, CPU time and
+tracemalloc allocations as JSON. Allocations come from a separate pass so
+tracing overhead does not skew the latency numbers.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.stubs import StubChatModel, StubRetriever, stub_documents
+from bot import SimplePRTravelBot, build_shared_chains
+
+SCRIPT: List[Tuple[str, str]] = [
+    ("date", "March 2027"),
+    ("interests", "I love beaches and history"),
+    ("search", "find beaches in Culebra"),
+    ("add", "add 1 and 3"),
+    ("question", "tell me about el morro"),
+    ("show", "show my list"),
+    ("finalize", "finalize")
+]
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    summary = {
+        f"p{p}": round(ordered[min(last, int(round(p / 100 * last)))], 3)
+        for p in (50, 95, 99)
+    }
+    summary["mean"] = round(sum(ordered) / len(ordered), 3)
+    summary["count"] = len(ordered)
+    return summary
+
+def _instrument(bot: SimplePRTravelBot, timings: Dict[str, List[float]]) -> None:
+    """Record wall time of every handler call under the handler's name."""
+    for name, handler in bot.router.handlers.items():
+        original = handler.handle
+
+        @functools.wraps(original)
+        async def timed(context, _original=original, _name=name):
+            start = time.perf_counter()
+            try:
+                return await _original(context)
+            finally:
+                timings[_name].append((time.perf_counter() - start) * 1000)
+
+        handler.handle = timed
+
+async def _conversation(llm, retriever, chains, turns: Dict[str, List[float]], handlers: Dict[str, List[float]]):
+    bot = SimplePRTravelBot(llm, retriever, None, None, chains=chains)
+    _instrument(bot, handlers)
+    for label, message in SCRIPT:
+        start = time.perf_counter()
+        await bot._process_input(message)
+        turns[label].append((time.perf_counter() - start) * 1000)
+    return bot
+
+async def _latency_pass(args, llm, retriever, chains) -> Dict[str, Any]:
+    turns: Dict[str, List[float]] = defaultdict(list)
+    handlers: Dict[str, List[float]] = defaultdict(list)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for start in range(0, args.conversations, args.concurrency):
+        batch = min(args.concurrency, args.conversations - start)
+        await asyncio.gather(*(
+            _conversation(llm, retriever, chains, turns, handlers) for _ in range(batch)
+        ))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    total_turns = args.conversations * len(SCRIPT)
+    return {
+        "turn_ms": {label: percentiles(turns[label]) for label, _ in SCRIPT},
+        "handler_ms": {name: percentiles(values) for name, values in sorted(handlers.items())},
+        "cpu_seconds": round(cpu, 4),
+        "wall_seconds": round(wall, 4),
+        "cpu_ms_per_turn": round(cpu / total_turns * 1000, 4)
+    }
+
+async def _allocation_pass(llm, retriever, chains) -> Dict[str, Any]:
+    bot = SimplePRTravelBot(llm, retriever, None, None, chains=chains)
+    allocations = {}
+    tracemalloc.start()
+    try:
+        for label, message in SCRIPT:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await bot._process_input(message)
+            after, peak = tracemalloc.get_traced_memory()
+            allocations[label] = {
+                "net_kb": round((after - before) / 1024, 2),
+                "peak_kb": round((peak - before) / 1024, 2)
+            }
+    finally:
+        tracemalloc.stop()
+    return allocations
+
+async def run(args) -> Dict[str, Any]:
+    llm = StubChatModel(latency_ms=args.llm_latency_ms)
+    retriever = StubRetriever(documents=stub_documents(), latency_ms=args.retriever_latency_ms)
+    chains = build_shared_chains(llm)
+
+    # One untimed conversation warms imports, dateparser and prompt templates
+    await _conversation(llm, retriever, chains, defaultdict(list), defaultdict(list))
+
+    results = await _latency_pass(args, llm, retriever, chains)
+    results["allocations"] = await _allocation_pass(llm, retriever, chains)
+    results["config"] = {
+        "conversations": args.conversations,
+        "concurrency": args.concurrency,
+        "llm_latency_ms": args.llm_latency_ms,
+        "retriever_latency_ms": args.retriever_latency_ms,
+        "script": [label for label, _ in SCRIPT]
+    }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--retriever-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    # Handlers print debug output; keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        results = asyncio.run(run(args))
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
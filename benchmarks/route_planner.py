@@ -0,0 +1,91 @@
+"""Benchmark the itinerary planner's solve time against itinerary size.
+
+Usage: python -m benchmarks.route_planner [--sizes 5 10 25 50 100 200] [--repeats 20]
+
+Stops are random points over Puerto Rico with random visit durations and
+opening hours. For each size reports solve time percentiles split into the
+distance matrix, nearest neighbour + 2-opt, and the day split, plus the
+driving time saved against insertion order, as JSON.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from planner import Stop, nearest_neighbour, order_stops, route_hours, split_days, travel_hours_matrix
+
+# Rough bounding box of the main island
+LATITUDE = (17.95, 18.50)
+LONGITUDE = (-67.25, -65.60)
+
+def random_stops(n: int, rng: random.Random) -> List[Stop]:
+    stops = []
+    for i in range(n):
+        opens = rng.choice([None, 8.0, 9.0, 10.0])
+        stops.append(Stop(
+            name=f"Stop {i}",
+            latitude=rng.uniform(*LATITUDE),
+            longitude=rng.uniform(*LONGITUDE),
+            visit_hours=rng.choice([0.5, 1.0, 1.5, 2.0, 3.0]),
+            opens=opens,
+            closes=None if opens is None else opens + rng.choice([7.0, 8.0, 9.0])
+        ))
+    return stops
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {f"p{p}": round(ordered[int(round(p / 100 * last))], 3) for p in (50, 95)}
+
+def bench(size: int, repeats: int, rng: random.Random) -> Dict:
+    matrix_ms, order_ms, split_ms, total_ms, savings, days = [], [], [], [], [], []
+    for _ in range(repeats):
+        stops = random_stops(size, rng)
+        start = time.perf_counter()
+        travel = travel_hours_matrix(stops)
+        matrix_done = time.perf_counter()
+        route, _ = order_stops(stops)
+        order_done = time.perf_counter()
+        plan = split_days(stops, route, travel)
+        split_done = time.perf_counter()
+
+        # order_stops builds its own matrix, so its time includes a second one
+        matrix_ms.append((matrix_done - start) * 1000)
+        order_ms.append((order_done - matrix_done) * 1000)
+        split_ms.append((split_done - order_done) * 1000)
+        total_ms.append((split_done - matrix_done) * 1000)
+        insertion = route_hours(travel, list(range(size)))
+        greedy = route_hours(travel, nearest_neighbour(travel))
+        optimized = route_hours(travel, route)
+        savings.append({
+            "vs_insertion": 1 - optimized / insertion if insertion else 0.0,
+            "vs_nearest_neighbour": 1 - optimized / greedy if greedy else 0.0
+        })
+        days.append(len(plan))
+    return {
+        "stops": size,
+        "matrix_ms": _percentiles(matrix_ms),
+        "order_ms": _percentiles(order_ms),
+        "split_ms": _percentiles(split_ms),
+        "solve_ms": _percentiles(total_ms),
+        "driving_saved_vs_insertion": round(sum(s["vs_insertion"] for s in savings) / len(savings), 3),
+        "driving_saved_vs_nearest_neighbour": round(sum(s["vs_nearest_neighbour"] for s in savings) / len(savings), 3),
+        "mean_days": round(sum(days) / len(days), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 25, 50, 100, 200])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Warm up numpy before timing
+    order_stops(random_stops(10, rng))
+    report = {"repeats": args.repeats, "results": [bench(size, args.repeats, rng) for size in args.sizes]}
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
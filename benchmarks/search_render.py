@@ -0,0 +1,125 @@
+"""Search-turn CPU cost: legacy render-then-parse vs typed results.
+
+Usage: python -m benchmarks.search_render [--results 4] [--iterations 20000]
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from langchain_core.documents import Document
+
+from results import SearchResult, render_search_results
+
+def _legacy_format(docs: List[Dict]) -> str:
+    """SearchHandler._format_search_results before typed results."""
+    formatted_results = ["""
+        🌟 Based on your interests, here are my suggestions for you:
+        """]
+    for i, doc in enumerate(docs, 1):
+        coordinates = doc.get('metadata', {}).get('coordinates', 'Coordinates not available')
+        town = doc.get('metadata', {}).get('town', 'Town not specified')
+        number_emoji = f"{i}️⃣"
+        name = doc.get('name', '').replace('_', ' ')
+        result = f"""
+                    {number_emoji} **{name}**
+                    🏷️ {doc.get('metadata', {}).get('type', 'landmark')}
+                    📍 {town}
+                    🌐 {coordinates}
+                    🔗 [View Images]()
+                    💡{doc.get('content', 'No description available')}\n
+            """
+        formatted_results.append(result)
+    formatted_results.append("""
+        Would you like me to add any of these suggestions to your list📝? 
+        You can say:
+        • "Add all of them"
+        • "Add number 1 and 3"
+        • "Add 1,2 and 4"
+        """)
+    return "\n\n".join(formatted_results)
+
+def _legacy_parse(results: str) -> List[Dict]:
+    """SearchHandler._store_suggestions before typed results."""
+    suggestions = []
+    for section in results.split("\n\n"):
+        if section.strip().startswith(("1️⃣", "2️⃣", "3️⃣", "4️⃣")):
+            lines = section.strip().split("\n")
+            suggestions.append({
+                'name': lines[0].split("**")[1].strip(),
+                'description': "\n".join(lines[4:]),
+                'metadata': {
+                    'type': lines[1].replace("🏷️", "").strip(),
+                    'location': lines[2].replace("📍", "").strip()
+                }
+            })
+    return suggestions
+
+def _legacy_turn(docs: List[Document], search_type: str, location: str):
+    formatted_docs = []
+    for doc in docs:
+        metadata = doc.metadata or {}
+        formatted_docs.append({
+            'name': metadata.get('name', 'Unknown Location'),
+            'content': doc.page_content,
+            'metadata': {
+                'type': metadata.get('type', search_type),
+                'location': metadata.get('location', location),
+                'coordinates': metadata.get('coordinates', 'Coordinates not available'),
+                'town': metadata.get('location', location)
+            }
+        })
+    text = _legacy_format(formatted_docs)
+    return text, _legacy_parse(text)
+
+def _typed_turn(docs: List[Document], search_type: str, location: str):
+    results = [SearchResult.from_document(doc, search_type, location) for doc in docs]
+    return render_search_results(results), results
+
+def _documents(count: int) -> List[Document]:
+    return [
+        Document(
+            page_content=(
+                f"Landmark {i} is a historic site overlooking the bay. "
+                "Open daily 9am-5pm; guided tours available in English and Spanish. " * 3
+            ),
+            metadata={
+                "name": f"landmark_{i}_del_viejo_san_juan",
+                "type": "landmark",
+                "location": "San Juan",
+                "coordinates": "18.4671° N, 66.1185° W"
+            }
+        )
+        for i in range(count)
+    ]
+
+def _measure(turn, docs: List[Document], iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        turn(docs, "attractions", "San Juan")
+    return (time.process_time() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    docs = _documents(args.results)
+    legacy_text, legacy_suggestions = _legacy_turn(docs, "attractions", "San Juan")
+    typed_text, typed_results = _typed_turn(docs, "attractions", "San Juan")
+    assert [s["name"] for s in legacy_suggestions] == [r.name for r in typed_results][:len(legacy_suggestions)]
+
+    legacy_us = _measure(_legacy_turn, docs, args.iterations)
+    typed_us = _measure(_typed_turn, docs, args.iterations)
+    print(json.dumps({
+        "results": args.results,
+        "iterations": args.iterations,
+        "legacy_cpu_us_per_turn": round(legacy_us, 2),
+        "typed_cpu_us_per_turn": round(typed_us, 2),
+        "speedup": round(legacy_us / typed_us, 2) if typed_us else None,
+        "identical_output": legacy_text == typed_text
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
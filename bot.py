@@ -1,3 +1,5 @@
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+from datetime import datetime
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
@@ -8,7 +10,13 @@ from handlers import (
     QuestionHandler, DateHandler,
     ThankYouHandler
 )
-from prompts import QUERY_ANALYSIS_PROMPT
+from chains.qa_chain import PlaceQAChain
+from fastpath import FastPathClassifier
+from conversation import ContextAssembler
+from prompts import QUERY_ANALYSIS_PROMPT, STRUCTURED_ANALYSIS_PROMPT
+from analysis import fallback_analysis, parse_analysis
+import time
+import metrics
 
 # Date validation prompt
 DATE_VALIDATION_PROMPT = PromptTemplate(
@@ -126,20 +134,68 @@ QUERY_ANALYSIS_PROMPT = PromptTemplate(
     """
 )
 
+def build_shared_chains(
+    llm, season_enrichment: bool = False, answer_cache=None, search_filters=None, place_index=None,
+    geo_index=None, context_assembler=None, structured_analysis: bool = True
+) -> Dict[str, Any]:
+    """Build the LLM chains once so every session can share them.
+
+    Season info is served from ``seasons.MONTH_SEASONS``; the date chain is
+    only built when LLM enrichment of the travel tips is wanted.
+    ``answer_cache`` is an optional ``SemanticAnswerCache`` for place questions,
+    ``search_filters`` an optional ``SearchFilters`` vocabulary for searches,
+    ``place_index`` an optional ``PlaceIndex`` that resolves named places directly
+    and ``geo_index`` an optional ``GeoIndex`` for proximity searches and day plans.
+    ``context_assembler`` fits the conversation context into each chain's token
+    budget (a default ``ContextAssembler`` when not given).
+    With ``structured_analysis`` the query chain extracts the travel date along
+    with intent and slots as one JSON object (OpenAI JSON mode); otherwise it
+    uses the older pipe-delimited prompt.
+    """
+    if structured_analysis:
+        query_chain = STRUCTURED_ANALYSIS_PROMPT | llm.bind(response_format={"type": "json_object"}) | StrOutputParser()
+    else:
+        query_chain = QUERY_ANALYSIS_PROMPT | llm | StrOutputParser()
+    return {
+        "query": query_chain,
+        "structured_analysis": structured_analysis,
+        "date": DATE_VALIDATION_PROMPT | llm | StrOutputParser() if season_enrichment else None,
+        "qa": PlaceQAChain(llm),
+        "fast_path": FastPathClassifier(),
+        "answer_cache": answer_cache,
+        "search_filters": search_filters,
+        "place_index": place_index,
+        "geo_index": geo_index,
+        "context": context_assembler or ContextAssembler()
+    }
+
 class SimplePRTravelBot:
     """Main bot class using NLP-driven architecture."""
 
-    def __init__(self, llm, retriever, index, location_chain):
-        """Initialize bot with core components."""
+    def __init__(self, llm, retriever, index, location_chain, state_manager=None, chains=None, speculative_qa=False):
+        """Initialize bot with core components.
+
+        ``chains`` comes from ``build_shared_chains`` when the bot is created per
+        session, so only the state manager and handlers are per-conversation.
+        ``speculative_qa`` runs question answering speculatively (see QuestionHandler).
+        """
         # Initialize state manager
-        self.state_manager = StateManager()
+        self.state_manager = state_manager or StateManager()
+        chains = chains or build_shared_chains(llm)
         
         # Initialize handlers
         handlers = {
-            "date": DateHandler(self.state_manager, llm),
-            "search": SearchHandler(retriever, index, llm, location_chain, self.state_manager),
-            "question": QuestionHandler(retriever, llm, self.state_manager),
-            "itinerary": ItineraryHandler(self.state_manager),
+            "date": DateHandler(self.state_manager, llm, date_chain=chains.get("date")),
+            "search": SearchHandler(
+                retriever, index, llm, location_chain, self.state_manager,
+                filters=chains.get("search_filters"), geo_index=chains.get("geo_index")
+            ),
+            "question": QuestionHandler(
+                retriever, llm, self.state_manager, qa_chain=chains["qa"],
+                speculative=speculative_qa, answer_cache=chains.get("answer_cache"),
+                place_index=chains.get("place_index")
+            ),
+            "itinerary": ItineraryHandler(self.state_manager, geo_index=chains.get("geo_index")),
             "thankyou": ThankYouHandler()
         }
         
@@ -148,99 +204,171 @@ class SimplePRTravelBot:
         
         # Initialize LLM components
         self.llm = llm
-        self.query_chain = QUERY_ANALYSIS_PROMPT | llm | StrOutputParser()
+        self.query_chain = chains["query"]
+        self.structured_analysis = chains.get("structured_analysis", False)
+        self.fast_path = chains.get("fast_path") or FastPathClassifier()
+        self.context_assembler = chains.get("context") or ContextAssembler()
 
-    async def _process_input(self, user_input: str) -> str:
-        """Process user input using NLP-driven routing."""
-        try:
-            # Get current context
-            context = self.state_manager.get_context()
+    async def _analyze_input(self, user_input: str) -> Tuple[Optional[str], Optional[str], Dict[str, Any]]:
+        """Work out what to do with a turn.
+
+        Returns ``(response, intent, context)``: a finished response for turns
+        answered without routing (exit, a date parsed without the LLM),
+        otherwise ``None`` plus the intent and context for the router.
+        """
+        # Get current context
+        context = self.state_manager.get_context()
+        
+        # Quick exit check
+        if user_input.lower() in ['exit', 'quit', 'bye', 'thanks. Bye', 'goodbye', 'lets finish', 'thats all', 'that is all', 'thanks bye', 'thank you bye', 'thanks, that will be all', 'thanks, that will be all. bye']:
+            itinerary = self.state_manager.get_state("itinerary")
+            travel_dates = self.state_manager.get_state("travel_dates")
             
-            # Quick exit check
-            if user_input.lower() in ['exit', 'quit', 'bye', 'thanks. Bye', 'goodbye', 'lets finish', 'thats all', 'that is all', 'thanks bye', 'thank you bye', 'thanks, that will be all', 'thanks, that will be all. bye']:
-                itinerary = self.state_manager.get_state("itinerary")
-                travel_dates = self.state_manager.get_state("travel_dates")
-                
-                # Format itinerary items
-                formatted_items = []
-                for item in itinerary:
-                    display_name = item.replace('_', ' ').title()
-                    formatted_items.append(f"✅ {display_name}")
-
-                 # Get season information
-                season = season_info.get("season", "")
-                weather = season_info.get("weather", "")
-                tips = season_info.get("tips", "")
-                
-                return f"""
-                🎉 Thanks for planning your trip to Puerto Rico!
-                Here's your final list of places to visit for {travel_dates}:
+            # Format itinerary items
+            formatted_items = []
+            for item in itinerary:
+                display_name = item.replace('_', ' ').title()
+                formatted_items.append(f"✅ {display_name}")
 
-                {chr(10).join(formatted_items)}
+            # Get season information
+            season_info = self.state_manager.get_state("season_info") or {}
+            season = season_info.get("season", "")
+            weather = season_info.get("weather", "")
+            tips = season_info.get("tips", "")
+            
+            return f"""
+            🎉 Thanks for planning your trip to Puerto Rico!
+            Here's your final list of places to visit for {travel_dates}:
 
-                🌡️ Season Information:
-                {season}
+            {chr(10).join(formatted_items)}
 
-                🌤️ Weather Expectations:
-                {weather}
+            🌡️ Season Information:
+            {season}
 
-                💡 Travel Tips:
-                {tips}
+            🌤️ Weather Expectations:
+            {weather}
 
-                Additional Resources:
-                • 🎯 For events, restaurants and deals visit: https://app.voyturisteando.com/ & https://www.discoverpuertorico.com/
-                • 🌤️ For accurate weather information visit: https://www.weather.gov/sju/ & https://www.caricoos.org/
+            💡 Travel Tips:
+            {tips}
 
-                👋 Have a great journey! ¡Buen viaje! 🌴 
-                Feel free to come back anytime, if you have any questions or need help planning your next trip.
-                """
-            
-            # Add user input to context
-            context['user_input'] = user_input
-            
-            # Check if we're waiting for a date
-            if not self.state_manager.get_state("travel_dates"):
-                # Try to handle as date input first
-                try:
-                    date_handler = self.router.handlers.get('date')
-                    if date_handler:
-                        return await date_handler.handle(context)
-                except Exception as e:
-                    print(f"Date handling failed: {str(e)}")
-            
-            # If not a date or date handling failed, proceed with normal intent analysis
-            analysis = await self.query_chain.ainvoke({
+            Additional Resources:
+            • 🎯 For events, restaurants and deals visit: https://app.voyturisteando.com/ & https://www.discoverpuertorico.com/
+            • 🌤️ For accurate weather information visit: https://www.weather.gov/sju/ & https://www.caricoos.org/
+
+            👋 Have a great journey! ¡Buen viaje! 🌴 
+            Feel free to come back anytime, if you have any questions or need help planning your next trip.
+            """, None, context
+        
+        # Add user input to context
+        context['user_input'] = user_input
+        
+        # Check if we're waiting for a date
+        date_handler = self.router.handlers.get('date')
+        waiting_for_date = not self.state_manager.get_state("travel_dates")
+        # With structured analysis only dates the grammar parses skip it; the analysis extracts the rest
+        if waiting_for_date and date_handler and (
+            not self.structured_analysis or date_handler.parse_date(user_input, fallback=False)
+        ):
+            try:
+                metrics.set_labels(intent="set_date", handler=type(date_handler).__name__)
+                with metrics.span("handler"):
+                    return await date_handler.handle(context), None, context
+            except Exception as e:
+                print(f"Date handling failed: {str(e)}")
+        
+        # Command-like turns ("add 1 and 3", "show my list", "gracias") skip the LLM
+        with metrics.span("fast_path"):
+            fast_context = self.fast_path.classify(user_input)
+        if fast_context:
+            context.update(fast_context)
+            metrics.set_labels(intent=fast_context["intent"])
+            return None, fast_context["intent"], context
+        
+        # If not a date or date handling failed, proceed with normal intent analysis
+        # Recent turns and the rolling summary, within the query chain's token budget
+        current_context, _ = self.context_assembler.assemble(self.state_manager, chain="query")
+        if self.structured_analysis:
+            inputs = {
                 "user_input": user_input,
-                "current_context": context
-            })
-            
-            # Parse analysis
-            parts = analysis.split("|")
-            if len(parts) < 5:  # Handle incomplete analysis
-                return "Sorry, I'm having trouble understanding. Could you please rephrase that?"
-                
-            intent = parts[0].replace("INTENT:", "").strip()
+                "current_context": current_context,
+                "current_date": datetime.now().strftime("%B %d, %Y")
+            }
+            prompt = STRUCTURED_ANALYSIS_PROMPT
+        else:
+            inputs = {"user_input": user_input, "current_context": current_context}
+            prompt = QUERY_ANALYSIS_PROMPT
+        self.context_assembler.record_prompt("query", prompt.format(**inputs))
+        with metrics.span("analysis"):
+            analysis = await self.query_chain.ainvoke(inputs)
+        
+        # Parse analysis; an unreadable answer falls back to a question or search on the raw text
+        fields, _ = parse_analysis(analysis, user_input)
+        if fields is None:
+            fields = fallback_analysis(user_input)
+        
+        # A date with no other request (or any reply while dates are unset) goes to the date
+        # handler; "what's El Morro like in December?" stays a question
+        if fields["intent"] == "other" and (fields["date"] or waiting_for_date):
+            fields["intent"] = "set_date"
             
-            # Update context with analysis
-            context.update({
-                "intent": intent,
-                "search_type": parts[1].replace("SEARCH_TYPE:", "").strip(),
-                "location": parts[2].replace("LOCATION:", "").strip(),
-                "specifics": parts[3].replace("SPECIFICS:", "").strip(),
-                "query": parts[4].replace("QUERY:", "").strip()
-            })
+        intent = fields["intent"]
+        metrics.set_labels(intent=intent)
+        
+        # Update context with analysis
+        context.update(fields)
+        return None, intent, context
+
+    async def _process_input(self, user_input: str) -> str:
+        """Process user input using NLP-driven routing."""
+        metrics.start_turn()
+        started = time.perf_counter()
+        try:
+            response, intent, context = await self._analyze_input(user_input)
+            if response is not None:
+                return response
             
             # Route to appropriate handler
             response = await self.router.route(intent, context)
             
             # Store conversation
             self.state_manager.add_to_conversation(user_input, response)
+            self.context_assembler.schedule_summary(self.state_manager)
             
             return response
 
         except Exception as e:
             print(f"Error in _process_input: {str(e)}")
             return "Sorry, I encountered an error. Could you rephrase that?"
+        
+        finally:
+            metrics.record_turn(time.perf_counter() - started)
+
+    async def _process_input_stream(self, user_input: str) -> AsyncIterator[str]:
+        """Process user input, yielding the response as handlers produce it."""
+        metrics.start_turn()
+        started = time.perf_counter()
+        try:
+            response, intent, context = await self._analyze_input(user_input)
+            if response is not None:
+                yield response
+                return
+            
+            # Forward chunks from the handler as they arrive
+            chunks = []
+            async for chunk in self.router.route_stream(intent, context):
+                chunks.append(chunk)
+                yield chunk
+            
+            # Store conversation
+            self.state_manager.add_to_conversation(user_input, "".join(chunks))
+            self.context_assembler.schedule_summary(self.state_manager)
+
+        except Exception as e:
+            print(f"Error in _process_input_stream: {str(e)}")
+            yield "Sorry, I encountered an error. Could you rephrase that?"
+        
+        finally:
+            metrics.record_turn(time.perf_counter() - started)
 
     async def start_chat(self):
         """Start the conversation."""
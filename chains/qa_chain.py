@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import AsyncIterator, Dict, List
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
@@ -38,45 +38,69 @@ QA_PROMPT = PromptTemplate(
 class PlaceQAChain:
     """Chain for answering questions about specific places."""
     
+    ERROR_RESPONSE = "I had trouble generating a response. Please try asking in a different way."
+    
     def __init__(self, llm):
         self.llm = llm
     
+    def _build_messages(self, inputs: Dict) -> List[Dict]:
+        """Build the chat messages for a place question."""
+        if inputs.get("content"):  # Vector search data available
+            prompt = f"""Based on this information about a place in Puerto Rico:
+            {inputs['content']}
+            
+            Answer this question: {inputs['question']}
+            
+            Include:
+            1. Specific details from the content
+            2. Location and accessibility
+            3. Historical context if relevant
+            4. Practical visitor information
+            5. Best times to visit
+            
+            Format with clear sections and emojis.
+            """
+        else:  # GPT fallback
+            prompt = f"""As a Puerto Rico travel expert, answer this question: {inputs['question']}
+            
+            1. Provide accurate general information
+            2. Include historical context
+            3. Add practical visitor tips
+            4. Format with clear sections
+            5. Use emojis for readability
+            6. Mention this is based on general knowledge
+            """
+        
+        return [
+            {"role": "system", "content": "You are a knowledgeable Puerto Rico Travel Assistant."},
+            {"role": "user", "content": prompt}
+        ]
+    
     async def ainvoke(self, inputs: Dict) -> str:
         """Generate a detailed response about a place."""
         try:
-            if inputs.get("content"):  # Vector search data available
-                prompt = f"""Based on this information about a place in Puerto Rico:
-                {inputs['content']}
-                
-                Answer this question: {inputs['question']}
-                
-                Include:
-                1. Specific details from the content
-                2. Location and accessibility
-                3. Historical context if relevant
-                4. Practical visitor information
-                5. Best times to visit
-                
-                Format with clear sections and emojis.
-                """
-            else:  # GPT fallback
-                prompt = f"""As a Puerto Rico travel expert, answer this question: {inputs['question']}
-                
-                1. Provide accurate general information
-                2. Include historical context
-                3. Add practical visitor tips
-                4. Format with clear sections
-                5. Use emojis for readability
-                6. Mention this is based on general knowledge
-                """
-            
-            messages = [
-                {"role": "system", "content": "You are a knowledgeable Puerto Rico Travel Assistant."},
-                {"role": "user", "content": prompt}
-            ]
-            
-            return await self.llm.ainvoke(messages)
+            response = await self.llm.ainvoke(self._build_messages(inputs))
+            return getattr(response, "content", response)
             
         except Exception as e:
             print(f"Error in QA Chain: {str(e)}")
-            return "I had trouble generating a response. Please try asking in a different way." 
\ No newline at end of file
+            return self.ERROR_RESPONSE
+    
+    async def astream(self, inputs: Dict, raise_errors: bool = False) -> AsyncIterator[str]:
+        """Stream the response about a place chunk by chunk.
+        
+        A failure ends the stream with ERROR_RESPONSE, possibly after partial
+        chunks; with ``raise_errors`` the exception propagates instead, so
+        callers can tell a complete answer from a truncated one.
+        """
+        try:
+            async for chunk in self.llm.astream(self._build_messages(inputs)):
+                text = getattr(chunk, "content", chunk)
+                if text:
+                    yield text
+                    
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error in QA Chain: {str(e)}")
+            yield self.ERROR_RESPONSE
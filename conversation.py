@@ -0,0 +1,176 @@
+import asyncio
+import re
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import metrics
+
+PROMPT_TOKENS = metrics.REGISTRY.register(metrics.Histogram(
+    "travelbot_prompt_tokens", "Prompt tokens sent per chain call.", ("chain",),
+    buckets=(64, 128, 256, 512, 768, 1024, 1536, 2048, 4096)
+))
+CONTEXT_TOKENS = metrics.REGISTRY.register(metrics.Histogram(
+    "travelbot_context_tokens", "Tokens of assembled conversation context per chain call.", ("chain",),
+    buckets=(32, 64, 128, 256, 512, 1024, 2048)
+))
+
+# Token budgets for the conversation context of each chain
+DEFAULT_BUDGETS = {"query": 400}
+
+_encoder = None
+_SPACES = re.compile(r"\s+")
+
+def count_tokens(text: str) -> int:
+    """Tokens in ``text`` with the OpenAI tokenizer, or about four characters per token without it."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # tiktoken missing or its encoding files unavailable offline
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+def _squash(text: str) -> str:
+    """Collapse the templates' indentation and blank lines."""
+    return _SPACES.sub(" ", text).strip()
+
+def _truncate(text: str, max_tokens: int) -> str:
+    text = _squash(text)
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Characters-per-token estimate first, then trim words until it fits
+    words = text[:max_tokens * 4].split(" ")
+    while len(words) > 1 and count_tokens(" ".join(words) + " …") > max_tokens:
+        words = words[:-max(1, len(words) // 8)]
+    return " ".join(words) + " …"
+
+def extractive_summary(summary: str, turns: List[Dict[str, str]], max_tokens: int = 120) -> str:
+    """Fold old turns into the summary by keeping what the user asked, newest kept first."""
+    lines = [line for line in summary.split("\n") if line]
+    lines.extend(f"User: {_truncate(turn['user'], 30)}" for turn in turns)
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+class ContextAssembler:
+    """Builds the conversation context for each chain within a token budget.
+
+    The context holds the trip state, the rolling summary of turns that fell
+    out of the history ring buffer, and as many recent turns as fit, newest
+    first. Folding evicted turns into the summary runs in a background task
+    so it never delays a turn.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        summarizer: Optional[Callable[[str, List[Dict[str, str]]], Awaitable[str]]] = None,
+        summary_tokens: int = 120,
+        turn_tokens: int = 80
+    ):
+        self.budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        # An async (summary, turns) -> summary callable; the default keeps the user's requests
+        self.summarizer = summarizer
+        self.summary_tokens = summary_tokens
+        self.turn_tokens = turn_tokens
+        self._tasks = set()
+
+    def _state_lines(self, state_manager) -> List[str]:
+        state = state_manager.state
+        season = (state.get("season_info") or {}).get("season")
+        lines = [
+            f"Travel dates: {state.get('travel_dates') or 'unknown'}" + (f" ({season})" if season else ""),
+            f"Conversation stage: {state.get('current_step')}",
+            f"Places in itinerary: {len(state.get('itinerary') or [])}"
+        ]
+        if state.get("interests"):
+            lines.append(f"Interests: {', '.join(state['interests'])}")
+        if state.get("current_topic"):
+            lines.append(f"Current topic: {state['current_topic']}")
+        return lines
+
+    def assemble(self, state_manager, chain: str = "query") -> Tuple[str, int]:
+        """Context text for ``chain`` and its token count."""
+        budget = self.budgets.get(chain, DEFAULT_BUDGETS["query"])
+        parts = self._state_lines(state_manager)
+        used = count_tokens("\n".join(parts))
+        summary = "Earlier in the conversation:\n" + state_manager.summary if state_manager.summary else ""
+        # Recent turns come first, but leave the summary up to a third of the budget
+        reserve = min(count_tokens(summary), budget // 3) if summary else 0
+
+        recent = []
+        for turn in reversed(state_manager.conversation_history):
+            line = f"User: {_truncate(turn['user'], self.turn_tokens // 2)}\nAssistant: {_truncate(turn['bot'], self.turn_tokens)}"
+            tokens = count_tokens(line)
+            if used + reserve + tokens > budget:
+                break
+            recent.append(line)
+            used += tokens
+        if summary and budget - used > 8:
+            parts.append(_truncate(summary, budget - used) if count_tokens(summary) > budget - used else summary)
+        if recent:
+            parts.append("Recent turns:\n" + "\n".join(reversed(recent)))
+
+        text = "\n".join(parts)
+        tokens = count_tokens(text)
+        CONTEXT_TOKENS.observe(tokens, chain=chain)
+        return text, tokens
+
+    def record_prompt(self, chain: str, prompt: str) -> int:
+        """Count and record the full prompt sent to ``chain``."""
+        tokens = count_tokens(prompt)
+        PROMPT_TOKENS.observe(tokens, chain=chain)
+        return tokens
+
+    def schedule_summary(self, state_manager) -> None:
+        """Fold turns evicted from the ring buffer into the summary, off the hot path."""
+        if not state_manager.evicted or state_manager.summarizing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._fold(state_manager, state_manager.take_evicted())
+            return
+        state_manager.summarizing = True
+        task = loop.create_task(self._summarize(state_manager))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _fold(self, state_manager, turns: List[Dict[str, str]]) -> None:
+        state_manager.summary = extractive_summary(state_manager.summary, turns, self.summary_tokens)
+
+    async def _summarize(self, state_manager) -> None:
+        try:
+            # Turns evicted while the summarizer runs are folded on the next pass
+            while state_manager.evicted:
+                turns = state_manager.take_evicted()
+                if self.summarizer is None:
+                    self._fold(state_manager, turns)
+                    continue
+                try:
+                    summary = await self.summarizer(state_manager.summary, turns)
+                    state_manager.summary = _truncate(summary, self.summary_tokens)
+                except Exception as e:
+                    print(f"Error summarizing conversation: {str(e)}")
+                    self._fold(state_manager, turns)
+        finally:
+            state_manager.summarizing = False
+
+def llm_summarizer(llm) -> Callable[[str, List[Dict[str, str]]], Awaitable[str]]:
+    """Summarizer that asks ``llm`` to merge old turns into the running summary."""
+    async def summarize(summary: str, turns: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(
+            f"User: {_truncate(t['user'], 60)}\nAssistant: {_truncate(t['bot'], 120)}" for t in turns
+        )
+        messages = [
+            {"role": "system", "content": "Maintain a short running summary of a Puerto Rico trip-planning chat. "
+                                          "Keep dates, interests, places discussed or added, and open questions. "
+                                          "Reply with the updated summary only, under 120 words."},
+            {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"}
+        ]
+        response = await llm.ainvoke(messages)
+        return getattr(response, "content", response)
+    return summarize
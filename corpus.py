@@ -0,0 +1,139 @@
+import ast
+import csv
+import sys
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Structured CSV cells hold long descriptions and repr'd dicts
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def _literal(value: Any, default: Any) -> Any:
+    """Parse a repr'd dict/list cell written by the notebooks."""
+    if isinstance(value, (dict, list)):
+        return value
+    if not value or not isinstance(value, str):
+        return default
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return default
+    return parsed if isinstance(parsed, type(default)) else default
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _image_urls(images: List) -> List[str]:
+    urls = []
+    for image in images:
+        url = image.get("url") if isinstance(image, dict) else image
+        if isinstance(url, str) and url.startswith("http"):
+            urls.append(url)
+    return urls
+
+def record_key(name: str) -> str:
+    """Landmark key as built in the processing notebooks (lowercase, underscores)."""
+    return (name.replace("(", "").replace(")", "").replace(",", "")
+            .replace("-", "_").replace(" ", "_").lower())
+
+def record_id(kind: str, name: str) -> str:
+    """Id derived from the place name, so adding or removing a row leaves the others' ids alone.
+
+    Accents are stripped since Pinecone only accepts ASCII ids.
+    """
+    key = unicodedata.normalize("NFKD", record_key(name)).encode("ascii", "ignore").decode("ascii")
+    return f"{kind}_{key}"
+
+def _unique_ids(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Suffix repeated names (``_2``, ``_3``, ...) in file order."""
+    seen: Dict[str, int] = {}
+    for record in records:
+        count = seen.get(record["id"], 0) + 1
+        seen[record["id"]] = count
+        if count > 1:
+            record["id"] = f"{record['id']}_{count}"
+    return records
+
+def landmark_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a vector record from a row of the structured landmarks CSV."""
+    coordinates = _literal(row.get("coordinates"), {})
+    location = _literal(row.get("location"), {})
+    details = _literal(row.get("details"), {})
+    extra = _literal(row.get("metadata"), {})
+
+    latitude = _float(coordinates.get("latitude"))
+    longitude = _float(coordinates.get("longitude"))
+    town = str(location.get("town") or "Location to be verified")
+    name = row.get("landmark_name") or row.get("name") or "Unnamed Landmark"
+
+    return {
+        "id": record_id("landmark", name),
+        "text": row.get("text_for_embedding") or row.get("content") or "",
+        "content": row.get("content") or "No detailed description available",
+        "metadata": {
+            "type": "landmark",
+            "name": name,
+            "town": town,
+            "location": town,
+            "direction": str(location.get("direction") or "N/A"),
+            "latitude": latitude,
+            "longitude": longitude,
+            "coordinates": f"{latitude}, {longitude}",
+            "primary_category": str(details.get("primary_category") or "Uncategorized"),
+            "secondary_category": str(details.get("secondary_category") or "General"),
+            "visit_duration": str(details.get("visit_duration") or "Visit duration varies"),
+            "hours": str(details.get("hours") or "Contact location for current hours"),
+            "admission": str(details.get("admission") or "Contact location for current prices"),
+            "website": str(details.get("website") or "No website listed"),
+            "images": _image_urls(_literal(row.get("images"), [])),
+            "chatbot_tags": [str(tag) for tag in extra.get("chatbot_tags", [])]
+        }
+    }
+
+def municipality_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a vector record from a row of the structured municipalities CSV."""
+    name = row.get("municipality_name") or "Unknown Municipality"
+    latitude = _float(row.get("latitude"))
+    longitude = _float(row.get("longitude"))
+
+    return {
+        "id": record_id("municipality", name),
+        "text": row.get("text_for_embedding") or row.get("summary") or "",
+        "content": row.get("summary") or "No detailed description available",
+        "metadata": {
+            "type": "municipality",
+            "name": name,
+            "town": name,
+            "location": name,
+            "latitude": latitude,
+            "longitude": longitude,
+            "coordinates": f"{latitude}, {longitude}",
+            "primary_category": "Municipality",
+            "secondary_category": "Town",
+            "images": _image_urls(_literal(row.get("image_urls"), [])),
+            "google_maps_url": str(row.get("google_maps_url") or "")
+        }
+    }
+
+def _read_rows(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+def load_landmarks(path: str) -> List[Dict[str, Any]]:
+    """Load landmark records from the structured landmarks CSV."""
+    return _unique_ids([landmark_record(row) for row in _read_rows(path)])
+
+def load_municipalities(path: str) -> List[Dict[str, Any]]:
+    """Load municipality records from the structured municipalities CSV."""
+    return _unique_ids([municipality_record(row) for row in _read_rows(path)])
+
+def load_corpus(landmarks_csv: Optional[str] = None, municipalities_csv: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load every landmark and municipality record that has a source file."""
+    records = []
+    if landmarks_csv:
+        records.extend(load_landmarks(landmarks_csv))
+    if municipalities_csv:
+        records.extend(load_municipalities(municipalities_csv))
+    return records
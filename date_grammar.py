@@ -0,0 +1,226 @@
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+# Patterns are written against lowercased, accent-stripped text
+MONTHS: Dict[str, int] = {
+    "january": 1, "jan": 1, "enero": 1, "ene": 1,
+    "february": 2, "feb": 2, "febrero": 2,
+    "march": 3, "mar": 3, "marzo": 3,
+    "april": 4, "apr": 4, "abril": 4, "abr": 4,
+    "may": 5, "mayo": 5,
+    "june": 6, "jun": 6, "junio": 6,
+    "july": 7, "jul": 7, "julio": 7,
+    "august": 8, "aug": 8, "agosto": 8, "ago": 8,
+    "september": 9, "sept": 9, "sep": 9, "septiembre": 9, "setiembre": 9, "set": 9,
+    "october": 10, "oct": 10, "octubre": 10,
+    "november": 11, "nov": 11, "noviembre": 11,
+    "december": 12, "dec": 12, "diciembre": 12, "dic": 12
+}
+# Month spellings that are also everyday words ("may I", "el mar", "set")
+AMBIGUOUS_MONTHS = {"may", "mar", "set", "ago", "jan"}
+
+NUMBERS: Dict[str, int] = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "couple": 2, "a couple": 2, "a couple of": 2, "few": 3, "a few": 3,
+    "un": 1, "uno": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5, "seis": 6,
+    "siete": 7, "ocho": 8, "nueve": 9, "diez": 10, "once": 11, "doce": 12, "par": 2, "un par de": 2
+}
+UNITS: Dict[str, str] = {
+    "day": "days", "days": "days", "dia": "days", "dias": "days",
+    "week": "weeks", "weeks": "weeks", "semana": "weeks", "semanas": "weeks",
+    "month": "months", "months": "months", "mes": "months", "meses": "months",
+    "year": "years", "years": "years", "ano": "years", "anos": "years"
+}
+# Seasons by their first month (northern hemisphere, as visitors use them)
+SEASONS: Dict[str, int] = {
+    "spring": 3, "primavera": 3,
+    "summer": 6, "verano": 6,
+    "fall": 9, "autumn": 9, "otono": 9,
+    "winter": 12, "invierno": 12
+}
+# Season words that are also everyday words ("I might fall", "hot spring")
+AMBIGUOUS_SEASONS = {"fall", "spring"}
+# Holidays visitors plan around, as (month, day)
+HOLIDAYS: Dict[str, Tuple[int, int]] = {
+    "christmas": (12, 25), "navidad": (12, 25), "navidades": (12, 20),
+    "new year": (1, 1), "new years": (1, 1), "ano nuevo": (1, 1), "fin de ano": (12, 31),
+    "three kings day": (1, 6), "dia de reyes": (1, 6), "reyes": (1, 6),
+    "spring break": (3, 10), "thanksgiving": (11, 22), "accion de gracias": (11, 22),
+    "easter": (4, 1), "semana santa": (4, 1)
+}
+
+def _alternation(words) -> str:
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+_MONTH = rf"(?P<month>{_alternation(MONTHS)})"
+_NUMBER = rf"(?P<number>\d{{1,3}}|{_alternation(NUMBERS)})"
+_UNIT = rf"(?P<unit>{_alternation(UNITS)})"
+_SEASON = rf"(?P<season>{_alternation(SEASONS)})"
+_DAY = r"(?P<day>[0-3]?\d)(?:st|nd|rd|th|ro)?"
+_YEAR = r"(?P<year>\d{4}|'\d{2})"
+_NEXT = r"(?:next|upcoming|coming|proximo|proxima|siguiente)"
+_THIS = r"(?:this|este|esta)"
+_THAT_COMES = r"(?:que\s+viene|entrante|proximo|proxima)"
+
+_NUMERIC_DATE = re.compile(r"\b(?P<a>\d{1,2})[/.-](?P<b>\d{1,2})[/.-](?P<year>\d{4}|\d{2})\b")
+_ISO_DATE = re.compile(r"\b(?P<year>\d{4})-(?P<month>\d{1,2})(?:-(?P<day>\d{1,2}))?\b")
+_MONTH_YEAR = re.compile(r"\b(?P<month>\d{1,2})[/-](?P<year>\d{4})\b")
+_RELATIVE = re.compile(
+    rf"\b(?:in|within|after|en|dentro\s+de|de\s+aqui\s+a)\s+(?:the\s+next\s+|los\s+proximos\s+|las\s+proximas\s+)?"
+    rf"(?:about\s+|unos\s+|unas\s+)?{_NUMBER}\s+{_UNIT}\b"
+)
+_FROM_NOW = re.compile(rf"\b{_NUMBER}\s+{_UNIT}\s+(?:from\s+now|from\s+today|later|mas\s+tarde)\b")
+_NEXT_UNIT = re.compile(rf"\b(?:(?:el|la)\s+)?(?P<which>{_NEXT}|{_THIS})\s+{_UNIT}\b")
+_UNIT_THAT_COMES = re.compile(rf"\b(?:el|la)\s+{_UNIT}\s+{_THAT_COMES}\b")
+_HOLIDAY = re.compile(rf"\b(?P<holiday>{_alternation(HOLIDAYS)})(?:'s)?(?:\s+(?:of\s+|de\s+|del\s+)?{_YEAR})?\b")
+_TOMORROW = re.compile(r"\b(?:tomorrow|manana|pasado\s+manana)\b")
+_TODAY = re.compile(r"\b(?:today|tonight|hoy|esta\s+noche)\b")
+# Words before a month or season name that make "may", "mar" or "fall" a date rather than a verb or "sea"
+TEMPORAL_LEADS = {"in", "next", "this", "around", "early", "mid", "late", "during", "until", "by", "proximo", "este"}
+_SEASON_PHRASE = re.compile(
+    rf"\b(?:(?P<next>{_NEXT})\s+|(?P<this>{_THIS})\s+|(?P<lead>{_alternation(TEMPORAL_LEADS)})\s+|(?:el|la)\s+)?"
+    rf"{_SEASON}(?:\s+(?P<comes>{_THAT_COMES}))?(?:\s+(?:of\s+|de\s+|del\s+)?{_YEAR})?\b"
+)
+_MONTH_PHRASE = re.compile(
+    rf"(?:\b(?P<lead>{_alternation(TEMPORAL_LEADS)}|on|for|of|en|para|de|del|el)\s+)?"
+    rf"(?:{_DAY}\s+(?:de\s+|of\s+)?)?\b{_MONTH}\b\.?"
+    rf"(?:\s+(?P<day2>[0-3]?\d)(?:st|nd|rd|th)?\b)?"
+    rf"(?:\s*,?\s*(?:de\s+|del\s+|of\s+)?{_YEAR}\b)?"
+)
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    # Keep date separators, drop other punctuation
+    text = re.sub(r"[^\w/'.-]+", " ", text)
+    text = re.sub(r"(?<!\d)[.-]|[.-](?!\d)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def _year(text: str) -> int:
+    return 2000 + int(text[1:]) if text.startswith("'") else int(text)
+
+def _number(text: str) -> int:
+    return int(text) if text.isdigit() else NUMBERS[text]
+
+def _month_date(month: int, today: datetime, year: Optional[int] = None, day: Optional[int] = None) -> Optional[datetime]:
+    """A date in ``month``, the next one to come when no year is given."""
+    if year is None:
+        year = today.year if month >= today.month else today.year + 1
+        if month == today.month:
+            if day is None:
+                # "December" in December means this one, not the first that already passed
+                return today
+            if day < today.day:
+                year += 1
+    try:
+        date = datetime(year, month, day or 1)
+    except ValueError:
+        date = datetime(year, month, 1)
+    # Today's date at midnight would already count as past
+    return today if date.date() == today.date() else date
+
+def _numeric(match, today: datetime) -> Optional[datetime]:
+    a, b, year = int(match.group("a")), int(match.group("b")), match.group("year")
+    year = int(year) + 2000 if len(year) == 2 else int(year)
+    # Month first like the US visitors writing most of these; fall back to day first
+    month, day = (a, b) if a <= 12 else (b, a)
+    if not 1 <= month <= 12:
+        return None
+    return _month_date(month, today, year, day)
+
+def _iso(match, today: datetime) -> Optional[datetime]:
+    month = int(match.group("month"))
+    if not 1 <= month <= 12:
+        return None
+    return _month_date(month, today, int(match.group("year")), int(match.group("day") or 1))
+
+def _month_year(match, today: datetime) -> Optional[datetime]:
+    month = int(match.group("month"))
+    return _month_date(month, today, int(match.group("year"))) if 1 <= month <= 12 else None
+
+def _shift(today: datetime, unit: str, number: int) -> datetime:
+    if unit == "days":
+        return today + timedelta(days=number)
+    if unit == "weeks":
+        return today + timedelta(weeks=number)
+    return today + relativedelta(**{unit: number})
+
+def _relative(match, today: datetime) -> Optional[datetime]:
+    return _shift(today, UNITS[match.group("unit")], _number(match.group("number")))
+
+def _next_unit(match, today: datetime) -> Optional[datetime]:
+    if match.groupdict().get("which") in ("this", "este", "esta"):
+        return today
+    return _shift(today, UNITS[match.group("unit")], 1)
+
+def _tomorrow(match, today: datetime) -> Optional[datetime]:
+    return today + timedelta(days=2 if match.group(0).startswith("pasado") else 1)
+
+def _today(match, today: datetime) -> Optional[datetime]:
+    return today
+
+def _season(match, today: datetime) -> Optional[datetime]:
+    name = match.group("season")
+    if name in AMBIGUOUS_SEASONS and not any(match.group(g) for g in ("next", "this", "lead", "comes", "year")):
+        return None
+    start = SEASONS[name]
+    if match.group("year"):
+        return _month_date(start, today, _year(match.group("year")))
+    # Months since the season started; inside it, "this summer" is now
+    into = (today.month - start) % 12
+    if into < 3:
+        if match.group("next") or match.group("comes"):
+            started = today.year if today.month >= start else today.year - 1
+            return datetime(started + 1, start, 1)
+        return today
+    return _month_date(start, today)
+
+def _holiday(match, today: datetime) -> Optional[datetime]:
+    month, day = HOLIDAYS[match.group("holiday")]
+    year = match.group("year")
+    return _month_date(month, today, _year(year) if year else None, day)
+
+def _month(match, today: datetime) -> Optional[datetime]:
+    name = match.group("month")
+    day = match.group("day") or match.group("day2")
+    year = match.group("year")
+    if name in AMBIGUOUS_MONTHS and not (match.group("lead") in TEMPORAL_LEADS or day or year):
+        return None
+    return _month_date(MONTHS[name], today, _year(year) if year else None, int(day) if day else None)
+
+# Most specific first; the first rule that matches anywhere in the text wins
+RULES: List[Tuple[str, "re.Pattern", Callable]] = [
+    ("numeric", _NUMERIC_DATE, _numeric),
+    ("iso", _ISO_DATE, _iso),
+    ("month_year", _MONTH_YEAR, _month_year),
+    ("relative", _RELATIVE, _relative),
+    ("from_now", _FROM_NOW, _relative),
+    ("month", _MONTH_PHRASE, _month),
+    ("holiday", _HOLIDAY, _holiday),
+    ("season", _SEASON_PHRASE, _season),
+    ("next_unit", _NEXT_UNIT, _next_unit),
+    ("next_unit", _UNIT_THAT_COMES, _next_unit),
+    ("tomorrow", _TOMORROW, _tomorrow),
+    ("today", _TODAY, _today)
+]
+
+def match_travel_date(text: str, today: Optional[datetime] = None) -> Tuple[Optional[datetime], Optional[str]]:
+    """The travel date in ``text`` and the rule that found it, or ``(None, None)``."""
+    today = today or datetime.now()
+    normalized = _normalize(text)
+    for name, pattern, build in RULES:
+        for match in pattern.finditer(normalized):
+            date = build(match, today)
+            if date is not None:
+                return date, name
+    return None, None
+
+def parse_travel_date(text: str, today: Optional[datetime] = None) -> Optional[datetime]:
+    """Parse an English or Spanish travel date ("December 2026", "next summer",
+    "en 3 meses", "12/15/26"), preferring future dates. None when no rule matches."""
+    return match_travel_date(text, today)[0]
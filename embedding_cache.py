@@ -0,0 +1,223 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry."""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+def _model_slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+class _DiskTier:
+    """Append-only memory-mapped store of float32 vectors for one model.
+
+    ``vectors.f32`` holds a (capacity, dim) matrix and ``keys.txt`` holds one
+    text hash per row, so the cache survives restarts without re-encoding.
+    Writers in several processes (e.g. uvicorn workers) share a directory by
+    taking an ``flock`` on ``keys.lock`` and catching up on rows appended by
+    the others before reserving a new one.
+    """
+
+    def __init__(self, directory: str, model_name: str, initial_capacity: int = 1024):
+        self.directory = os.path.join(directory, _model_slug(model_name))
+        os.makedirs(self.directory, exist_ok=True)
+        self.model_name = model_name
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.keys_path = os.path.join(self.directory, "keys.txt")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.lock_path = os.path.join(self.directory, "keys.lock")
+        self.initial_capacity = initial_capacity
+
+        self.rows: Dict[str, int] = {}
+        self.next_row = 0
+        # Bytes of keys.txt already read into ``rows``
+        self.keys_offset = 0
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self.matrix = None
+
+        with self._locked():
+            self._sync()
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Catch up with the metadata, file size and keys written by other processes."""
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("model") != self.model_name:
+                return
+            self.dim = meta["dim"]
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        if self.matrix is None or size // (4 * self.dim) > self.capacity:
+            self._open()
+        self._load_keys()
+
+    def _open(self) -> None:
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        capacity = size // (4 * self.dim)
+        if capacity == 0:
+            self._grow(self.initial_capacity)
+            return
+        if self.matrix is not None:
+            del self.matrix
+        self.capacity = capacity
+        self.matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim)
+        )
+
+    def _load_keys(self) -> None:
+        if not os.path.exists(self.keys_path):
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self.keys_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn write from a crashed process; ``put`` truncates it
+                    break
+                key = line.decode("utf-8").strip()
+                # Ignore keys whose vector never made it to disk
+                if key and self.next_row < self.capacity:
+                    self.rows[key] = self.next_row
+                self.next_row += 1
+                self.keys_offset += len(line)
+
+    def _grow(self, capacity: int) -> None:
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self.capacity = capacity
+        self.matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.array(self.matrix[row])
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        if key in self.rows:
+            return
+        with self._locked():
+            # Another process may have appended rows (or this very key) since the last put
+            self._sync()
+            if key in self.rows:
+                return
+            if self.dim is None:
+                self.dim = int(vector.shape[0])
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+                self._open()
+            if vector.shape[0] != self.dim:
+                return
+            if os.path.exists(self.keys_path) and os.path.getsize(self.keys_path) > self.keys_offset:
+                with open(self.keys_path, "ab") as f:
+                    f.truncate(self.keys_offset)
+            row = self.next_row
+            if row >= self.capacity:
+                self._grow(max(self.capacity * 2, self.initial_capacity))
+            # Shared mapping: the kernel persists the row even if the process dies
+            self.matrix[row] = vector
+            line = (key + "\n").encode("utf-8")
+            with open(self.keys_path, "ab") as f:
+                f.write(line)
+            self.rows[key] = row
+            self.next_row = row + 1
+            self.keys_offset += len(line)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+class EmbeddingCache:
+    """Normalized-text to vector cache: bounded in-memory LRU plus optional disk tier."""
+
+    def __init__(self, model_name: str, max_entries: int = 2048, disk_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.disk = _DiskTier(disk_dir, model_name) if disk_dir else None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached vector for a query, or None."""
+        key = self.key(text)
+        with self._lock:
+            vector = self.memory.get(key)
+            if vector is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector.tolist()
+            if self.disk is not None:
+                vector = self.disk.get(key)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector.tolist()
+            self.misses += 1
+        return None
+
+    def put(self, text: str, vector: List[float]) -> None:
+        """Store a freshly computed query vector."""
+        key = self.key(text)
+        array = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, array)
+            if self.disk is not None:
+                try:
+                    self.disk.put(key, array)
+                except OSError as e:
+                    print(f"Error writing embedding cache: {str(e)}")
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self.memory),
+                "max_entries": self.max_entries,
+                "disk_entries": len(self.disk) if self.disk is not None else None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,190 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class _Histogram:
+    """Fixed-bucket histogram (non-cumulative counts per bucket)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.total,
+            "mean": self.sum / self.total if self.total else 0.0
+        }
+
+class MicroBatchEncoder:
+    """Merge concurrent single-text encode requests into batched encode calls.
+
+    Requests from any thread or event loop land on one queue. A dispatcher
+    thread collects up to ``max_batch_size`` texts, waiting at most
+    ``max_wait_ms`` after the first one, and hands the batch to ``executor``
+    so the event loop never runs the CPU-bound encode itself.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], List[List[float]]],
+        executor: Optional[Executor] = None,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self.encode_fn = encode_fn
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.batch_sizes = _Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_depths = _Histogram(QUEUE_DEPTH_BUCKETS)
+        self.requests = 0
+        self.batches = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.encode_seconds = 0.0
+
+        self._dispatcher = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text for encoding and return a future for its vector."""
+        if self._closed:
+            raise RuntimeError("MicroBatchEncoder is shut down")
+        future: Future = Future()
+        self._queue.put((text, future))
+        with self._lock:
+            self.requests += 1
+        return future
+
+    def encode(self, text: str) -> List[float]:
+        """Encode one text, blocking the calling thread (not the event loop)."""
+        return self.submit(text).result()
+
+    async def aencode(self, text: str) -> List[float]:
+        """Encode one text without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Encode an already-batched list (e.g. documents) in the executor."""
+        if not texts:
+            return []
+        return self._submit_batch(list(texts)).result()
+
+    async def aencode_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return await asyncio.wrap_future(self._submit_batch(list(texts)))
+
+    def _submit_batch(self, texts: List[str]) -> Future:
+        # encode_fn is submitted directly so process pools only pickle the texts
+        start = time.perf_counter()
+        future = self.executor.submit(self.encode_fn, texts)
+        future.add_done_callback(lambda f: self._record_encode(start))
+        return future
+
+    def _record_encode(self, start: float) -> None:
+        with self._lock:
+            self.encode_seconds += time.perf_counter() - start
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            depth = self._queue.qsize()
+            with self._lock:
+                self.batches += 1
+                self.in_flight += 1
+                self.batch_sizes.observe(len(batch))
+                self.queue_depths.observe(depth)
+                self.max_queue_depth = max(self.max_queue_depth, depth + len(batch))
+
+            try:
+                future = self._submit_batch([text for text, _ in batch])
+            except Exception as e:
+                with self._lock:
+                    self.in_flight -= 1
+                self._fail(batch, e)
+                continue
+            future.add_done_callback(lambda f, batch=batch: self._complete(batch, f))
+
+    def _complete(self, batch: List, future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        error = future.exception()
+        if error is not None:
+            self._fail(batch, error)
+            return
+        for (_, waiter), vector in zip(batch, future.result()):
+            if not waiter.done():
+                waiter.set_result(vector)
+
+    @staticmethod
+    def _fail(batch: List, error: BaseException) -> None:
+        for _, waiter in batch:
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and batch-size distribution for tuning under load."""
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "batches_in_flight": self.in_flight,
+                "encode_seconds": round(self.encode_seconds, 4),
+                "batch_size_histogram": self.batch_sizes.snapshot(),
+                "queue_depth_histogram": self.queue_depths.snapshot()
+            }
+
+    def shutdown(self) -> None:
+        """Stop the dispatcher and the executor."""
+        self._closed = True
+        self._queue.put(None)
+        self._dispatcher.join(timeout=1)
+        self.executor.shutdown(wait=False)
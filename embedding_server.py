@@ -0,0 +1,310 @@
+"""Shared embedding service for multi-worker deployments.
+
+Usage: python -m embedding_server [--socket /tmp/travelbot-embed.sock]
+       [--model intfloat/multilingual-e5-large] [--backend torch]
+
+One process loads the model and serves every uvicorn worker over a Unix
+socket; workers point ``E5Embeddings(remote=...)`` (``EMBED_SERVER_SOCKET``)
+at it instead of loading their own copy. Requests and replies are small
+length-prefixed JSON frames; the vectors themselves are written as float32
+into a shared memory block per connection, so no vector is serialized.
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import signal
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_executor import MicroBatchEncoder
+
+DEFAULT_SOCKET = "/tmp/travelbot-embed.sock"
+_HEADER = struct.Struct("!I")
+# Frames only carry JSON headers and texts, never vectors
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+def _encode_frame(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+async def _read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    return json.loads(await reader.readexactly(length))
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Embedding server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+class EmbeddingServer:
+    """Serves ``encode_fn`` to local clients, batching requests across them.
+
+    Short requests are split into single texts for the shared
+    ``MicroBatchEncoder``, so queries from different workers land in the same
+    ``encode`` call; longer ones (document batches) go straight to the pool.
+    ``encode_fn`` may return a float32 array instead of lists, which skips a
+    round trip through Python floats. Each connection owns one shared memory
+    block that grows as needed and is reused for every reply, which is safe
+    because a connection has at most one request in flight.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Any],
+        socket_path: str = DEFAULT_SOCKET,
+        model_name: str = "",
+        batch_size: int = 32,
+        batch_window_ms: float = 5.0,
+        workers: int = 1
+    ):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.encoder = MicroBatchEncoder(
+            encode_fn,
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed-server"),
+            max_batch_size=batch_size,
+            max_wait_ms=batch_window_ms
+        )
+        self.connections = 0
+        self.requests = 0
+        self.texts = 0
+        self.dimensions: Optional[int] = None
+        self.started = time.time()
+        self._writers = set()
+        self._handlers = set()
+
+    async def _encode(self, texts: List[str]) -> np.ndarray:
+        if len(texts) < self.encoder.max_batch_size:
+            vectors = await asyncio.gather(*(self.encoder.aencode(text) for text in texts))
+        else:
+            vectors = await self.encoder.aencode_batch(texts)
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+    @staticmethod
+    def _block_for(block: Optional[shared_memory.SharedMemory], nbytes: int) -> shared_memory.SharedMemory:
+        if block is not None and block.size >= nbytes:
+            return block
+        size = max(nbytes, 2 * block.size if block is not None else 0, 64 * 1024)
+        if block is not None:
+            block.close()
+            block.unlink()
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    async def _reply(self, request: Dict[str, Any], block) -> Tuple[Dict[str, Any], Any]:
+        op = request.get("op")
+        if op == "encode":
+            texts = request.get("texts") or []
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                return {"error": "texts must be a list of strings"}, block
+            self.requests += 1
+            self.texts += len(texts)
+            if not texts:
+                return {"rows": 0, "dim": self.dimensions or 0}, block
+            array = await self._encode(texts)
+            self.dimensions = array.shape[1]
+            block = self._block_for(block, array.nbytes)
+            np.ndarray(array.shape, dtype=np.float32, buffer=block.buf)[:] = array
+            return {"shm": block.name, "rows": array.shape[0], "dim": array.shape[1]}, block
+        if op == "info":
+            return self.stats(), block
+        return {"error": f"Unknown op {op!r}"}, block
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        self._handlers.add(asyncio.current_task())
+        block = None
+        try:
+            while True:
+                request = await _read_frame(reader)
+                if request is None:
+                    break
+                try:
+                    response, block = await self._reply(request, block)
+                except Exception as e:
+                    print(f"Error serving embedding request: {str(e)}")
+                    response = {"error": str(e)}
+                writer.write(_encode_frame(response))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            print(f"Embedding client connection dropped: {str(e)}")
+        finally:
+            self.connections -= 1
+            self._writers.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            if block is not None:
+                block.close()
+                block.unlink()
+            writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "dimensions": self.dimensions,
+            "pid": os.getpid(),
+            "connections": self.connections,
+            "requests": self.requests,
+            "texts": self.texts,
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "batching": self.encoder.stats()
+        }
+
+    async def serve(self) -> None:
+        """Listen until SIGTERM/SIGINT, then close connections and free their shared memory."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # Only this user's workers may connect; the umask covers the window before chmod
+        old_umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+        print(f"Embedding server for {self.model_name or 'custom encoder'} listening on {self.socket_path}")
+        try:
+            await stop.wait()
+        finally:
+            server.close()
+            # Closed transports read as EOF, so each handler's finally block unlinks its block
+            for writer in list(self._writers):
+                writer.close()
+            if self._handlers:
+                await asyncio.wait(self._handlers, timeout=5)
+            self.encoder.shutdown()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+class _Connection:
+    def __init__(self, socket_path: str, timeout: float):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.block: Optional[shared_memory.SharedMemory] = None
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.sock.sendall(_encode_frame(message))
+        (length,) = _HEADER.unpack(_recv_exactly(self.sock, _HEADER.size))
+        return json.loads(_recv_exactly(self.sock, length))
+
+    def vectors(self, name: str, rows: int, dim: int) -> List[List[float]]:
+        if self.block is None or self.block.name != name:
+            if self.block is not None:
+                self.block.close()
+            self.block = shared_memory.SharedMemory(name=name)
+            # The server owns the block; don't let this process's tracker unlink it at exit
+            resource_tracker.unregister(self.block._name, "shared_memory")
+        return np.ndarray((rows, dim), dtype=np.float32, buffer=self.block.buf).tolist()
+
+    def close(self) -> None:
+        if self.block is not None:
+            self.block.close()
+            self.block = None
+        self.sock.close()
+
+class EmbeddingClient:
+    """Thread-safe client for ``EmbeddingServer`` with a small connection pool."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, connections: int = 4, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[_Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(connections)
+
+    def _call(self, message: Dict[str, Any], fetch: Callable[[_Connection, Dict[str, Any]], Any]) -> Any:
+        with self._slots:
+            # A pooled connection may have gone stale if the server restarted; retry once on a new one
+            for attempt in range(2):
+                try:
+                    connection = self._pool.get_nowait()
+                except queue.Empty:
+                    connection = _Connection(self.socket_path, self.timeout)
+                try:
+                    response = connection.request(message)
+                    if "error" in response:
+                        self._pool.put(connection)
+                        raise RuntimeError(f"Embedding server error: {response['error']}")
+                    result = fetch(connection, response)
+                    self._pool.put(connection)
+                    return result
+                except (OSError, ConnectionError):
+                    connection.close()
+                    if attempt:
+                        raise
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._call(
+            {"op": "encode", "texts": list(texts)},
+            lambda connection, r: connection.vectors(r["shm"], r["rows"], r["dim"]) if r["rows"] else []
+        )
+
+    def info(self) -> Dict[str, Any]:
+        return self._call({"op": "info"}, lambda connection, r: r)
+
+    def wait_ready(self, timeout: float = 60.0) -> Dict[str, Any]:
+        """Block until the server answers, for workers started alongside it."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.info()
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=os.getenv("EMBED_SERVER_SOCKET", DEFAULT_SOCKET))
+    parser.add_argument("--model", default="intfloat/multilingual-e5-large")
+    parser.add_argument("--backend", default=os.getenv("EMBED_BACKEND", "torch"))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("EMBED_BATCH_SIZE", "32")))
+    parser.add_argument("--batch-window-ms", type=float, default=float(os.getenv("EMBED_BATCH_WINDOW_MS", "5")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("EMBED_WORKERS", "1")))
+    args = parser.parse_args()
+
+    from embeddings import load_model
+    model = load_model(args.model, args.backend)
+    server = EmbeddingServer(
+        lambda texts: model.encode(texts, convert_to_tensor=False),
+        socket_path=args.socket,
+        model_name=args.model if args.backend == "torch" else f"{args.model}@{args.backend}",
+        batch_size=args.batch_size,
+        batch_window_ms=args.batch_window_ms,
+        workers=args.workers
+    )
+    asyncio.run(server.serve())
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,140 @@
-from typing import List
-from sentence_transformers import SentenceTransformer
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from langchain.embeddings.base import Embeddings
+from embedding_cache import EmbeddingCache
+from embedding_executor import MicroBatchEncoder
+import metrics
+
+BACKENDS = ("torch", "int8", "onnx")
+
+def load_model(model_name: str, backend: str = "torch") -> "SentenceTransformer":
+    """Load the model with the chosen CPU backend.
+
+    ``torch`` is the fp32 baseline, ``int8`` applies PyTorch dynamic
+    quantization to the Linear layers and ``onnx`` runs an ONNX Runtime
+    export (needs sentence-transformers>=3.2 with the onnx extra).
+    """
+    # Imported here so remote clients never load torch
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+    if backend == "onnx":
+        return SentenceTransformer(model_name, backend="onnx")
+    raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {BACKENDS}")
+
+# Model held by each worker when encoding runs in a process pool
+_worker_model = None
+
+def _init_worker(model_name: str, backend: str = "torch") -> None:
+    """Load the model once per pool process."""
+    global _worker_model
+    _worker_model = load_model(model_name, backend)
+
+def _encode_in_worker(texts: List[str]) -> List[List[float]]:
+    """Encode a batch inside a pool process."""
+    return _worker_model.encode(texts, convert_to_tensor=False).tolist()
 
 class E5Embeddings(Embeddings):
     """E5 embeddings wrapper for langchain."""
-    
-    def __init__(self, model_name: str = "intfloat/multilingual-e5-large"):
-        """Initialize the E5 model."""
-        self.model = SentenceTransformer(model_name)
-    
+
+    def __init__(
+        self,
+        model_name: str = "intfloat/multilingual-e5-large",
+        batch_size: int = 32,
+        batch_window_ms: float = 5.0,
+        executor: str = "thread",
+        workers: int = 1,
+        cache_size: int = 2048,
+        cache_dir: Optional[str] = None,
+        backend: str = "torch",
+        remote: Optional[str] = None
+    ):
+        """Initialize the E5 model.
+
+        Encodes run in a ``thread`` or ``process`` pool. Concurrent queries are
+        merged into one ``encode`` call of up to ``batch_size`` texts collected
+        within ``batch_window_ms``. Query vectors are cached in an LRU of
+        ``cache_size`` entries and, when ``cache_dir`` is set, on disk per model.
+        ``backend`` selects the CPU inference backend (see ``load_model``).
+        With ``remote`` set to an ``embedding_server`` socket path, no model is
+        loaded here and batches are encoded by the shared server process; the
+        disk tier is skipped then.
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.cache = None
+        if cache_size:
+            # Backends produce slightly different vectors, so they don't share a cache
+            cache_name = model_name if backend == "torch" else f"{model_name}@{backend}"
+            # Remote clients keep queries in memory; the shared server does the encoding
+            disk_dir = None if remote else cache_dir
+            self.cache = EmbeddingCache(cache_name, max_entries=cache_size, disk_dir=disk_dir)
+        self.remote = None
+        if remote:
+            from embedding_server import EmbeddingClient
+            self.model = None
+            self.remote = EmbeddingClient(remote, connections=max(1, workers))
+            pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="e5-remote")
+            encode_fn = self.remote.encode
+        elif executor == "process":
+            # Each worker process loads its own copy of the model
+            self.model = None
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(model_name, backend)
+            )
+            encode_fn = _encode_in_worker
+        else:
+            self.model = load_model(model_name, backend)
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="e5-encode")
+            encode_fn = self._encode
+        self.encoder = MicroBatchEncoder(
+            encode_fn, pool, max_batch_size=batch_size, max_wait_ms=batch_window_ms
+        )
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Run the model on a batch of texts."""
+        return self.model.encode(texts, convert_to_tensor=False).tolist()
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a list of documents."""
-        embeddings = self.model.encode(texts, convert_to_tensor=False)
-        return embeddings.tolist()
-    
+        return self.encoder.encode_batch(texts)
+
     def embed_query(self, text: str) -> List[float]:
         """Generate embeddings for a query."""
-        embedding = self.model.encode(text, convert_to_tensor=False)
-        return embedding.tolist() 
\ No newline at end of file
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+        with metrics.span("embedding"):
+            embedding = self.encoder.encode(text)
+        if self.cache is not None:
+            self.cache.put(text, embedding)
+        return embedding
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Generate document embeddings off the event loop."""
+        return await self.encoder.aencode_batch(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Generate a query embedding off the event loop, batched with other sessions."""
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+        with metrics.span("embedding"):
+            embedding = await self.encoder.aencode(text)
+        if self.cache is not None:
+            self.cache.put(text, embedding)
+        return embedding
+
+    def stats(self) -> Dict[str, Any]:
+        """Batching and cache statistics."""
+        stats = self.encoder.stats()
+        stats["cache"] = self.cache.stats() if self.cache is not None else None
+        stats["remote"] = self.remote.socket_path if self.remote is not None else None
+        return stats
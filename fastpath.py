@@ -0,0 +1,131 @@
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Patterns are written against lowercased, accent-stripped text
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "primero": 1, "primera": 1, "segundo": 2, "segunda": 2,
+    "tercero": 3, "tercera": 3, "tercer": 3, "cuarto": 4, "cuarta": 4,
+    "quinto": 5, "quinta": 5,
+    "uno": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5
+}
+_ITEM = r"(?:\d{1,2}|" + "|".join(sorted(_ORDINALS, key=len, reverse=True)) + r")"
+_ITEM_PREFIX = r"(?:(?:the|el|la|los|las)\s+)?(?:(?:numbers?|numeros?|options?|opcion|opciones|no\.?|#)\s*)?"
+_SEPARATOR = r"(?:\s*,\s*|\s+(?:and|y|e)\s+|\s*&\s*|\s*,\s*(?:and|y)\s+|\s+)"
+_ADD = r"(?:add|save|include|put|agrega|agregar|agregame|agregue|anade|anadir|anademe|incluye|incluir|guarda|guardar|pon)"
+_POLITE = r"(?:(?:please|pls|por favor)\s+)?"
+_POLITE_END = r"(?:\s+(?:please|pls|por favor))?"
+_TO_LIST = r"(?:\s+(?:to|on|in|into|a|en)\s+(?:my|the|mi|la)\s+(?:list|itinerary|lista|itinerario))?"
+
+_ADD_SELECTIONS = re.compile(
+    rf"^{_POLITE}{_ADD}\s+(?P<items>{_ITEM_PREFIX}{_ITEM}(?:{_SEPARATOR}{_ITEM_PREFIX}{_ITEM})*){_TO_LIST}{_POLITE_END}$"
+)
+_ADD_ALL = re.compile(
+    rf"^{_POLITE}(?:{_ADD}\s+(?:them\s+all|all(?:\s+of\s+them)?|everything|all\s+(?:three|the\s+places|places)"
+    rf"|todos?(?:\s+ellos)?|todas?(?:\s+ellas)?|todo\s+eso)|agregalos\s+todos|anadelos\s+todos){_TO_LIST}{_POLITE_END}$"
+)
+_SHOW_LIST = re.compile(
+    rf"^{_POLITE}(?:(?:show|see|view|display|check)(?:\s+me)?\s+(?:my|the)\s+(?:current\s+)?(?:list|itinerary)"
+    rf"|what(?:'s|\s+is)\s+(?:on|in)\s+my\s+(?:list|itinerary)|my\s+(?:list|itinerary)"
+    rf"|(?:muestra(?:me)?|mostrar|ver|ensename)\s+(?:mi|la)\s+(?:lista|itinerario)|mi\s+(?:lista|itinerario)){_POLITE_END}$"
+)
+_THANKS = re.compile(
+    r"^(?:(?:thanks?|thank\s+you|thx|ty|tysm)(?:\s+(?:so|very)\s+much|\s+a\s+lot)?(?:\s+for\s+(?:the|your)\s+help)?"
+    r"|(?:i\s+)?appreciate\s+it|that\s+was\s+(?:very\s+)?helpful"
+    r"|(?:muchas|mil)?\s*gracias(?:\s+por\s+(?:la|tu)\s+ayuda)?)$"
+)
+_FINALIZE = re.compile(
+    r"^(?:finali[sz]e(?:\s+(?:my|the)\s+(?:list|itinerary|plan))?|let'?s\s+finish|i'?m\s+done|we'?re\s+done"
+    r"|(?:that'?s|that\s+is)\s+(?:all|it)|finalizar|terminar|eso\s+es\s+todo|ya\s+termine)$"
+)
+_ITEM_TOKEN = re.compile(rf"\b{_ITEM}\b")
+_TRAILING = re.compile(r"[\s.!?¡¿,;:)(]+$")
+_LEADING = re.compile(r"^[\s¡¿(]+")
+_SPACES = re.compile(r"\s+")
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.replace("’", "'")
+    text = _LEADING.sub("", _TRAILING.sub("", text))
+    return _SPACES.sub(" ", text)
+
+def _selections(items: str) -> List[int]:
+    numbers = []
+    for token in _ITEM_TOKEN.findall(items):
+        number = int(token) if token.isdigit() else _ORDINALS[token]
+        if number not in numbers:
+            numbers.append(number)
+    return numbers
+
+class FastPathClassifier:
+    """Rule-based pre-classifier for command-like turns (English and Spanish).
+
+    Recognizes unambiguous itinerary commands and thanks, and returns the same
+    context fields the query-analysis chain would produce. Anything else
+    returns None and goes to the LLM.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.hits: Dict[str, int] = {}
+
+    def classify(self, user_input: str) -> Optional[Dict[str, str]]:
+        """Return context fields for a command-like turn, or None."""
+        result = self._match(_normalize(user_input))
+        with self._lock:
+            self.turns += 1
+            if result:
+                self.hits[result["intent"]] = self.hits.get(result["intent"], 0) + 1
+        return result
+
+    def _match(self, text: str) -> Optional[Dict[str, str]]:
+        if not text or len(text) > 80:
+            return None
+
+        if _ADD_ALL.match(text):
+            return self._context("add_to_itinerary", "selections=all", "Add all suggested items")
+
+        match = _ADD_SELECTIONS.match(text)
+        if match:
+            numbers = _selections(match.group("items"))
+            if numbers:
+                joined = ",".join(str(n) for n in numbers)
+                return self._context(
+                    "add_to_itinerary", f"selections={joined}",
+                    f"Add items {joined} from the last suggestions"
+                )
+
+        if _SHOW_LIST.match(text):
+            return self._context("show_itinerary", "", "Show the current list")
+        if _THANKS.match(text):
+            return self._context("thanking", "gratitude", "Process thank you")
+        if _FINALIZE.match(text):
+            return self._context("finalize", "", "Finalize the itinerary")
+        return None
+
+    @staticmethod
+    def _context(intent: str, specifics: str, query: str) -> Dict[str, str]:
+        return {
+            "intent": intent,
+            "search_type": "any",
+            "location": "any",
+            "specifics": specifics,
+            "query": query
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Fraction of analyzed turns that skipped the query-analysis LLM call."""
+        with self._lock:
+            skipped = sum(self.hits.values())
+            return {
+                "turns": self.turns,
+                "fast_path_turns": skipped,
+                "llm_turns": self.turns - skipped,
+                "skip_ratio": skipped / self.turns if self.turns else 0.0,
+                "by_intent": dict(self.hits)
+            }
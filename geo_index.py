@@ -0,0 +1,186 @@
+import json
+import math
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from search_filters import normalize
+from vectorstore import matches_filter
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+_COORDINATES = re.compile(r"(-?\d+(?:\.\d+)?)\s*°?\s*([NS])?\s*,?\s*(-?\d+(?:\.\d+)?)\s*°?\s*([EW])?", re.I)
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many, in kilometres (degrees in)."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def coordinates_of(metadata: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Latitude/longitude from record metadata; (0, 0) is the notebooks' placeholder."""
+    try:
+        lat, lon = float(metadata.get("latitude")), float(metadata.get("longitude"))
+    except (TypeError, ValueError):
+        match = _COORDINATES.search(str(metadata.get("coordinates") or ""))
+        if not match:
+            return None
+        lat, lon = float(match.group(1)), float(match.group(3))
+        if (match.group(2) or "").upper() == "S":
+            lat = -abs(lat)
+        if (match.group(4) or "").upper() == "W":
+            lon = -abs(lon)
+    if lat == 0.0 and lon == 0.0:
+        return None
+    # Some rows give Puerto Rico's longitude without the western sign
+    if 17.0 <= lat <= 19.0 and 64.0 <= lon <= 68.5:
+        lon = -lon
+    return lat, lon
+
+class GeoIndex:
+    """Uniform lat/lon grid over landmarks and municipality centroids.
+
+    Each cell holds the row numbers of the places inside it, so a radius
+    query only measures the places in the few cells the circle overlaps and
+    k-nearest grows the circle until it holds ``k`` places. Filters use the
+    same Pinecone-style syntax as the vector stores.
+    """
+
+    def __init__(self, documents: Iterable[Document], cell_degrees: float = 0.05, mask_cache_size: int = 64):
+        self.cell_degrees = cell_degrees
+        self._documents: List[Document] = []
+        lats, lons = [], []
+        self._names: Dict[str, int] = {}
+        for document in documents:
+            point = coordinates_of(document.metadata or {})
+            if point is None:
+                continue
+            name = normalize(str(document.metadata.get("name", "")).replace("_", " "))
+            # Municipalities win name clashes so "Ponce" locates the town centroid
+            if name and (name not in self._names or document.metadata.get("type") == "municipality"):
+                self._names[name] = len(self._documents)
+            self._documents.append(document)
+            lats.append(point[0])
+            lons.append(point[1])
+        self._lat = np.asarray(lats, dtype=np.float64)
+        self._lon = np.asarray(lons, dtype=np.float64)
+
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for row, (lat, lon) in enumerate(zip(lats, lons)):
+            cells.setdefault(self._cell(lat, lon), []).append(row)
+        self._cells = {cell: np.asarray(rows, dtype=np.int64) for cell, rows in cells.items()}
+        self._mask_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._mask_cache_size = mask_cache_size
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], **kwargs: Any) -> "GeoIndex":
+        """Build from corpus records (see ``corpus.py``)."""
+        return cls(
+            (Document(id=r["id"], page_content=r["content"], metadata=r["metadata"]) for r in records),
+            **kwargs
+        )
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def _mask(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filter:
+            return None
+        key = json.dumps(filter, sort_keys=True, default=str)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (matches_filter(d.metadata, filter) for d in self._documents),
+                dtype=bool, count=len(self._documents)
+            )
+            self._mask_cache[key] = mask
+            if len(self._mask_cache) > self._mask_cache_size:
+                self._mask_cache.popitem(last=False)
+        else:
+            self._mask_cache.move_to_end(key)
+        return mask
+
+    def _rows_near(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Rows in every cell the circle overlaps (a superset of the answer)."""
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        lat_lo, lon_lo = self._cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = self._cell(lat + dlat, lon + dlon)
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > len(self._cells):
+            return np.arange(len(self._documents))
+        found = [
+            rows
+            for i in range(lat_lo, lat_hi + 1)
+            for j in range(lon_lo, lon_hi + 1)
+            for rows in (self._cells.get((i, j)),)
+            if rows is not None
+        ]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        filter: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """Places within ``radius_km``, closest first, as ``(document, km)``."""
+        rows = self._rows_near(lat, lon, radius_km)
+        mask = self._mask(filter)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if len(rows) == 0:
+            return []
+        distances = haversine_km(lat, lon, self._lat[rows], self._lon[rows])
+        inside = distances <= radius_km
+        rows, distances = rows[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return [(self._documents[int(rows[i])], float(distances[i])) for i in order]
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        max_km: float = 250.0
+    ) -> List[Tuple[Document, float]]:
+        """The ``k`` closest places within ``max_km``, as ``(document, km)``."""
+        radius = self.cell_degrees * KM_PER_DEGREE
+        while True:
+            radius = min(radius, max_km)
+            results = self.within(lat, lon, radius, filter)
+            # Once the circle holds k places, nothing outside it can be closer
+            if len(results) >= k or radius >= max_km:
+                return results[:k]
+            radius *= 2
+
+    def find(self, name: str) -> Optional[Document]:
+        """The town or landmark with this name, if it has coordinates."""
+        row = self._names.get(normalize(name.replace("_", " ")))
+        return None if row is None else self._documents[row]
+
+    def locate(self, name: str) -> Optional[Tuple[float, float]]:
+        """Coordinates of a town or landmark by name."""
+        row = self._names.get(normalize(name.replace("_", " ")))
+        if row is None:
+            return None
+        return float(self._lat[row]), float(self._lon[row])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "places": len(self._documents),
+            "cells": len(self._cells),
+            "cell_degrees": self.cell_degrees,
+            "max_cell_size": max((len(rows) for rows in self._cells.values()), default=0)
+        }
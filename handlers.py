@@ -1,15 +1,45 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import re
+import asyncio
 from chains.qa_chain import PlaceQAChain
+from answer_cache import question_aspect
 from state import StateManager
-from prompts import DATE_VALIDATION_PROMPT
-from langchain_core.output_parsers import StrOutputParser
+from seasons import season_for
+from results import SearchResult, render_search_results
+from planner import format_clock, plan_days, stop_from_metadata
+from date_grammar import parse_travel_date
 import dateparser
 from difflib import get_close_matches
 
+_DATE_PUNCTUATION = re.compile(r'[,.!?]')
+_DATE_SPACES = re.compile(r'\s+')
+# Conversational filler stripped before dateparser, compiled once
+_DATE_FILLER = [
+    re.compile(r'^hi\b\s*', re.IGNORECASE),
+    re.compile(r'^hello\b\s*', re.IGNORECASE),
+    re.compile(r'^hey\b\s*', re.IGNORECASE),
+    re.compile(r'^\s*i\'*\s*am\s*', re.IGNORECASE),
+    re.compile(r'^\s*i\'*m\s*', re.IGNORECASE),
+    re.compile(r'\s*planning\s*to\s*', re.IGNORECASE),
+    re.compile(r'\s*thinking\s*of\s*', re.IGNORECASE),
+    re.compile(r'\s*going\s*to\s*', re.IGNORECASE),
+    re.compile(r'\s*want\s*to\s*', re.IGNORECASE),
+    re.compile(r'\s*would\s*like\s*to\s*', re.IGNORECASE),
+    re.compile(r'\s*visiting\s*', re.IGNORECASE),
+    re.compile(r'\s*travel\s*', re.IGNORECASE),
+    re.compile(r'\s*visit\s*', re.IGNORECASE),
+    re.compile(r'\s*there\s*', re.IGNORECASE),
+    re.compile(r'\s*around\s*', re.IGNORECASE),
+    re.compile(r'\s*about\s*', re.IGNORECASE),
+    re.compile(r'\s*maybe\s*', re.IGNORECASE),
+    re.compile(r'\s*probably\s*', re.IGNORECASE),
+    re.compile(r'\s*in\s+(?=\w+\s+\d{4})', re.IGNORECASE),  # Remove 'in' only when followed by month year
+    re.compile(r'^\s*in\s+(?=\d+)', re.IGNORECASE)  # Remove 'in' when followed by number
+]
+
 class BaseHandler(ABC):
     """Base class for all handlers."""
     
@@ -17,12 +47,19 @@ class BaseHandler(ABC):
     async def handle(self, context: Dict[str, Any]) -> str:
         """Handle the intent with given context."""
         pass
+    
+    async def stream(self, context: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the response in chunks. Handlers without an LLM answer send it whole."""
+        yield await self.handle(context)
 
 class ItineraryHandler(BaseHandler):
     """Handler for itinerary-related intents."""
     
-    def __init__(self, state_manager):
+    def __init__(self, state_manager, geo_index=None):
+        """``geo_index`` is an optional ``GeoIndex``; with it the list is shown as
+        per-day routes ordered by the places' coordinates and visit times."""
         self.state = state_manager
+        self.geo_index = geo_index
     
     async def handle(self, context: Dict[str, Any]) -> str:
         intent = context.get("intent")
@@ -80,7 +117,7 @@ class ItineraryHandler(BaseHandler):
             # Handle "add all" case
             if "selections=all" in specifics:
                 for suggestion in last_suggestions:
-                    name = suggestion.get('name', '')
+                    name = suggestion.name
                     if name and name not in self.state.get_state("itinerary"):
                         self.state.get_state("itinerary").append(name)
                         added_places.append(name)
@@ -94,7 +131,7 @@ class ItineraryHandler(BaseHandler):
                 for num in selections:
                     if 0 < num <= len(last_suggestions):
                         suggestion = last_suggestions[num-1]
-                        name = suggestion.get('name', '')
+                        name = suggestion.name
                         if name and name not in self.state.get_state("itinerary"):
                             self.state.get_state("itinerary").append(name)
                             added_places.append(name)
@@ -134,10 +171,7 @@ class ItineraryHandler(BaseHandler):
             • Start over with a new plan? 🆕
             """
         
-        formatted_items = []
-        for item in itinerary:
-            display_name = item.replace('_', ' ').title()
-            formatted_items.append(f"✅ {display_name}")
+        formatted_items = self._itinerary_lines(itinerary)
         
         return f"""
         📋 Here's your current list:
@@ -156,22 +190,54 @@ class ItineraryHandler(BaseHandler):
         if not itinerary:
             return "Your list is empty."
         
-        formatted_items = []
+        return chr(10).join(self._itinerary_lines(itinerary))
+    
+    def _itinerary_lines(self, itinerary: List[str]) -> List[str]:
+        """One line per place, grouped into day routes when coordinates are known."""
+        stops, unplaced = [], []
         for item in itinerary:
-            display_name = item.replace('_', ' ').title()
-            formatted_items.append(f"✅ {display_name}")
+            doc = self.geo_index.find(item) if self.geo_index else None
+            stop = stop_from_metadata(doc.metadata) if doc else None
+            if stop:
+                stops.append(stop._replace(name=item))
+            else:
+                unplaced.append(item)
         
-        return chr(10).join(formatted_items)
+        if len(stops) < 2:
+            return [f"✅ {item.replace('_', ' ').title()}" for item in itinerary]
+        
+        lines = []
+        for number, day in enumerate(plan_days(stops), 1):
+            lines.append(f"🗓️ Day {number}")
+            for visit in day:
+                drive = f" (🚗 {visit.travel_minutes:.0f} min)" if visit.travel_minutes else ""
+                lines.append(f"✅ {format_clock(visit.arrive)} {visit.stop.name.replace('_', ' ').title()}{drive}")
+        if unplaced:
+            lines.append("📍 Anytime")
+            lines.extend(f"✅ {item.replace('_', ' ').title()}" for item in unplaced)
+        return lines
+
+_NEARBY = re.compile(r"\b(?:near(?:by)?|close\s+to|around|cerca(?:\s+de)?|alrededor\s+de)\b", re.IGNORECASE)
 
 class SearchHandler(BaseHandler):
     """Handler for search-related intents."""
     
-    def __init__(self, retriever, index, llm, location_chain, state_manager):
+    # Proximity searches return this many places within this distance
+    NEARBY_RESULTS = 5
+    NEARBY_MAX_KM = 30.0
+    
+    def __init__(self, retriever, index, llm, location_chain, state_manager, filters=None, geo_index=None):
+        """``filters`` is an optional ``SearchFilters``; when set, the search type
+        and location are pushed down to the vector store as metadata filters.
+        ``geo_index`` is an optional ``GeoIndex`` that answers "near X" searches
+        and the nearby-towns fallback by distance instead of another retrieval."""
         self.retriever = retriever
         self.index = index
         self.llm = llm
         self.location_chain = location_chain
         self.state = state_manager
+        self.filters = filters
+        self.geo_index = geo_index
     
     async def handle(self, context: Dict[str, Any]) -> str:
         """Handle search queries."""
@@ -187,83 +253,73 @@ class SearchHandler(BaseHandler):
             # Store suggestions in state
             self._store_suggestions(results)
             
-            return results
+            if not results:
+                return await self._handle_no_results(search_type, location)
+            return render_search_results(results)
             
         except Exception as e:
             print(f"Error in SearchHandler: {str(e)}")
+            self._store_suggestions([])
             return "Sorry, I had trouble searching. Could you try rephrasing your request?"
     
-    def _store_suggestions(self, results: str) -> None:
-        """Store formatted results as suggestions."""
-        suggestions = []
-        
-        # Parse the formatted results string
-        sections = results.split("\n\n")
-        for section in sections:
-            if section.strip().startswith(("1️⃣", "2️⃣", "3️⃣", "4️⃣")):
-                lines = section.strip().split("\n")
-                name = lines[0].split("**")[1].strip()
-                suggestion = {
-                    'name': name,
-                    'description': "\n".join(lines[4:]),  # Get description
-                    'metadata': {
-                        'type': lines[1].replace("🏷️", "").strip(),
-                        'location': lines[2].replace("📍", "").strip()
-                    }
-                }
-                suggestions.append(suggestion)
-        
-        # Store in state
+    def _store_suggestions(self, results: List[SearchResult]) -> None:
+        """Store the results shown to the user so they can be added by number."""
         if self.state:
-            self.state.update_state("last_suggestions", suggestions)
+            self.state.update_state("last_suggestions", results)
     
-    async def _handle_search(self, query: str, search_type: str, location: str, specifics: str) -> str:
-        """Handle search queries with location chain."""
-        try:
-            # Build search query
-            base_query = self._build_search_query(search_type, location, specifics)
-            
-            # Use retriever directly for search
+    async def _handle_search(self, query: str, search_type: str, location: str, specifics: str) -> List[SearchResult]:
+        """Retrieve places matching the search as typed results."""
+        nearby = self._nearby_search(query, search_type, location, specifics)
+        if nearby is not None:
+            return nearby
+        
+        # Build search query
+        base_query = self._build_search_query(search_type, location, specifics)
+        
+        # Use retriever directly for search, narrowed by metadata when the slots map to it
+        search_filter = self.filters.build(search_type, location) if self.filters else None
+        docs = await self.retriever.ainvoke(base_query, filter=search_filter) if search_filter else None
+        if not docs:
+            # Unfiltered, or nothing matched the filter (e.g. the index lacks those keys)
             docs = await self.retriever.ainvoke(base_query)
-            
-            if not docs or not isinstance(docs, list):
-                return await self._handle_no_results(search_type, location)
-            
-            # Convert documents to our format
-            formatted_docs = []
-            for doc in docs:
-                if hasattr(doc, 'page_content'):  # Handle LangChain document format
-                    metadata = doc.metadata or {}
-                    formatted_docs.append({
-                        'name': metadata.get('name', 'Unknown Location'),
-                        'content': doc.page_content,
-                        'metadata': {
-                            'type': metadata.get('type', search_type),
-                            'location': metadata.get('location', location),
-                            'coordinates': metadata.get('coordinates', 'Coordinates not available'),
-                            'town': metadata.get('location', location)
-                        }
-                    })
-                elif isinstance(doc, dict):  # Handle dictionary format
-                    formatted_docs.append({
-                        'name': doc.get('name', 'Unknown Location'),
-                        'content': doc.get('content', doc.get('page_content', '')),
-                        'metadata': {
-                            'type': doc.get('type', search_type),
-                            'location': doc.get('location', location),
-                            'coordinates': doc.get('coordinates', 'Coordinates not available'),
-                            'town': doc.get('location', location)
-                        }
-                    })
-            
-            if not formatted_docs:
-                return await self._handle_no_results(search_type, location)
-                
-            return self._format_search_results(formatted_docs)
-            
-        except Exception as e:
-            print(f"Error in SearchHandler: {str(e)}")
-            return "Sorry, I had trouble searching. Could you pleasetry rephrasing your request?"
+        
+        if not docs or not isinstance(docs, list):
+            return []
+        
+        return [
+            SearchResult.from_document(doc, search_type, location)
+            for doc in docs
+            if hasattr(doc, 'page_content') or isinstance(doc, dict)
+        ]
+    
+    def _anchor(self, location: str):
+        """Name and coordinates of the place a search is centred on, if the geo index knows it."""
+        if self.geo_index is None or location == 'any':
+            return None
+        name = _NEARBY.sub(" ", location).replace(", Puerto Rico", "").strip(" ,")
+        point = self.geo_index.locate(name)
+        return (name, point) if point else None
+    
+    def _nearby_search(self, query: str, search_type: str, location: str, specifics: str):
+        """Answer proximity searches ("beaches near Ponce") from the geo index, or None."""
+        if not _NEARBY.search(" ".join((query, location, specifics))):
+            return None
+        anchor = self._anchor(location)
+        if anchor is None:
+            return None
+        name, (lat, lon) = anchor
+        
+        places_only = {"type": {"$ne": "municipality"}}
+        category_filter = self.filters.category_filter(search_type) if self.filters else None
+        nearby = self.geo_index.nearest(
+            lat, lon, k=self.NEARBY_RESULTS,
+            filter={"$and": [places_only, category_filter]} if category_filter else places_only,
+            max_km=self.NEARBY_MAX_KM
+        )
+        return [
+            SearchResult.from_document(doc, search_type, location)._replace(distance_km=km, distance_from=name)
+            for doc, km in nearby
+        ]
     
     def _build_search_query(self, search_type: str, location: str, specifics: str) -> str:
         """Build a search query based on type and specifics."""
@@ -287,51 +343,32 @@ class SearchHandler(BaseHandler):
             
         return base_query
     
-    def _format_search_results(self, docs: List[Dict]) -> str:
-        """Format search results with enhanced location info."""
-        # Add introduction message
-        formatted_results = ["""
-        🌟 Based on your interests, here are my suggestions for you:
-        """]
-        
-        for i, doc in enumerate(docs, 1):
-            # Get location details
-            location = doc.get('metadata', {}).get('location', '')
-            coordinates = doc.get('metadata', {}).get('coordinates', 'Coordinates not available')
-            town = doc.get('metadata', {}).get('town', 'Town not specified')
-            
-            # Format the result with number emoji
-            number_emoji = f"{i}️⃣"
-            name = doc.get('name', '').replace('_', ' ')
-            
-            result = f"""
-                    {number_emoji} **{name}**
-                    🏷️ {doc.get('metadata', {}).get('type', 'landmark')}
-                    📍 {town}
-                    🌐 {coordinates}
-                    🔗 [View Images]()
-                    💡{doc.get('content', 'No description available')}\n
-            """
-            formatted_results.append(result)
-        
-        # Add closing message
-        formatted_results.append("""
-        Would you like me to add any of these suggestions to your list📝? 
-        You can say:
-        • "Add all of them"
-        • "Add number 1 and 3"
-        • "Add 1,2 and 4"
-        """)
-        
-        return "\n\n".join(formatted_results)
-    
     async def _handle_no_results(self, search_type: str, location: str) -> str:
         """Handle case when no results are found."""
         nearby_suggestions = ""
-        if location != 'any':
-            nearby_docs = await self.retriever.ainvoke(
-                f"Find {search_type} near {location}, Puerto Rico"
-            )
+        anchor = self._anchor(location)
+        if anchor is not None:
+            # Closest towns that have this kind of place, straight from the coordinates
+            name, (lat, lon) = anchor
+            category_filter = self.filters.category_filter(search_type) if self.filters else None
+            towns = []
+            for doc, _ in self.geo_index.nearest(lat, lon, k=20, filter=category_filter):
+                town = doc.metadata.get('town', '')
+                if town and town.lower() != name.lower() and town not in towns:
+                    towns.append(town)
+            if towns:
+                nearby_suggestions = "\n• Try nearby areas: " + ", ".join(towns[:3])
+        elif location != 'any':
+            # Same category anywhere on the island, so the towns suggested actually have it
+            category_filter = self.filters.category_filter(search_type) if self.filters else None
+            if category_filter:
+                nearby_docs = await self.retriever.ainvoke(
+                    f"Find {search_type} near {location}, Puerto Rico", filter=category_filter
+                )
+            else:
+                nearby_docs = await self.retriever.ainvoke(
+                    f"Find {search_type} near {location}, Puerto Rico"
+                )
             if nearby_docs:
                 locations = set(d.metadata.get('town', '') 
                               for d in nearby_docs[:3] 
@@ -372,19 +409,35 @@ class SearchHandler(BaseHandler):
 class QuestionHandler(BaseHandler):
     """Handler for question-related intents."""
     
-    def __init__(self, retriever, llm, state_manager):
+    FOLLOW_UP = """
+            
+            Would you like to:
+            1. Add this place to your list
+            2. Ask another question
+            3. See more suggestions
+            4. Tell me about other interests
+            """
+    
+    def __init__(self, retriever, llm, state_manager, qa_chain=None, speculative=False, answer_cache=None, place_index=None):
         self.retriever = retriever
-        self.qa_chain = PlaceQAChain(llm)
+        self.qa_chain = qa_chain or PlaceQAChain(llm)
         self.llm = llm
         self.state = state_manager
+        # Shared SemanticAnswerCache for grounded answers (None disables it)
+        self.answer_cache = answer_cache
+        # Shared PlaceIndex: questions naming a known place skip retrieval and the relevance check
+        self.place_index = place_index
+        # Speculative mode races the grounded and fallback answers against the
+        # relevance check, spending extra LLM calls to cut question latency
+        self.speculative = speculative
     
     async def handle(self, context: Dict[str, Any]) -> str:
         """Handle the intent with given context."""
         question = context.get("query", "")
         return await self._handle_question(question)
     
-    async def _check_semantic_relevance(self, question: str, docs: List) -> bool:
-        """Enhanced semantic relevance check."""
+    def _subject_in_content(self, question: str, docs: List) -> bool:
+        """Cheap pre-check: does the question's subject appear in the top document?"""
         if not docs or len(docs) == 0:
             return False
             
@@ -392,7 +445,11 @@ class QuestionHandler(BaseHandler):
         subject = question.lower().replace("tell me about ", "").replace("what is ", "")
         
         # Check if the subject appears in the content
-        if subject not in docs[0].page_content.lower():
+        return subject in docs[0].page_content.lower()
+    
+    async def _check_semantic_relevance(self, question: str, docs: List) -> bool:
+        """Enhanced semantic relevance check."""
+        if not self._subject_in_content(question, docs):
             return False
             
         # If subject found, do detailed relevance check
@@ -406,13 +463,113 @@ class QuestionHandler(BaseHandler):
         
         try:
             response = await self.llm.ainvoke(messages)
-            return response.lower().strip() == 'yes'
+            return getattr(response, "content", response).lower().strip() == 'yes'
         except Exception as e:
             print(f"Error in relevance check: {str(e)}")
             return False
     
+    async def stream(self, context: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream the answer as the LLM generates it."""
+        question = context.get("query", "")
+        try:
+            place = self._resolve_place(question)
+            if place is not None:
+                chunks = self._stream_grounded_answer(question, place)
+            else:
+                docs = await self.retriever.ainvoke(question)
+                is_relevant = await self._check_semantic_relevance(question, docs)
+                
+                if docs and is_relevant:
+                    chunks = self._stream_grounded_answer(question, docs[0])
+                else:
+                    chunks = self._stream_gpt_response(question)
+            
+            yield "\n            "
+            async for chunk in chunks:
+                yield chunk
+            yield self.FOLLOW_UP
+            
+        except Exception as e:
+            print(f"Error in QuestionHandler: {str(e)}")
+            yield "Sorry, I had trouble answering that. Could you rephrase your question?"
+    
+    def _resolve_place(self, question: str):
+        """Document for the place the question names, if the place index knows it."""
+        if self.place_index is None:
+            return None
+        return self.place_index.resolve(question)
+    
+    def _qa_inputs(self, question: str, doc) -> Dict[str, Any]:
+        """Inputs for the grounded QA chain."""
+        return {
+            "question": question,
+            "content": doc.page_content,
+            "metadata": doc.metadata,
+            "travel_dates": self.state.get_state("travel_dates")
+        }
+    
+    def _season(self) -> str:
+        """Travel season the answer is tailored to, part of the answer cache key."""
+        season_info = self.state.get_state("season_info") or {}
+        return season_info.get("season") or str(self.state.get_state("travel_dates") or "any")
+    
+    async def _grounded_answer(self, question: str, doc) -> str:
+        """Answer from the document, reusing a cached answer to a similar question."""
+        if not self.answer_cache:
+            return await self.qa_chain.ainvoke(self._qa_inputs(question, doc))
+        
+        season = self._season()
+        aspect = question_aspect(question)
+        vector = await self.answer_cache.embed(question)
+        cached = self.answer_cache.lookup(doc, season, vector, aspect)
+        if cached is not None:
+            return cached
+        
+        response = await self.qa_chain.ainvoke(self._qa_inputs(question, doc))
+        if response != self.qa_chain.ERROR_RESPONSE:
+            self.answer_cache.store(doc, season, vector, response, aspect)
+        return response
+    
+    async def _stream_grounded_answer(self, question: str, doc) -> AsyncIterator[str]:
+        """Stream the grounded answer, or send a cached one in a single chunk."""
+        if not self.answer_cache:
+            async for chunk in self.qa_chain.astream(self._qa_inputs(question, doc)):
+                yield chunk
+            return
+        
+        season = self._season()
+        aspect = question_aspect(question)
+        vector = await self.answer_cache.embed(question)
+        cached = self.answer_cache.lookup(doc, season, vector, aspect)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            async for chunk in self.qa_chain.astream(self._qa_inputs(question, doc), raise_errors=True):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            # A truncated answer must not be cached
+            print(f"Error in QA Chain: {str(e)}")
+            yield self.qa_chain.ERROR_RESPONSE
+            return
+        self.answer_cache.store(doc, season, vector, "".join(chunks), aspect)
+    
     async def _handle_question(self, question: str) -> str:
         """Enhanced question handling with seamless fallback."""
+        place = self._resolve_place(question)
+        if place is not None:
+            try:
+                response = await self._grounded_answer(question, place)
+                return f"""
+            {response}{self.FOLLOW_UP}"""
+            except Exception as e:
+                print(f"Error in QuestionHandler: {str(e)}")
+                return "Sorry, I had trouble answering that. Could you rephrase your question?"
+        if self.speculative:
+            return await self._handle_question_speculative(question)
         try:
             # First try vector search
             docs = await self.retriever.ainvoke(question)
@@ -422,33 +579,57 @@ class QuestionHandler(BaseHandler):
             
             if docs and is_relevant:
                 # Use vector search results
-                doc = docs[0]
-                response = await self.qa_chain.ainvoke({
-                    "question": question,
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "travel_dates": self.state.get_state("travel_dates")
-                })
+                response = await self._grounded_answer(question, docs[0])
             else:
                 # GPT fallback
                 response = await self._get_gpt_response(question)
             
             return f"""
-            {response}
+            {response}{self.FOLLOW_UP}"""
             
-            Would you like to:
-            1. Add this place to your list
-            2. Ask another question
-            3. See more suggestions
-            4. Tell me about other interests
-            """
+        except Exception as e:
+            print(f"Error in QuestionHandler: {str(e)}")
+            return "Sorry, I had trouble answering that. Could you rephrase your question?"
+    
+    async def _handle_question_speculative(self, question: str) -> str:
+        """Answer with the relevance check, grounded answer and fallback in flight together.
+
+        The fallback starts alongside retrieval; once documents arrive the
+        relevance check and grounded answer run concurrently. Whichever answer
+        the relevance verdict rules out is cancelled.
+        """
+        fallback = asyncio.create_task(self._get_gpt_response(question))
+        grounded = None
+        try:
+            docs = await self.retriever.ainvoke(question)
+            
+            if self._subject_in_content(question, docs):
+                grounded = asyncio.create_task(self._grounded_answer(question, docs[0]))
+                is_relevant = await self._check_semantic_relevance(question, docs)
+            else:
+                is_relevant = False
+            
+            if is_relevant:
+                fallback.cancel()
+                response = await grounded
+            else:
+                if grounded:
+                    grounded.cancel()
+                response = await fallback
+            
+            return f"""
+            {response}{self.FOLLOW_UP}"""
             
         except Exception as e:
             print(f"Error in QuestionHandler: {str(e)}")
             return "Sorry, I had trouble answering that. Could you rephrase your question?"
+        finally:
+            for task in (fallback, grounded):
+                if task and not task.done():
+                    task.cancel()
     
-    async def _get_gpt_response(self, question: str) -> str:
-        """Generate response using GPT."""
+    def _gpt_messages(self, question: str) -> List[Dict[str, str]]:
+        """Messages for the general-knowledge fallback."""
         system_prompt = """You are a Puerto Rico Travel Assistant.
         When providing information:
         1. Start by mentioning this is based on general knowledge
@@ -458,19 +639,31 @@ class QuestionHandler(BaseHandler):
         5. Recommend similar places we might have information about
         6. Format with emojis and clear sections"""
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Tell me about {question} in Puerto Rico"}
         ]
-        
-        return await self.llm.ainvoke(messages)
+    
+    async def _get_gpt_response(self, question: str) -> str:
+        """Generate response using GPT."""
+        response = await self.llm.ainvoke(self._gpt_messages(question))
+        return getattr(response, "content", response)
+    
+    async def _stream_gpt_response(self, question: str) -> AsyncIterator[str]:
+        """Stream the general-knowledge fallback answer."""
+        async for chunk in self.llm.astream(self._gpt_messages(question)):
+            text = getattr(chunk, "content", chunk)
+            if text:
+                yield text
 
 class DateHandler(BaseHandler):
     """Handler for date-related interactions."""
     
-    def __init__(self, state_manager, llm):
+    def __init__(self, state_manager, llm, date_chain=None):
         self.state = state_manager
-        self.date_chain = DATE_VALIDATION_PROMPT | llm | StrOutputParser()
+        # Season info comes from the month table; date_chain is optional LLM enrichment
+        self.date_chain = date_chain
+        self._background_tasks = set()
         
         # Common month spellings and variations (English and Spanish)
         self.month_variations = {
@@ -487,39 +680,14 @@ class DateHandler(BaseHandler):
     async def handle(self, context: Dict[str, Any]) -> str:
         """Handle date input and validation."""
         try:
-            date_input = context.get("user_input", "").strip()
+            # A date the query analysis already extracted beats the raw message
+            date_input = (context.get("date") or context.get("user_input", "")).strip()
             current_date = datetime.now()
             
             if not date_input:
                 return "Please provide a date for your visit."
             
-            # Clean the input first
-            cleaned_input = self._clean_date_input(date_input)
-            print(f"Cleaned input: {cleaned_input}")  # Debug print
-            
-            # Try parsing the cleaned input
-            parsed_date = dateparser.parse(
-                cleaned_input,
-                settings={
-                    'PREFER_DATES_FROM': 'future',
-                    'RELATIVE_BASE': current_date,
-                    'PREFER_DAY_OF_MONTH': 'first',
-                    'DATE_ORDER': 'MDY',
-                    'STRICT_PARSING': False
-                }
-            )
-            
-            # If parsing fails, try additional patterns
-            if not parsed_date:
-                # Try extracting just the numeric part for "in X months/years"
-                match = re.search(r'in\s*(\d+)\s*(month|year)s?', cleaned_input)
-                if match:
-                    number = int(match.group(1))
-                    unit = match.group(2)
-                    if unit == 'month':
-                        parsed_date = current_date + relativedelta(months=number)
-                    else:
-                        parsed_date = current_date + relativedelta(years=number)
+            parsed_date = self.parse_date(date_input, current_date)
             
             # If still no valid date, return error
             if not parsed_date:
@@ -551,27 +719,23 @@ class DateHandler(BaseHandler):
             # Format the date consistently
             formatted_date = parsed_date.strftime("%B %Y")
             
-            # Use LLM to get seasonal information
-            date_analysis = await self.date_chain.ainvoke({
-                "date_input": formatted_date,
-                "current_date": current_date.strftime("%B %d, %Y")
-            })
-            
-            # Parse the seasonal information
-            parts = date_analysis.split("|")
-            season = parts[1].strip()
-            weather = parts[2].strip()
-            tips = parts[3].strip()
+            # Get seasonal information from the precomputed month table
+            season_info = season_for(parsed_date)
+            season = season_info["season"]
+            weather = season_info["weather"]
+            tips = season_info["tips"]
             
             # Update state
             self.state.update_state("travel_dates", formatted_date)
-            self.state.update_state("season_info", {
-                "season": season,
-                "weather": weather,
-                "tips": tips
-            })
+            self.state.update_state("season_info", season_info)
             self.state.update_state("current_step", "get_interests")
             
+            # Optional LLM enrichment runs off the response path
+            if self.date_chain is not None:
+                task = asyncio.create_task(self._enrich_season_info(formatted_date, current_date))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            
             return f"""
             Great! You're planning to visit in {formatted_date}.
 
@@ -603,44 +767,82 @@ class DateHandler(BaseHandler):
             • "in 3 months"
             """
 
+    def parse_date(
+        self, date_input: str, current_date: Optional[datetime] = None, fallback: bool = True
+    ) -> Optional[datetime]:
+        """Parse a travel date from conversational text without the LLM, or None.
+        
+        The travel-date grammar handles the usual phrasings; dateparser only
+        sees what it misses, and not at all when ``fallback`` is False.
+        """
+        current_date = current_date or datetime.now()
+        parsed_date = parse_travel_date(date_input, current_date)
+        if parsed_date is not None or not fallback:
+            return parsed_date
+        return self._dateparser_parse(date_input, current_date)
+
+    def _dateparser_parse(self, date_input: str, current_date: datetime) -> Optional[datetime]:
+        """Fallback parse with dateparser after stripping conversational filler."""
+        # Clean the input first
+        cleaned_input = self._clean_date_input(date_input)
+        
+        # Try parsing the cleaned input
+        parsed_date = dateparser.parse(
+            cleaned_input,
+            settings={
+                'PREFER_DATES_FROM': 'future',
+                'RELATIVE_BASE': current_date,
+                'PREFER_DAY_OF_MONTH': 'first',
+                'DATE_ORDER': 'MDY',
+                'STRICT_PARSING': False
+            }
+        )
+        
+        # If parsing fails, try additional patterns
+        if not parsed_date:
+            # Try extracting just the numeric part for "in X months/years"
+            match = re.search(r'in\s*(\d+)\s*(month|year)s?', cleaned_input)
+            if match:
+                number = int(match.group(1))
+                unit = match.group(2)
+                if unit == 'month':
+                    parsed_date = current_date + relativedelta(months=number)
+                else:
+                    parsed_date = current_date + relativedelta(years=number)
+        return parsed_date
+
+    async def _enrich_season_info(self, formatted_date: str, current_date: datetime) -> None:
+        """Append LLM travel tips to the table-based season info."""
+        try:
+            date_analysis = await self.date_chain.ainvoke({
+                "date_input": formatted_date,
+                "current_date": current_date.strftime("%B %d, %Y")
+            })
+            parts = date_analysis.split("|")
+            if len(parts) < 4 or not parts[0].strip().startswith("VALID"):
+                return
+            
+            # Only enrich if the user hasn't changed dates in the meantime
+            season_info = self.state.get_state("season_info")
+            if self.state.get_state("travel_dates") == formatted_date and season_info:
+                season_info["tips"] = f"{season_info['tips']} {parts[3].strip()}"
+        except Exception as e:
+            print(f"Error enriching season info: {str(e)}")
+
     def _clean_date_input(self, date_input: str) -> str:
         """Clean and normalize date input from conversational text."""
         # Convert to lowercase and remove extra spaces
         cleaned = date_input.lower().strip()
         
         # Remove punctuation first (commas, periods, etc.)
-        cleaned = re.sub(r'[,.!?]', '', cleaned)
-        
-        # Common conversational patterns to remove
-        patterns_to_remove = [
-            r'^hi\b\s*',
-            r'^hello\b\s*',
-            r'^hey\b\s*',
-            r'^\s*i\'*\s*am\s*',
-            r'^\s*i\'*m\s*',
-            r'\s*planning\s*to\s*',
-            r'\s*thinking\s*of\s*',
-            r'\s*going\s*to\s*',
-            r'\s*want\s*to\s*',
-            r'\s*would\s*like\s*to\s*',
-            r'\s*visiting\s*',
-            r'\s*travel\s*',
-            r'\s*visit\s*',
-            r'\s*there\s*',
-            r'\s*around\s*',
-            r'\s*about\s*',
-            r'\s*maybe\s*',
-            r'\s*probably\s*',
-            r'\s*in\s+(?=\w+\s+\d{4})',  # Remove 'in' only when followed by month year
-            r'^\s*in\s+(?=\d+)',         # Remove 'in' when followed by number
-        ]
+        cleaned = _DATE_PUNCTUATION.sub('', cleaned)
         
-        # Remove each pattern
-        for pattern in patterns_to_remove:
-            cleaned = re.sub(pattern, ' ', cleaned, flags=re.IGNORECASE)
+        # Remove common conversational patterns
+        for pattern in _DATE_FILLER:
+            cleaned = pattern.sub(' ', cleaned)
         
         # Clean up multiple spaces and trim
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        cleaned = _DATE_SPACES.sub(' ', cleaned).strip()
         
         # Fix common month spellings
         words = cleaned.split()
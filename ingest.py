@@ -0,0 +1,337 @@
+"""Parse the Wikipedia page dumps for landmarks and municipalities into vector records.
+
+Usage: python -m ingest --municipalities data/municipalities.zip
+       [--landmarks data/landmarks.zip] [--towns-from data/municipalities.zip]
+       [--output records.jsonl] [--workers 4]
+
+Members are read straight from the zip archives and parsed in a process
+pool; nothing is extracted to disk. Records use the same
+``{"id", "text", "content", "metadata"}`` shape, ids and metadata keys as
+``corpus.py``, so the search filters and geo features work on either.
+Landmark towns are looked up among the municipality pages, so pass
+``--municipalities`` (or ``--towns-from``) with ``--landmarks``.
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from corpus import record_id
+from search_filters import CATEGORY_KEYWORDS, has_keyword, normalize
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+WIKIPEDIA = "https://en.wikipedia.org"
+_REFERENCES = re.compile(r"\[(?:\d+|[a-z]|citation needed|note \d+)\]")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+# Category labels in the style of the structured CSVs, for pages whose infobox has no type
+CATEGORY_LABELS = {
+    "beaches": "Beach", "museums": "Museum", "churches": "Church", "restaurants": "Restaurant",
+    "historic_sites": "Historic Site", "nature": "Natural Reserve", "nightlife": "Nightlife"
+}
+_LOCATION_ROWS = ("location", "nearest city", "municipality", "city", "town")
+
+def decode_page(raw: bytes) -> str:
+    """Decode a page dump; the scraper saved some pages as a ``b'...'`` repr."""
+    text = raw.decode("utf-8", errors="replace")
+    if text[:2] in ("b'", 'b"'):
+        try:
+            return ast.literal_eval(text).decode("utf-8", errors="replace")
+        except (ValueError, SyntaxError):
+            pass
+    return text
+
+def _clean(text: str) -> str:
+    return _SPACES.sub(" ", _REFERENCES.sub("", text)).strip()
+
+def _article(soup: BeautifulSoup):
+    """The article body (Wikipedia pages have more than one mw-parser-output)."""
+    bodies = soup.find_all("div", class_="mw-parser-output")
+    if not bodies:
+        return soup.body or soup
+    return max(bodies, key=lambda body: len(body.find_all("p", recursive=False)))
+
+def _lead(article) -> str:
+    """Paragraphs before the first section heading."""
+    paragraphs = []
+    for child in article.find_all(["p", "div", "h2"], recursive=False):
+        if child.name == "h2" or "mw-heading" in (child.get("class") or []):
+            break
+        if child.name == "p":
+            text = _clean(child.get_text())
+            if text:
+                paragraphs.append(text)
+    return "\n\n".join(paragraphs)
+
+def _image_url(src: str) -> str:
+    if src.startswith("//"):
+        return "https:" + src
+    if src.startswith("/"):
+        return urljoin(WIKIPEDIA, src)
+    return src
+
+def _images(article, limit: int = 5) -> List[Dict[str, Any]]:
+    """Content images with alt text and captions, skipping icons and small thumbnails."""
+    images, seen = [], set()
+    for img in article.find_all("img"):
+        url = _image_url(img.get("src", ""))
+        if not url.lower().endswith(_IMAGE_EXTENSIONS) or "icon" in url.lower() or url in seen:
+            continue
+        width, height = img.get("width", ""), img.get("height", "")
+        if width.isdigit() and height.isdigit() and (int(width) <= 50 or int(height) <= 50):
+            continue
+        figure = img.find_parent("figure")
+        caption = figure.find("figcaption") if figure else None
+        images.append({
+            "url": url,
+            "width": width or "unknown",
+            "height": height or "unknown",
+            "alt_text": img.get("alt", ""),
+            "caption": caption.get_text(strip=True) if caption else None
+        })
+        seen.add(url)
+        if len(images) >= limit:
+            break
+    return images
+
+def _related_pages(article, limit: int = 5) -> List[str]:
+    pages = []
+    for link in article.find_all("a", href=True):
+        href = link["href"]
+        if href.startswith("/wiki/") and "Puerto_Rico" in href and ":" not in href:
+            url = urljoin(WIKIPEDIA, href)
+            if url not in pages:
+                pages.append(url)
+                if len(pages) >= limit:
+                    break
+    return pages
+
+def _coordinates(soup: BeautifulSoup) -> Tuple[Optional[float], Optional[float]]:
+    geo = soup.find("span", class_="geo")
+    if geo:
+        parts = re.split(r"[;,\s]+", geo.get_text().strip())
+        try:
+            return float(parts[0]), float(parts[1])
+        except (ValueError, IndexError):
+            pass
+    return None, None
+
+def _infobox(soup: BeautifulSoup) -> Dict[str, Any]:
+    """Infobox rows by lowercased label, as their table cells."""
+    rows = {}
+    box = soup.find("table", class_="infobox")
+    if box:
+        for row in box.find_all("tr"):
+            label, value = row.find("th"), row.find("td")
+            if label and value:
+                rows.setdefault(_clean(label.get_text(" ")).lower(), value)
+    return rows
+
+def _town(texts: List[str], towns: Tuple[str, ...]) -> Optional[str]:
+    """The first municipality named in ``texts``, longest names first ("Sabana Grande" over "Sabana")."""
+    keyed = sorted(((normalize(town), town) for town in towns), key=lambda item: len(item[0]), reverse=True)
+    for text in texts:
+        padded = f" {normalize(text)} "
+        for key, town in keyed:
+            if f" {key} " in padded:
+                return town
+    return None
+
+def _category(infobox: Dict[str, Any], name: str) -> str:
+    """The infobox type, else a label guessed from the page name."""
+    for label in ("type", "designation", "category"):
+        if label in infobox:
+            return _clean(infobox[label].get_text(" "))
+    text = normalize(name.replace("_", " "))
+    for canonical, keywords in CATEGORY_KEYWORDS.items():
+        if has_keyword(text, keywords):
+            return CATEGORY_LABELS[canonical]
+    return "Uncategorized"
+
+def parse_page(
+    kind: str, name: str, raw: bytes, parser: str = DEFAULT_PARSER, towns: Tuple[str, ...] = ()
+) -> Dict[str, Any]:
+    """Turn one page dump into a vector record with the metadata ``corpus.py`` gives.
+
+    A landmark's town is the first of ``towns`` (the municipality names)
+    named in its infobox location, else in its lead.
+    """
+    soup = BeautifulSoup(decode_page(raw), parser)
+    heading = soup.find("h1")
+    title = _clean(heading.get_text()) if heading else name
+    article = _article(soup)
+    lead = _lead(article)
+    images = _images(article)
+    latitude, longitude = _coordinates(soup)
+    latitude, longitude = latitude or 0.0, longitude or 0.0
+    label = "Municipality" if kind == "municipality" else "Landmark"
+
+    text = f"{label}: {name}\n\n"
+    if latitude or longitude:
+        text += f"Location: Latitude {latitude}, Longitude {longitude}\n\n"
+    text += f"Description: {lead}\n\nImages Available: {len(images)}"
+
+    metadata = {
+        "type": kind,
+        "name": name,
+        "latitude": latitude,
+        "longitude": longitude,
+        "coordinates": f"{latitude}, {longitude}",
+        "images": [image["url"] for image in images],
+        "title": title,
+        "image_details": images,
+        "related_pages": _related_pages(article),
+        "source_url": urljoin(WIKIPEDIA, "/wiki/" + title.replace(" ", "_"))
+    }
+    if kind == "municipality":
+        metadata.update(town=name, location=name, primary_category="Municipality", secondary_category="Town")
+    else:
+        infobox = _infobox(soup)
+        located = [_clean(infobox[row].get_text(" ")) for row in _LOCATION_ROWS if row in infobox]
+        town = _town(located + [lead], towns) or "Location to be verified"
+        website = infobox["website"].find("a", href=True) if "website" in infobox else None
+        metadata.update(
+            town=town,
+            location=town,
+            direction="N/A",
+            primary_category=_category(infobox, name),
+            secondary_category="General",
+            visit_duration="Visit duration varies",
+            hours="Contact location for current hours",
+            admission="Contact location for current prices",
+            website=website["href"] if website else "No website listed",
+            chatbot_tags=[]
+        )
+
+    return {"id": record_id(kind, name), "text": text, "content": lead, "metadata": metadata}
+
+def _parse_task(task: Tuple[str, str, bytes, str, Tuple[str, ...]]) -> Dict[str, Any]:
+    return parse_page(*task)
+
+def member_names(zip_path: str) -> List[str]:
+    """Page names in an archive, without reading the pages."""
+    with zipfile.ZipFile(zip_path) as archive:
+        return [
+            os.path.splitext(os.path.basename(info.filename))[0]
+            for info in archive.infolist()
+            if not info.is_dir() and info.filename.endswith(".txt")
+        ]
+
+def iter_members(zip_path: str, kind: str) -> Iterator[Tuple[str, str, bytes]]:
+    """Yield ``(kind, name, raw)`` for each page in an archive, one member at a time."""
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith(".txt"):
+                continue
+            name = os.path.splitext(os.path.basename(info.filename))[0]
+            yield kind, name, archive.read(info)
+
+class IngestStats:
+    def __init__(self):
+        self.pages = 0
+        self.bytes = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        seconds = time.perf_counter() - self.started
+        return {
+            "pages": self.pages,
+            "errors": self.errors,
+            "megabytes": round(self.bytes / 1e6, 2),
+            "seconds": round(seconds, 3),
+            "pages_per_second": round(self.pages / seconds, 2) if seconds else 0.0,
+            "megabytes_per_second": round(self.bytes / 1e6 / seconds, 2) if seconds else 0.0
+        }
+
+def ingest(
+    sources: List[Tuple[str, str]],
+    workers: Optional[int] = None,
+    parser: str = DEFAULT_PARSER,
+    stats: Optional[IngestStats] = None,
+    towns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Parse every page of ``(zip_path, kind)`` sources, yielding records as they finish.
+
+    At most ``workers * 4`` pages are in flight, so memory stays bounded no
+    matter how large the archives are. Landmark towns are matched against
+    ``towns``, by default the pages of the municipality sources.
+    """
+    stats = stats or IngestStats()
+    workers = workers or os.cpu_count() or 1
+    if towns is None:
+        towns = [name for zip_path, kind in sources if kind == "municipality" for name in member_names(zip_path)]
+    towns = tuple(towns)
+    members = (member for zip_path, kind in sources for member in iter_members(zip_path, kind))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for kind, name, raw in members:
+            if len(pending) >= workers * 4:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = _collect(future, pending.pop(future), stats)
+                    if record:
+                        yield record
+            pending[pool.submit(_parse_task, (kind, name, raw, parser, towns))] = (name, len(raw))
+        for future in list(pending):
+            record = _collect(future, pending.pop(future), stats)
+            if record:
+                yield record
+
+def _collect(future, member: Tuple[str, int], stats: IngestStats) -> Optional[Dict[str, Any]]:
+    name, size = member
+    try:
+        record = future.result()
+    except Exception as e:
+        print(f"Error parsing {name}: {str(e)}", file=sys.stderr)
+        stats.errors += 1
+        return None
+    stats.pages += 1
+    stats.bytes += size
+    return record
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--landmarks", help="Zip of landmark page dumps")
+    parser.add_argument("--municipalities", help="Zip of municipality page dumps")
+    parser.add_argument("--towns-from", help="Municipality zip used only to find landmark towns")
+    parser.add_argument("--output", help="JSONL file for the records (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--parser", default=DEFAULT_PARSER, choices=["lxml", "html.parser"])
+    args = parser.parse_args()
+
+    sources = []
+    if args.landmarks:
+        sources.append((args.landmarks, "landmark"))
+    if args.municipalities:
+        sources.append((args.municipalities, "municipality"))
+    if not sources:
+        parser.error("pass --landmarks and/or --municipalities")
+
+    towns = member_names(args.towns_from) if args.towns_from else None
+    stats = IngestStats()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for record in ingest(sources, workers=args.workers, parser=args.parser, stats=stats, towns=towns):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(stats.report()), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
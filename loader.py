@@ -0,0 +1,235 @@
+"""Load records into the vector index with encoding and upserts overlapped.
+
+Usage: python -m loader --target pinecone --index-name pr-landmarks
+       [--landmarks landmarks.csv] [--municipalities municipalities.csv]
+       [--records records.jsonl] [--workers 4] [--queue-size 8]
+       [--checkpoint failed_batches.jsonl] [--resume]
+
+Encoding fills a bounded queue while ``workers`` upsert tasks drain it, so
+the CPU keeps encoding while batches are on the wire. A full queue pauses
+encoding. Failed upserts are retried with exponential backoff and batches
+that still fail are appended to a JSONL checkpoint; ``--resume`` loads only
+the records listed there. The manifest from ``reindex.py`` is honoured, so
+unchanged records are skipped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from corpus import load_corpus
+from reindex import (
+    LocalTarget, PineconeTarget, load_manifest, model_version, plan, read_jsonl, record_hash, save_manifest
+)
+
+class LoaderStats:
+    def __init__(self):
+        self.vectors = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.failed_vectors = 0
+        self.retries = 0
+        self.encode_seconds = 0.0
+        self.upsert_seconds = 0.0
+        self.backpressure_waits = 0
+        self.started = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        seconds = time.perf_counter() - self.started
+        return {
+            "vectors": self.vectors,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "failed_vectors": self.failed_vectors,
+            "retries": self.retries,
+            "backpressure_waits": self.backpressure_waits,
+            "encode_seconds": round(self.encode_seconds, 3),
+            "upsert_seconds": round(self.upsert_seconds, 3),
+            "seconds": round(seconds, 3),
+            "vectors_per_second": round(self.vectors / seconds, 2) if seconds else 0.0
+        }
+
+def read_checkpoint(path: str) -> Set[str]:
+    """Record ids of the batches a previous run could not upload."""
+    ids = set()
+    if not path or not os.path.exists(path):
+        return ids
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                ids.update(json.loads(line)["ids"])
+    return ids
+
+async def load(
+    records: List[Dict[str, Any]],
+    embeddings,
+    target,
+    batch_size: int = 64,
+    workers: int = 4,
+    queue_size: int = 8,
+    max_attempts: int = 4,
+    backoff_seconds: float = 0.5,
+    checkpoint_path: Optional[str] = None,
+    on_upserted: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    stats: Optional[LoaderStats] = None
+) -> LoaderStats:
+    """Encode ``records`` in batches and upsert them through ``workers`` concurrent tasks.
+
+    ``target`` is a ``reindex`` target; its blocking ``upsert`` runs in a
+    thread. ``on_upserted`` is called with each batch once it is stored.
+    """
+    stats = stats or LoaderStats()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    checkpoint = open(checkpoint_path, "w", encoding="utf-8") if checkpoint_path else None
+
+    async def produce():
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            encode_start = time.perf_counter()
+            vectors = await embeddings.aembed_documents([r["text"] for r in batch])
+            stats.encode_seconds += time.perf_counter() - encode_start
+            if queue.full():
+                stats.backpressure_waits += 1
+            await queue.put((batch, vectors))
+
+    async def upsert(batch, vectors):
+        for attempt in range(1, max_attempts + 1):
+            upsert_start = time.perf_counter()
+            try:
+                await asyncio.to_thread(target.upsert, batch, vectors)
+                return None
+            except Exception as e:
+                error = str(e)
+                if attempt == max_attempts:
+                    return error
+                stats.retries += 1
+                print(f"Upsert of {len(batch)} vectors failed (attempt {attempt}): {error}", file=sys.stderr)
+                await asyncio.sleep(backoff_seconds * 2 ** (attempt - 1))
+            finally:
+                stats.upsert_seconds += time.perf_counter() - upsert_start
+
+    async def consume():
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                batch, vectors = item
+                error = await upsert(batch, vectors)
+                if error is None:
+                    stats.vectors += len(batch)
+                    stats.batches += 1
+                    if on_upserted:
+                        on_upserted(batch)
+                else:
+                    stats.failed_batches += 1
+                    stats.failed_vectors += len(batch)
+                    print(f"Giving up on batch of {len(batch)} vectors: {error}", file=sys.stderr)
+                    if checkpoint:
+                        checkpoint.write(json.dumps({
+                            "ids": [r["id"] for r in batch], "error": error, "failed_at": time.time()
+                        }) + "\n")
+                        checkpoint.flush()
+            finally:
+                queue.task_done()
+
+    consumers = [asyncio.create_task(consume()) for _ in range(max(1, workers))]
+    try:
+        await produce()
+        for _ in consumers:
+            await queue.put(None)
+        await asyncio.gather(*consumers)
+    finally:
+        for task in consumers:
+            task.cancel()
+        if checkpoint:
+            checkpoint.close()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--landmarks", default=os.getenv("LANDMARKS_CSV"), help="Structured landmarks CSV")
+    parser.add_argument("--municipalities", default=os.getenv("MUNICIPALITIES_CSV"), help="Structured municipalities CSV")
+    parser.add_argument("--records", nargs="*", default=[], help="JSONL records from ingest.py")
+    parser.add_argument("--target", default=os.getenv("VECTOR_STORE", "pinecone"), choices=["local", "pinecone"])
+    parser.add_argument("--index-path", default=os.getenv("LOCAL_INDEX_PATH"), help="Local index path (local target)")
+    parser.add_argument("--index-name", default=os.getenv("PINECONE_INDEX_NAME"), help="Pinecone index (pinecone target)")
+    parser.add_argument("--namespace", default=None)
+    parser.add_argument("--manifest", default=None, help="Default: <index-path>.manifest.json or <index-name>.manifest.json")
+    parser.add_argument("--model", default="intfloat/multilingual-e5-large")
+    parser.add_argument("--backend", default=os.getenv("EMBED_BACKEND", "torch"))
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent upsert tasks")
+    parser.add_argument("--queue-size", type=int, default=8, help="Encoded batches waiting for upload")
+    parser.add_argument("--checkpoint", default="failed_batches.jsonl")
+    parser.add_argument("--resume", action="store_true", help="Only load the records listed in the checkpoint")
+    args = parser.parse_args()
+
+    records = load_corpus(args.landmarks, args.municipalities)
+    for path in args.records:
+        records.extend(read_jsonl(path))
+    if args.resume:
+        failed = read_checkpoint(args.checkpoint)
+        records = [r for r in records if r["id"] in failed]
+        print(f"Resuming {len(records)} records from {args.checkpoint}", file=sys.stderr)
+    if not records:
+        parser.error("no records to load")
+
+    if args.target == "local":
+        if not args.index_path:
+            parser.error("--index-path (or LOCAL_INDEX_PATH) is required for the local target")
+        manifest_path = args.manifest or f"{args.index_path}.manifest.json"
+    else:
+        if not args.index_name:
+            parser.error("--index-name (or PINECONE_INDEX_NAME) is required for the pinecone target")
+        manifest_path = args.manifest or f"{args.index_name}.manifest.json"
+
+    model = model_version(args.model, args.backend)
+    manifest = load_manifest(manifest_path)
+    to_upsert, _ = plan(records, manifest, model)
+    if manifest.get("model") != model:
+        manifest["records"] = {}
+        manifest["model"] = model
+
+    def remember(batch):
+        for record in batch:
+            manifest["records"][record["id"]] = record_hash(record)
+
+    from embeddings import E5Embeddings
+    from vectorstore import LocalVectorStore, csv_hash
+
+    embeddings = E5Embeddings(model_name=args.model, backend=args.backend, cache_size=0)
+    if args.target == "local":
+        if os.path.exists(f"{args.index_path}.npy"):
+            store = LocalVectorStore.load(args.index_path, embeddings)
+        else:
+            store = LocalVectorStore(embeddings)
+        target = LocalTarget(store, args.index_path, csv_hash(args.landmarks, args.municipalities))
+    else:
+        from pinecone import Pinecone
+        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        target = PineconeTarget(pc.Index(args.index_name), namespace=args.namespace)
+
+    try:
+        stats = asyncio.run(load(
+            to_upsert, embeddings, target,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            checkpoint_path=args.checkpoint,
+            on_upserted=remember
+        ))
+    finally:
+        # A local store is only written on close, so the manifest can't be saved before it;
+        # after a failure this still keeps the batches that made it in
+        target.close()
+        save_manifest(manifest_path, manifest)
+    report = stats.report()
+    report["skipped_unchanged"] = len(records) - len(to_upsert)
+    print(json.dumps(report))
+
+if __name__ == "__main__":
+    main()
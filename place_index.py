@@ -0,0 +1,217 @@
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+import metrics
+from search_filters import normalize
+
+PLACE_LOOKUPS = metrics.REGISTRY.register(metrics.Counter(
+    "travelbot_place_lookups_total", "Questions checked against the place-name index by outcome.", ("outcome",)
+))
+
+# Shorter names collide with ordinary words
+MIN_PATTERN_LENGTH = 4
+_PARENTHETICAL = re.compile(r"\s*\([^)]*\)")
+_ARTICLE = re.compile(r"^(?:the|el|la|los|las)\s+")
+
+# Short names visitors use for landmarks, keyed by the normalized Wikipedia
+# title without its parenthetical ("Castillo San Cristóbal (San Juan)");
+# metadata["aliases"] can add more per document. Keys that match no document
+# are reported when the index is built.
+ALIASES: Dict[str, List[str]] = {
+    "castillo san felipe del morro": ["el morro", "morro castle", "fort san felipe del morro", "castillo del morro"],
+    "castillo san cristobal": ["san cristobal fort", "fort san cristobal"],
+    "el yunque national forest": ["el yunque", "el yunque rainforest", "bosque nacional el yunque"],
+    "arecibo observatory": ["observatorio de arecibo", "arecibo telescope"],
+    "rio camuy cave park": ["camuy caves", "cavernas de camuy", "rio camuy caves"],
+    "mosquito bay": ["bioluminescent bay vieques", "bahia mosquito", "vieques bio bay"],
+    "laguna grande": ["fajardo bio bay", "bioluminescent lagoon fajardo"],
+    "la fortaleza": ["palacio de santa catalina", "governor's mansion"],
+    "old san juan": ["viejo san juan"],
+    "museo de arte de ponce": ["ponce art museum", "art museum of ponce"],
+    "parque de bombas": ["ponce firehouse", "old ponce firehouse"],
+    "flamenco beach": ["playa flamenco"],
+    "cueva ventana": ["window cave"],
+    "guanica state forest": ["bosque seco de guanica", "guanica dry forest"],
+    "toro negro state forest": ["bosque estatal de toro negro"],
+    "los morrillos light": ["cabo rojo lighthouse", "faro los morrillos", "faro de cabo rojo"]
+}
+
+# Municipalities named like everyday words or other places ("the weather in Florida")
+# only resolve when the question also mentions Puerto Rico
+COMMON_WORD_NAMES = {"florida", "carolina", "arroyo", "ceiba", "dorado", "salinas", "manati", "moca"}
+_PUERTO_RICO = re.compile(r"\b(?:puerto rico|pr|boricua|isla)\b")
+
+def aliases(name: str) -> List[str]:
+    """Normalized forms a visitor might use for a place name."""
+    names = {normalize(name.replace("_", " "))}
+    # "Hacienda Buena Vista (Ponce)" is also asked about as "Hacienda Buena Vista"
+    names.add(normalize(_PARENTHETICAL.sub("", name.replace("_", " "))))
+    for form in list(names):
+        bare = _ARTICLE.sub("", form)
+        # "La Playa" without its article is just "playa", which any beach question contains
+        if " " in bare:
+            names.add(bare)
+    return sorted(n for n in names if len(n) >= MIN_PATTERN_LENGTH)
+
+class _Automaton:
+    """Aho-Corasick automaton over word-aligned patterns."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._link()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        # Padding with spaces makes every match start and end on a word boundary
+        for char in f" {pattern} ":
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[int]:
+        """Ids of every pattern occurring in ``text`` (already normalized)."""
+        found = []
+        state = 0
+        for char in f" {text} ":
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found.extend(self._out[state])
+        return found
+
+class PlaceIndex:
+    """Resolves questions that name a known landmark or municipality to its document.
+
+    Every normalized name and alias goes into one Aho-Corasick automaton, so a
+    lookup is a single pass over the question regardless of corpus size. The
+    longest matching name wins; a name shared by several places is ambiguous
+    and left to vector search.
+    """
+
+    def __init__(self, documents: Iterable[Document]):
+        self._documents: List[Document] = []
+        owners: Dict[str, List[int]] = {}
+        matched_keys = set()
+        for document in documents:
+            name = (document.metadata or {}).get("name")
+            if not name:
+                continue
+            position = len(self._documents)
+            self._documents.append(document)
+            forms = aliases(name)
+            keys = [form for form in forms if form in ALIASES]
+            matched_keys.update(keys)
+            extra = list((document.metadata or {}).get("aliases") or [])
+            extra += [alias for key in keys for alias in ALIASES[key]]
+            for alias in forms + [a for n in extra for a in aliases(n)]:
+                if position not in owners.setdefault(alias, []):
+                    owners[alias].append(position)
+        self._owners = owners
+        # A key with a typo or a renamed page would otherwise be ignored silently
+        self.unmatched_aliases = sorted(set(ALIASES) - matched_keys)
+        if self.unmatched_aliases and self._documents:
+            print(f"Place aliases matching no document: {', '.join(self.unmatched_aliases)}")
+        self._automaton = _Automaton(owners)
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.resolved = 0
+        self.ambiguous = 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "PlaceIndex":
+        """Build from corpus records (see ``corpus.py``)."""
+        return cls(
+            Document(id=r["id"], page_content=r["content"], metadata=r["metadata"])
+            for r in records
+        )
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def match(self, text: str) -> List[Tuple[str, List[Document]]]:
+        """Every known name in ``text`` with the places it belongs to, longest first."""
+        names = {self._automaton.patterns[i] for i in self._automaton.find(normalize(text))}
+        return [
+            (name, [self._documents[p] for p in self._owners[name]])
+            for name in sorted(names, key=len, reverse=True)
+        ]
+
+    def match_name(self, name: str) -> List[Document]:
+        return [self._documents[p] for p in self._owners.get(name, [])]
+
+    def resolve(self, question: str) -> Optional[Document]:
+        """The one place the question names, or None.
+
+        Names inside a longer match ("Ponce" in "Museo de Arte de Ponce") are
+        ignored, and so is a town named alongside a landmark ("El Morro in
+        San Juan"); anything else naming several places is ambiguous. Town
+        names in ``COMMON_WORD_NAMES`` need "Puerto Rico" in the question.
+        """
+        matches = self.match(question)
+        in_puerto_rico = bool(_PUERTO_RICO.search(normalize(question)))
+        kept: List[str] = []
+        for name, _ in matches:
+            if name in COMMON_WORD_NAMES and not in_puerto_rico:
+                continue
+            if not any(name in longer for longer in kept):
+                kept.append(name)
+        candidates = {id(d): d for name in kept for d in self.match_name(name)}
+        places = list(candidates.values())
+        landmarks = [d for d in places if d.metadata.get("type") != "municipality"]
+        if landmarks:
+            places = landmarks
+
+        outcome = "miss"
+        document = None
+        if len(places) == 1:
+            outcome, document = "resolved", places[0]
+        elif places:
+            outcome = "ambiguous"
+        with self._lock:
+            self.lookups += 1
+            self.resolved += outcome == "resolved"
+            self.ambiguous += outcome == "ambiguous"
+        PLACE_LOOKUPS.inc(outcome=outcome)
+        return document
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups, resolved, ambiguous = self.lookups, self.resolved, self.ambiguous
+        return {
+            "places": len(self._documents),
+            "names": len(self._owners),
+            "lookups": lookups,
+            "resolved": resolved,
+            "ambiguous": ambiguous,
+            "unmatched_aliases": self.unmatched_aliases,
+            "resolution_rate": round(resolved / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,198 @@
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from geo_index import EARTH_RADIUS_KM, coordinates_of
+
+# Island roads wind: straight-line distance times ROAD_FACTOR at AVERAGE_SPEED_KMH
+ROAD_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 40.0
+DEFAULT_VISIT_HOURS = 2.0
+
+_RANGE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-|to|–)\s*(\d+(?:\.\d+)?)\s*(hour|hr|h|minute|min)", re.I)
+_SINGLE = re.compile(r"(\d+(?:\.\d+)?)\s*(hour|hr|h|minute|min)", re.I)
+_CLOCK = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?", re.I)
+
+class Stop(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    visit_hours: float = DEFAULT_VISIT_HOURS
+    opens: Optional[float] = None
+    closes: Optional[float] = None
+
+class Visit(NamedTuple):
+    stop: Stop
+    arrive: float
+    travel_minutes: float
+
+def visit_hours(text: Any) -> float:
+    """Hours to allow for a place from its ``visit_duration`` text ("1-2 hours", "Half day")."""
+    text = str(text or "").lower()
+    if "full day" in text or "all day" in text:
+        return 6.0
+    if "half day" in text or "half-day" in text:
+        return 3.5
+    match = _RANGE.search(text)
+    if match:
+        value = (float(match.group(1)) + float(match.group(2))) / 2
+        unit = match.group(3)
+    else:
+        match = _SINGLE.search(text)
+        if not match:
+            return DEFAULT_VISIT_HOURS
+        value, unit = float(match.group(1)), match.group(2)
+    return value / 60 if unit.lower().startswith("m") else value
+
+def _clock(match) -> float:
+    hour = int(match.group(1)) % 24
+    minute = int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").lower().replace(".", "")
+    if meridiem == "pm" and hour < 12:
+        hour += 12
+    if meridiem == "am" and hour == 12:
+        hour = 0
+    return hour + minute / 60
+
+def opening_hours(text: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Opening and closing hour from ``hours`` text ("9:00 AM - 5:00 PM"), or (None, None)."""
+    text = str(text or "").lower()
+    if "24 hours" in text or "24/7" in text or "always open" in text:
+        return 0.0, 24.0
+    times = list(_CLOCK.finditer(text))
+    times = [m for m in times if m.group(2) or m.group(3)]
+    if len(times) < 2:
+        return None, None
+    opens, closes = _clock(times[0]), _clock(times[1])
+    if closes <= opens:
+        return None, None
+    return opens, closes
+
+def stop_from_metadata(metadata: Dict[str, Any]) -> Optional[Stop]:
+    """A stop from landmark metadata, or None without usable coordinates."""
+    point = coordinates_of(metadata)
+    if point is None:
+        return None
+    opens, closes = opening_hours(metadata.get("hours"))
+    return Stop(
+        name=str(metadata.get("name", "")).replace("_", " "),
+        latitude=point[0],
+        longitude=point[1],
+        visit_hours=visit_hours(metadata.get("visit_duration")),
+        opens=opens,
+        closes=closes
+    )
+
+def travel_hours_matrix(stops: Sequence[Stop]) -> np.ndarray:
+    """Pairwise driving-time estimate in hours, from one vectorized haversine."""
+    lat = np.radians([s.latitude for s in stops])
+    lon = np.radians([s.longitude for s in stops])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    return km * ROAD_FACTOR / AVERAGE_SPEED_KMH
+
+def nearest_neighbour(matrix: np.ndarray, start: int = 0) -> List[int]:
+    n = len(matrix)
+    route = [start]
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    for _ in range(n - 1):
+        distances = np.where(visited, np.inf, matrix[route[-1]])
+        nxt = int(np.argmin(distances))
+        route.append(nxt)
+        visited[nxt] = True
+    return route
+
+def two_opt(matrix: np.ndarray, route: List[int], max_rounds: int = 1000) -> List[int]:
+    """Improve a closed tour with 2-opt, scoring every move of a round in one array op.
+
+    Reversing ``route[i+1:j+1]`` swaps edges (a_i, b_i), (a_j, b_j) for
+    (a_i, a_j), (b_i, b_j); the best improving move is applied each round.
+    """
+    route = np.asarray(route)
+    n = len(route)
+    if n < 4:
+        return route.tolist()
+    upper = np.triu(np.ones((n, n), dtype=bool), k=2)
+    # The first and last edge are adjacent in a closed tour
+    upper[0, n - 1] = False
+    for _ in range(max_rounds):
+        a = route
+        b = np.roll(route, -1)
+        edge = matrix[a, b]
+        delta = matrix[a[:, None], a[None, :]] + matrix[b[:, None], b[None, :]] - edge[:, None] - edge[None, :]
+        delta = np.where(upper, delta, 0.0)
+        i, j = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[i, j] >= -1e-9:
+            break
+        route[i + 1:j + 1] = route[i + 1:j + 1][::-1].copy()
+    return route.tolist()
+
+def order_stops(stops: Sequence[Stop]) -> Tuple[List[int], np.ndarray]:
+    """Shortest open route through every stop, with free start and end.
+
+    A dummy node at zero distance from every stop turns the open path into a
+    closed tour, so the same 2-opt applies; the route starts after the dummy.
+    """
+    n = len(stops)
+    travel = travel_hours_matrix(stops)
+    if n <= 2:
+        return list(range(n)), travel
+    matrix = np.zeros((n + 1, n + 1))
+    matrix[:n, :n] = travel
+    tour = two_opt(matrix, nearest_neighbour(matrix, start=n))
+    dummy = tour.index(n)
+    return tour[dummy + 1:] + tour[:dummy], travel
+
+def split_days(
+    stops: Sequence[Stop],
+    route: List[int],
+    travel: np.ndarray,
+    day_start: float = 9.0,
+    day_end: float = 18.0
+) -> List[List[Visit]]:
+    """Walk the route, starting a new day when the next stop would end after
+    ``day_end`` or after it closes. Arriving before opening waits."""
+    days: List[List[Visit]] = []
+    day: List[Visit] = []
+    clock = day_start
+    previous = None
+    for index in route:
+        stop = stops[index]
+        hop = float(travel[previous, index]) if previous is not None and day else 0.0
+        arrive = clock + hop
+        if stop.opens is not None:
+            arrive = max(arrive, stop.opens)
+        leave = arrive + stop.visit_hours
+        closes = stop.closes if stop.closes is not None else day_end
+        if day and (leave > day_end or leave > closes):
+            days.append(day)
+            day, hop = [], 0.0
+            arrive = day_start if stop.opens is None else max(day_start, stop.opens)
+            leave = arrive + stop.visit_hours
+        day.append(Visit(stop, round(arrive, 2), round(hop * 60, 1)))
+        clock = leave
+        previous = index
+    if day:
+        days.append(day)
+    return days
+
+def plan_days(stops: Sequence[Stop], day_start: float = 9.0, day_end: float = 18.0) -> List[List[Visit]]:
+    """Order the stops into per-day routes."""
+    if not stops:
+        return []
+    route, travel = order_stops(stops)
+    return split_days(stops, route, travel, day_start, day_end)
+
+def route_hours(travel: np.ndarray, route: List[int]) -> float:
+    return float(sum(travel[a, b] for a, b in zip(route, route[1:])))
+
+def format_clock(hour: float) -> str:
+    hours, minutes = int(hour), int(round((hour % 1) * 60))
+    if minutes == 60:
+        hours, minutes = hours + 1, 0
+    suffix = "AM" if hours < 12 else "PM"
+    return f"{(hours - 1) % 12 + 1}:{minutes:02d} {suffix}"
@@ -86,4 +86,37 @@ DATE_VALIDATION_PROMPT = PromptTemplate(
     VALID: December 15, 2024 | High Season | Dry season with less rainfall, average temperatures 75-85°F | Book accommodations early as this is peak tourist season
     INVALID: Unable to determine a specific date from the message | Please provide a clearer date like "December 2024" or "next summer"
     """
-) 
\ No newline at end of file
+) 
+STRUCTURED_ANALYSIS_PROMPT = PromptTemplate(
+    input_variables=["user_input", "current_context", "current_date"],
+    template="""Analyze this user's travel query for Puerto Rico: "{user_input}"
+
+    Today's date: {current_date}
+
+    Current conversation context:
+    {current_context}
+
+    Respond with a single JSON object and nothing else, with exactly these keys:
+    {{"date": null, "intent": "", "search_type": "", "location": "", "specifics": "", "query": ""}}
+
+    - date: the travel month the user gives, as "Month YYYY" in the future (e.g. "December 2026"), or null
+    - intent: one of set_date, qa_about_place, discover_places, add_to_itinerary, show_itinerary, finalize, thanking, other
+    - search_type: specific_place, attractions, restaurants, beaches, museums, churches, activities or any
+    - location: the town or area named, or "any"
+    - specifics: short details such as "type=historical", "cuisine=local" or "selections=1,3" (or "selections=all")
+    - query: a natural language reformulation of the request for search
+
+    Intents:
+    - set_date: the message gives or changes travel dates ("visiting in December", "in 3 months")
+    - qa_about_place: asking for information ("tell me about X", "what is Y")
+    - discover_places: looking for places or expressing interest ("show me beaches", "I love history")
+    - add_to_itinerary: adding suggestions by number or name ("add 1 and 3", "add all of them")
+    - show_itinerary: wants to see their list
+    - finalize: wants to complete their itinerary
+    - thanking: any thanks ("thank you", "gracias")
+
+    Example:
+    Input: "add 1 and 3 to my list"
+    {{"date": null, "intent": "add_to_itinerary", "search_type": "any", "location": "any", "specifics": "selections=1,3", "query": "Add items 1 and 3 from the last suggestions"}}
+    """
+)
@@ -0,0 +1,256 @@
+"""Incrementally re-index landmark and municipality records.
+
+Usage: python -m reindex --target local --index-path data/index
+       [--landmarks landmarks.csv] [--municipalities municipalities.csv]
+       [--records records.jsonl] [--manifest manifest.json] [--dry-run]
+
+A manifest stores the embedding model and a content hash per record id.
+Only new or changed records are embedded and upserted, and records that
+disappeared from the source are deleted; changing the model re-embeds
+everything. Works against a ``LocalVectorStore`` or a Pinecone index.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from corpus import load_corpus
+
+MANIFEST_VERSION = 1
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """Hash of everything that ends up in the index: embedded text, content and metadata (incl. name)."""
+    payload = json.dumps(
+        {"text": record.get("text", ""), "content": record.get("content", ""), "metadata": record.get("metadata", {})},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def model_version(model_name: str, backend: str = "torch") -> str:
+    """Backends produce slightly different vectors, so they count as different models."""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    if not path or not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "model": None, "records": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        print(f"Ignoring manifest {path} with unknown version {manifest.get('version')}", file=sys.stderr)
+        return {"version": MANIFEST_VERSION, "model": None, "records": {}}
+    return manifest
+
+def save_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    """Write atomically so an interrupted run never leaves a truncated manifest."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def plan(records: List[Dict[str, Any]], manifest: Dict[str, Any], model: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Records to upsert and ids to delete to bring the index in line with ``records``."""
+    known = manifest.get("records", {}) if manifest.get("model") == model else {}
+    current = {}
+    to_upsert = []
+    for record in records:
+        digest = record_hash(record)
+        current[record["id"]] = digest
+        if known.get(record["id"]) != digest:
+            to_upsert.append(record)
+    # Ids from a previous model are deleted too, in case the new corpus dropped them
+    previous = manifest.get("records", {})
+    to_delete = sorted(doc_id for doc_id in previous if doc_id not in current)
+    return to_upsert, to_delete
+
+def _pinecone_metadata(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Pinecone only takes strings, numbers, booleans and lists of strings; no nulls."""
+    metadata = {"content": record["content"]}
+    for key, value in record["metadata"].items():
+        if value is None:
+            continue
+        if isinstance(value, (str, bool, int, float)):
+            metadata[key] = value
+        elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+            metadata[key] = value
+        else:
+            metadata[key] = json.dumps(value, ensure_ascii=False)
+    return metadata
+
+class LocalTarget:
+    """A ``LocalVectorStore`` saved at ``path``.
+
+    Writes are serialized since the store is not thread-safe and the loader
+    upserts from several threads. ``source_hash`` (``vectorstore.csv_hash``
+    of the CSVs loaded) is saved with the store so ``from_csv`` reuses it.
+    """
+
+    def __init__(self, store, path: Optional[str] = None, source_hash: Optional[str] = None):
+        self.store = store
+        self.path = path
+        self.source_hash = source_hash
+        self._lock = threading.Lock()
+
+    def upsert(self, records: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
+        with self._lock:
+            self.store.add_vectors(
+                vectors,
+                [r["content"] for r in records],
+                [r["metadata"] for r in records],
+                [r["id"] for r in records]
+            )
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            self.store.delete(ids)
+
+    def close(self) -> None:
+        if self.path:
+            self.store.save(self.path, source_hash=self.source_hash)
+
+class PineconeTarget:
+    """A Pinecone index; the text goes in the ``content`` metadata key as the app expects."""
+
+    def __init__(self, index, namespace: Optional[str] = None):
+        self.index = index
+        self.namespace = namespace
+
+    def upsert(self, records: List[Dict[str, Any]], vectors: List[List[float]]) -> None:
+        self.index.upsert(
+            vectors=[
+                {"id": r["id"], "values": list(vector), "metadata": _pinecone_metadata(r)}
+                for r, vector in zip(records, vectors)
+            ],
+            namespace=self.namespace
+        )
+
+    def delete(self, ids: List[str]) -> None:
+        # Pinecone caps deletes at 1000 ids per request
+        for start in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[start:start + 1000], namespace=self.namespace)
+
+    def close(self) -> None:
+        pass
+
+def reindex(
+    records: List[Dict[str, Any]],
+    embeddings,
+    target,
+    manifest: Dict[str, Any],
+    model: str,
+    batch_size: int = 64,
+    manifest_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """Apply the plan to ``target`` and update ``manifest`` in place.
+
+    The manifest is updated after every successful batch. If a later batch
+    fails, the target is still closed (a local store is only written then)
+    before the manifest is saved, so a rerun picks up where this one stopped;
+    if closing fails too, the previous manifest is left as it was.
+    """
+    started = time.perf_counter()
+    to_upsert, to_delete = plan(records, manifest, model)
+    if manifest.get("model") != model:
+        manifest["records"] = {}
+        manifest["model"] = model
+
+    upserted = 0
+    try:
+        for start in range(0, len(to_upsert), batch_size):
+            batch = to_upsert[start:start + batch_size]
+            vectors = embeddings.embed_documents([r["text"] for r in batch])
+            target.upsert(batch, vectors)
+            for record in batch:
+                manifest["records"][record["id"]] = record_hash(record)
+            upserted += len(batch)
+        if to_delete:
+            target.delete(to_delete)
+            for doc_id in to_delete:
+                manifest["records"].pop(doc_id, None)
+    finally:
+        # The manifest may only list what the target has persisted
+        target.close()
+        if manifest_path:
+            save_manifest(manifest_path, manifest)
+
+    return {
+        "model": model,
+        "records": len(records),
+        "upserted": upserted,
+        "deleted": len(to_delete),
+        "unchanged": len(records) - len(to_upsert),
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+def read_jsonl(path: str) -> Iterable[Dict[str, Any]]:
+    """Records written by ``ingest.py``."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--landmarks", default=os.getenv("LANDMARKS_CSV"), help="Structured landmarks CSV")
+    parser.add_argument("--municipalities", default=os.getenv("MUNICIPALITIES_CSV"), help="Structured municipalities CSV")
+    parser.add_argument("--records", nargs="*", default=[], help="JSONL records from ingest.py")
+    parser.add_argument("--target", default=os.getenv("VECTOR_STORE", "pinecone"), choices=["local", "pinecone"])
+    parser.add_argument("--index-path", default=os.getenv("LOCAL_INDEX_PATH"), help="Local index path (local target)")
+    parser.add_argument("--index-name", default=os.getenv("PINECONE_INDEX_NAME"), help="Pinecone index (pinecone target)")
+    parser.add_argument("--namespace", default=None)
+    parser.add_argument("--manifest", default=None, help="Default: <index-path>.manifest.json or <index-name>.manifest.json")
+    parser.add_argument("--model", default="intfloat/multilingual-e5-large")
+    parser.add_argument("--backend", default=os.getenv("EMBED_BACKEND", "torch"))
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without embedding anything")
+    args = parser.parse_args()
+
+    records = load_corpus(args.landmarks, args.municipalities)
+    for path in args.records:
+        records.extend(read_jsonl(path))
+    if not records:
+        parser.error("no records: pass --landmarks, --municipalities or --records")
+
+    if args.target == "local":
+        if not args.index_path:
+            parser.error("--index-path (or LOCAL_INDEX_PATH) is required for the local target")
+        manifest_path = args.manifest or f"{args.index_path}.manifest.json"
+    else:
+        if not args.index_name:
+            parser.error("--index-name (or PINECONE_INDEX_NAME) is required for the pinecone target")
+        manifest_path = args.manifest or f"{args.index_name}.manifest.json"
+
+    model = model_version(args.model, args.backend)
+    manifest = load_manifest(manifest_path)
+    to_upsert, to_delete = plan(records, manifest, model)
+    print(f"{len(to_upsert)} to upsert, {len(to_delete)} to delete, "
+          f"{len(records) - len(to_upsert)} unchanged", file=sys.stderr)
+    if args.dry_run:
+        return
+
+    from embeddings import E5Embeddings
+    from vectorstore import LocalVectorStore, csv_hash
+
+    embeddings = E5Embeddings(model_name=args.model, backend=args.backend, cache_size=0)
+    if args.target == "local":
+        if os.path.exists(f"{args.index_path}.npy"):
+            store = LocalVectorStore.load(args.index_path, embeddings)
+        else:
+            store = LocalVectorStore(embeddings)
+        target = LocalTarget(store, args.index_path, csv_hash(args.landmarks, args.municipalities))
+    else:
+        from pinecone import Pinecone
+        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        target = PineconeTarget(pc.Index(args.index_name), namespace=args.namespace)
+
+    report = reindex(records, embeddings, target, manifest, model, args.batch_size, manifest_path)
+    print(json.dumps(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from typing import Any, List, NamedTuple, Optional
+
+class SearchResult(NamedTuple):
+    """One search suggestion, as stored in ``last_suggestions``."""
+    name: str
+    type: str
+    town: str
+    coordinates: str
+    content: str
+    # Set by proximity searches: kilometres from the place the search is centred on
+    distance_km: Optional[float] = None
+    distance_from: Optional[str] = None
+
+    @classmethod
+    def from_document(cls, doc: Any, search_type: str, location: str) -> "SearchResult":
+        """Build a result from a LangChain document or a plain dict."""
+        if hasattr(doc, "page_content"):
+            metadata = doc.metadata or {}
+            content = doc.page_content
+        else:
+            metadata = doc
+            content = doc.get("content", doc.get("page_content", ""))
+        return cls(
+            name=metadata.get("name", "Unknown Location").replace("_", " "),
+            type=metadata.get("type", search_type),
+            town=metadata.get("location", location),
+            coordinates=metadata.get("coordinates", "Coordinates not available"),
+            content=content
+        )
+
+_INTRO = """
+        🌟 Based on your interests, here are my suggestions for you:
+        """
+
+_RESULT = """
+                    {number}️⃣ **{name}**
+                    🏷️ {type}
+                    📍 {town}
+                    🌐 {coordinates}
+                    🔗 [View Images]()
+                    💡{content}\n
+            """.format
+
+_OUTRO = """
+        Would you like me to add any of these suggestions to your list📝? 
+        You can say:
+        • "Add all of them"
+        • "Add number 1 and 3"
+        • "Add 1,2 and 4"
+        """
+
+def _town_line(result: SearchResult) -> str:
+    if result.distance_km is None:
+        return result.town
+    return f"{result.town} ({result.distance_km:.1f} km from {result.distance_from})"
+
+def render_search_results(results: List[SearchResult]) -> str:
+    """Render suggestions for the chat window."""
+    parts = [_INTRO]
+    parts.extend(
+        _RESULT(
+            number=i, name=r.name, type=r.type, town=_town_line(r),
+            coordinates=r.coordinates, content=r.content or "No description available"
+        )
+        for i, r in enumerate(results, 1)
+    )
+    parts.append(_OUTRO)
+    return "\n\n".join(parts)
@@ -1,5 +1,6 @@
-from typing import Dict
+from typing import AsyncIterator, Dict, Optional, Tuple
 from handlers import BaseHandler
+import metrics
 
 class IntentRouter:
     """Routes intents to appropriate handlers."""
@@ -8,42 +9,67 @@ class IntentRouter:
         """Initialize with a map of intent types to handlers."""
         self.handlers = handlers
 
+    def _resolve(self, intent: str, context: Dict) -> Tuple[Optional[BaseHandler], Optional[str]]:
+        """Find the handler for an intent, or a message explaining why there is none."""
+        # Map intents to handlers
+        intent_map = {
+            'set_date': 'date',
+            'qa_about_place': 'question',
+            'discover_places': 'search',
+            'search_places': 'search',
+            'add_to_itinerary': 'itinerary',
+            'show_itinerary': 'itinerary',
+            'finalize': 'itinerary',
+            'thanking': 'thankyou'
+        }
+
+        # Get handler type
+        handler_type = intent_map.get(intent)
+
+        if not handler_type:
+            # Check if input might be a date
+            if any(word in context['user_input'].lower() for word in
+                  ['month', 'year', 'summer', 'winter', 'spring', 'fall', 'next',
+                   'january', 'february', 'march', 'april', 'may', 'june', 'july',
+                   'august', 'september', 'october', 'november', 'december']):
+                handler_type = 'date'
+            else:
+                return None, "I'm not sure what you'd like to do. Could you rephrase that?"
+
+        # Get handler
+        handler = self.handlers.get(handler_type)
+        if not handler:
+            return None, "I'm not sure how to handle that request."
+        metrics.set_labels(handler=type(handler).__name__)
+        return handler, None
+
     async def route(self, intent: str, context: Dict) -> str:
         """Route to appropriate handler based on intent."""
         try:
-            # Map intents to handlers
-            intent_map = {
-                'set_date': 'date',
-                'qa_about_place': 'question',
-                'discover_places': 'search',
-                'search_places': 'search',
-                'add_to_itinerary': 'itinerary',
-                'show_itinerary': 'itinerary',
-                'finalize': 'itinerary',
-                'thanking': 'thankyou'
-            }
-            
-            # Get handler type
-            handler_type = intent_map.get(intent)
-            
-            if not handler_type:
-                # Check if input might be a date
-                if any(word in context['user_input'].lower() for word in 
-                      ['month', 'year', 'summer', 'winter', 'spring', 'fall', 'next', 
-                       'january', 'february', 'march', 'april', 'may', 'june', 'july',
-                       'august', 'september', 'october', 'november', 'december']):
-                    handler_type = 'date'
-                else:
-                    return "I'm not sure what you'd like to do. Could you rephrase that?"
-            
-            # Get handler
-            handler = self.handlers.get(handler_type)
+            handler, message = self._resolve(intent, context)
             if not handler:
-                return "I'm not sure how to handle that request."
-            
+                return message
+
             # Execute handler
-            return await handler.handle(context)
-            
+            with metrics.span("handler"):
+                return await handler.handle(context)
+
+        except Exception as e:
+            print(f"Error in router: {str(e)}")
+            return "I encountered an error. Could you rephrase that?"
+
+    async def route_stream(self, intent: str, context: Dict) -> AsyncIterator[str]:
+        """Route to the handler and forward its response chunks as they arrive."""
+        try:
+            handler, message = self._resolve(intent, context)
+            if not handler:
+                yield message
+                return
+
+            with metrics.span("handler"):
+                async for chunk in handler.stream(context):
+                    yield chunk
+
         except Exception as e:
             print(f"Error in router: {str(e)}")
-            return "I encountered an error. Could you rephrase that?" 
\ No newline at end of file
+            yield "I encountered an error. Could you rephrase that?"
\ No newline at end of file
@@ -0,0 +1,163 @@
+import re
+import unicodedata
+from difflib import get_close_matches
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Canonical search types and the words that identify them, both in what the
+# analysis chain extracts ("beaches", "playas") and in the category values
+# the notebooks assigned ("Beach", "Historic Site", "Natural Reserve").
+# Keywords match whole words (plurals included); a trailing * marks a stem.
+CATEGORY_KEYWORDS: Dict[str, tuple] = {
+    "beaches": ("beach", "playa", "balneario"),
+    "museums": ("museum", "museo", "gallery", "galleries", "galeria"),
+    "churches": ("church", "cathedral", "chapel", "iglesia", "catedral", "capilla", "religious", "religios*"),
+    "restaurants": ("restaurant", "dining", "food", "cafe", "restaurante", "comida", "gastronom*"),
+    "historic_sites": ("histor*", "fort", "castle", "castillo", "fortaleza", "colonial", "heritage", "monument", "ruin"),
+    "nature": ("nature", "natural", "forest", "bosque", "reserve", "reserva", "rainforest", "cave", "cueva",
+               "waterfall", "cascada", "hiking", "trail", "sendero", "park", "parque", "lagoon", "laguna"),
+    "nightlife": ("nightlife", "bar", "club", "vida nocturna", "entertainment")
+}
+
+# Regions the analysis chain may return as a location, matched against ``direction``
+REGIONS: Dict[str, tuple] = {
+    "north": ("north", "northern", "norte", "n"),
+    "south": ("south", "southern", "sur", "s"),
+    "east": ("east", "eastern", "este", "oriental", "e"),
+    "west": ("west", "western", "oeste", "w"),
+    "center": ("center", "central", "centre", "centro", "interior", "mountains", "montana")
+}
+
+_ANY = {"", "any", "none", "all", "anywhere", "puerto rico", "pr", "island", "the island"}
+_NOISE = re.compile(r"\b(?:puerto rico|pr|municipality of|municipio de|town of|pueblo de|the|el|la|coast|side|area|region|costa|zona)\b")
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+
+def normalize(text: Any) -> str:
+    """Lowercase, strip accents and punctuation."""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text)).strip()
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(keywords: tuple) -> "re.Pattern":
+    parts = [
+        re.escape(keyword[:-1]) + r"\w*" if keyword.endswith("*") else re.escape(keyword) + "(?:s|es)?"
+        for keyword in keywords
+    ]
+    return re.compile(rf"\b(?:{'|'.join(parts)})\b")
+
+def has_keyword(text: str, keywords: tuple) -> bool:
+    """Whether normalized ``text`` contains one of ``keywords`` as a word ("parking" is not "park")."""
+    return _keyword_pattern(keywords).search(text) is not None
+
+class SearchFilters:
+    """Maps extracted search slots to Pinecone-style metadata filters.
+
+    The vocabulary is built from the category, town and direction values that
+    actually occur in the index, so filters only ever name existing values and
+    an unrecognized slot simply isn't filtered on.
+    """
+
+    def __init__(
+        self,
+        primary_categories: Iterable[str] = (),
+        secondary_categories: Iterable[str] = (),
+        towns: Iterable[str] = (),
+        directions: Iterable[str] = ()
+    ):
+        self.categories: Dict[str, Dict[str, List[str]]] = {}
+        for canonical, keywords in CATEGORY_KEYWORDS.items():
+            self.categories[canonical] = {
+                "primary_category": sorted(v for v in set(primary_categories) if has_keyword(normalize(v), keywords)),
+                "secondary_category": sorted(v for v in set(secondary_categories) if has_keyword(normalize(v), keywords))
+            }
+
+        # Normalized town -> the raw values stored for it ("Old San Juan" files under "san juan" too)
+        self.towns: Dict[str, Set[str]] = {}
+        for town in set(towns):
+            key = normalize(town)
+            if key and key not in ("location to be verified", "unknown"):
+                self.towns.setdefault(key, set()).add(town)
+
+        self.regions: Dict[str, List[str]] = {
+            region: sorted(v for v in set(directions) if normalize(v) in aliases)
+            for region, aliases in REGIONS.items()
+        }
+
+    @classmethod
+    def from_metadatas(cls, metadatas: Iterable[Dict[str, Any]]) -> "SearchFilters":
+        primary, secondary, towns, directions = set(), set(), set(), set()
+        for metadata in metadatas:
+            for key, values in (("primary_category", primary), ("secondary_category", secondary),
+                                ("town", towns), ("direction", directions)):
+                value = metadata.get(key)
+                if isinstance(value, str) and value:
+                    values.add(value)
+        return cls(primary, secondary, towns, directions)
+
+    def category(self, search_type: str) -> Optional[str]:
+        """Canonical category for a search type, or None for generic ones like 'attractions'."""
+        text = normalize(search_type).replace("_", " ")
+        if text in _ANY:
+            return None
+        for canonical, keywords in CATEGORY_KEYWORDS.items():
+            if text == canonical.replace("_", " ") or has_keyword(text, keywords):
+                return canonical
+        return None
+
+    def category_filter(self, search_type: str) -> Optional[Dict[str, Any]]:
+        canonical = self.category(search_type)
+        if canonical is None:
+            return None
+        clauses = [
+            {key: {"$in": values}}
+            for key, values in self.categories[canonical].items()
+            if values
+        ]
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def town_values(self, location: str) -> List[str]:
+        """Stored town values matching a location, allowing accents and small typos."""
+        text = _SPACES.sub(" ", _NOISE.sub(" ", normalize(location))).strip()
+        if text in _ANY:
+            return []
+        values = set()
+        for key, raw in self.towns.items():
+            # "san juan" also matches towns stored as "Old San Juan"
+            if re.search(rf"\b{re.escape(text)}\b", key):
+                values.update(raw)
+        if values:
+            return sorted(values)
+        close = get_close_matches(text, list(self.towns), n=1, cutoff=0.85)
+        return sorted(self.towns[close[0]]) if close else []
+
+    def location_filter(self, location: str) -> Optional[Dict[str, Any]]:
+        towns = self.town_values(location)
+        if towns:
+            return {"town": {"$in": towns}}
+        text = _NOISE.sub(" ", normalize(location)).split()
+        for region, aliases in REGIONS.items():
+            # Single letters only identify stored direction values, not free text
+            if self.regions[region] and any(word in aliases and len(word) > 1 for word in text):
+                return {"direction": {"$in": self.regions[region]}}
+        return None
+
+    def build(self, search_type: str, location: str) -> Optional[Dict[str, Any]]:
+        """Filter for a search, or None when neither slot maps to known values."""
+        clauses = [c for c in (self.category_filter(search_type), self.location_filter(location)) if c]
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "categories": {
+                name: sum(len(values) for values in columns.values())
+                for name, columns in self.categories.items()
+            },
+            "towns": len(self.towns),
+            "regions": {name: len(values) for name, values in self.regions.items()}
+        }
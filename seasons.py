@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Any, Dict
+
+# Month -> travel season for Puerto Rico, mirroring the guidance that used to
+# live only in DATE_VALIDATION_PROMPT (High: mid-Dec to mid-Apr, Shoulder:
+# Apr-Jun, Low: Jul-Nov). Hurricane season runs June 1 - November 30 and
+# peaks August - October.
+MONTH_SEASONS: Dict[int, Dict[str, Any]] = {
+    1: {
+        "season": "High Season",
+        "weather": "Dry season with less rainfall, average temperatures 75-85°F",
+        "tips": "Peak tourist season: book accommodations and popular tours early. Great time for beaches and outdoor exploration.",
+        "hurricane_season": False,
+        "hurricane_peak": False
+    },
+    2: {
+        "season": "High Season",
+        "weather": "Driest month of the year, average temperatures 75-85°F",
+        "tips": "Expect crowds around Carnaval and Presidents' Day; reserve rental cars and restaurants ahead of time.",
+        "hurricane_season": False,
+        "hurricane_peak": False
+    },
+    3: {
+        "season": "High Season",
+        "weather": "Dry and sunny, average temperatures 75-85°F",
+        "tips": "Spring break brings higher prices; whale watching off the west coast (Rincón) is at its best.",
+        "hurricane_season": False,
+        "hurricane_peak": False
+    },
+    4: {
+        "season": "Shoulder Season",
+        "weather": "Mostly dry with increasing humidity, average temperatures 78-88°F",
+        "tips": "High season ends mid-April and prices start to drop. Holy Week can be busy with local travelers.",
+        "hurricane_season": False,
+        "hurricane_peak": False
+    },
+    5: {
+        "season": "Shoulder Season",
+        "weather": "Increasing humidity and the first rainy spells, average temperatures 80-90°F",
+        "tips": "Better prices on accommodations and fewer crowds. Good for rainforest visits and water activities.",
+        "hurricane_season": False,
+        "hurricane_peak": False
+    },
+    6: {
+        "season": "Shoulder Season",
+        "weather": "Warm and humid with afternoon showers, average temperatures 80-90°F",
+        "tips": "Hurricane season officially starts June 1; consider travel insurance. Plan outdoor activities for the morning.",
+        "hurricane_season": True,
+        "hurricane_peak": False
+    },
+    7: {
+        "season": "Low Season",
+        "weather": "Hot and humid with frequent afternoon showers, average temperatures 85-95°F",
+        "tips": "Summer vacation draws local families to the beaches. Stay hydrated, use sun protection and monitor forecasts.",
+        "hurricane_season": True,
+        "hurricane_peak": False
+    },
+    8: {
+        "season": "Low Season",
+        "weather": "Hottest and wettest stretch, average temperatures 85-95°F",
+        "tips": "Peak hurricane season: monitor the National Hurricane Center, book flexible reservations and keep indoor alternatives in mind.",
+        "hurricane_season": True,
+        "hurricane_peak": True
+    },
+    9: {
+        "season": "Low Season",
+        "weather": "Hot and rainy with the highest storm risk, average temperatures 85-95°F",
+        "tips": "Peak hurricane season: best prices and fewest tourists, but buy travel insurance and stay flexible.",
+        "hurricane_season": True,
+        "hurricane_peak": True
+    },
+    10: {
+        "season": "Low Season",
+        "weather": "Warm with frequent showers, average temperatures 80-90°F",
+        "tips": "Still peak hurricane season: watch forecasts, check river levels before water activities and favor flexible bookings.",
+        "hurricane_season": True,
+        "hurricane_peak": True
+    },
+    11: {
+        "season": "Low Season",
+        "weather": "Rain tapering off, average temperatures 78-88°F",
+        "tips": "Hurricane season ends November 30. Good value before the holidays; Thanksgiving week gets busy.",
+        "hurricane_season": True,
+        "hurricane_peak": False
+    },
+    12: {
+        "season": "High Season",
+        "weather": "Dry season begins, average temperatures 75-85°F",
+        "tips": "High season starts mid-December and the holidays run through the San Sebastián Street Festival in January; book early.",
+        "hurricane_season": False,
+        "hurricane_peak": False
+    }
+}
+
+def season_for(date: datetime) -> Dict[str, Any]:
+    """Season, weather and tips for the month of a travel date."""
+    return dict(MONTH_SEASONS[date.month])
@@ -0,0 +1,195 @@
+import asyncio
+import sys
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+class Session:
+    """A single conversation bound to one WebSocket connection."""
+
+    __slots__ = ("session_id", "bot", "on_evict", "created_at", "last_seen", "memory_bytes", "turns")
+
+    def __init__(self, session_id: str, bot, on_evict: Optional[Callable[[str], None]] = None):
+        now = time.monotonic()
+        self.session_id = session_id
+        self.bot = bot
+        self.on_evict = on_evict
+        self.created_at = now
+        self.last_seen = now
+        self.memory_bytes = 0
+        self.turns = 0
+
+def _deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate the memory held by a conversation state object."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(
+            _deep_sizeof(getattr(obj, slot), seen)
+            for slot in obj.__slots__ if hasattr(obj, slot)
+        )
+    return size
+
+def session_memory(bot) -> int:
+    """Estimate the per-session memory of a bot (state, history and summary)."""
+    state_manager = bot.state_manager
+    return (
+        _deep_sizeof(state_manager.state)
+        + _deep_sizeof(state_manager.conversation_history)
+        + _deep_sizeof(state_manager.evicted)
+        + sys.getsizeof(state_manager.summary)
+    )
+
+class SessionRegistry:
+    """Per-connection conversation state with LRU/TTL eviction and a memory cap.
+
+    Heavy objects (LLM client, retriever, chains) live in the factory closure and
+    are shared; each session only owns its StateManager and lightweight handlers.
+    Evicted sessions are never rebuilt behind the connection's back: the
+    session's ``on_evict`` callback is told so it can close the connection,
+    and ``get`` returns None from then on.
+    """
+
+    def __init__(
+        self,
+        bot_factory: Callable[[], Any],
+        max_sessions: int = 5000,
+        ttl_seconds: float = 1800,
+        max_memory_bytes: Optional[int] = None
+    ):
+        self.bot_factory = bot_factory
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.total_memory_bytes = 0
+        self.created = 0
+        self.evicted = {"lru": 0, "ttl": 0, "memory": 0}
+
+    @staticmethod
+    def new_session_id() -> str:
+        """Generate an opaque session identifier."""
+        return uuid.uuid4().hex
+
+    def open(self, session_id: str, on_evict: Optional[Callable[[str], None]] = None):
+        """Create the bot for a new session; ``on_evict`` is called if the registry drops it."""
+        session = Session(session_id, self.bot_factory(), on_evict)
+        session.memory_bytes = session_memory(session.bot)
+        self.total_memory_bytes += session.memory_bytes
+        self.sessions[session_id] = session
+        self.created += 1
+        self._enforce_limits(keep=session_id)
+        return session.bot
+
+    def get(self, session_id: str):
+        """Return the bot for a session, or None once it has been closed or evicted."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        self.sessions.move_to_end(session_id)
+        session.last_seen = time.monotonic()
+        return session.bot
+
+    def touch(self, session_id: str) -> None:
+        """Record a completed turn and refresh the session's memory estimate."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        size = session_memory(session.bot)
+        self.total_memory_bytes += size - session.memory_bytes
+        session.memory_bytes = size
+        session.turns += 1
+        session.last_seen = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        self._enforce_limits(keep=session_id)
+
+    def close(self, session_id: str) -> None:
+        """Drop a session explicitly (e.g. on disconnect)."""
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self.total_memory_bytes -= session.memory_bytes
+
+    def _evict(self, session_id: str, reason: str) -> None:
+        session = self.sessions.get(session_id)
+        self.close(session_id)
+        self.evicted[reason] += 1
+        if session is not None and session.on_evict is not None:
+            try:
+                session.on_evict(reason)
+            except Exception as e:
+                print(f"Error notifying evicted session: {str(e)}")
+
+    def evict_expired(self) -> int:
+        """Evict sessions idle for longer than the TTL."""
+        if not self.ttl_seconds:
+            return 0
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [sid for sid, s in self.sessions.items() if s.last_seen < cutoff]
+        for sid in expired:
+            self._evict(sid, "ttl")
+        return len(expired)
+
+    async def run_sweeper(self, interval_seconds: float = 60) -> None:
+        """Periodically evict idle sessions."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.evict_expired()
+            except Exception as e:
+                print(f"Error in session sweeper: {str(e)}")
+
+    def _enforce_limits(self, keep: Optional[str] = None) -> None:
+        """Evict least recently used sessions until count and memory fit."""
+        while len(self.sessions) > self.max_sessions:
+            if not self._evict_oldest(keep, "lru"):
+                break
+
+        if self.max_memory_bytes:
+            while self.total_memory_bytes > self.max_memory_bytes:
+                if not self._evict_oldest(keep, "memory"):
+                    break
+
+    def _evict_oldest(self, keep: Optional[str], reason: str) -> bool:
+        for sid in self.sessions:
+            if sid != keep:
+                self._evict(sid, reason)
+                return True
+        return False
+
+    def stats(self, include_sessions: bool = False) -> Dict[str, Any]:
+        """Report active sessions and memory usage for capacity planning."""
+        count = len(self.sessions)
+        stats = {
+            "active_sessions": count,
+            "total_memory_bytes": self.total_memory_bytes,
+            "avg_session_memory_bytes": self.total_memory_bytes // count if count else 0,
+            "max_sessions": self.max_sessions,
+            "max_memory_bytes": self.max_memory_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "sessions_created": self.created,
+            "sessions_evicted": dict(self.evicted)
+        }
+        if include_sessions:
+            now = time.monotonic()
+            stats["sessions"] = [
+                {
+                    "memory_bytes": s.memory_bytes,
+                    "turns": s.turns,
+                    "idle_seconds": round(now - s.last_seen, 1),
+                    "age_seconds": round(now - s.created_at, 1)
+                }
+                for s in self.sessions.values()
+            ]
+        return stats
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class Warmup:
+    """Builds the heavy components in the background and gates traffic until ready.
+
+    ``run`` awaits a build coroutine that times its steps with ``phase``;
+    ``ready`` is set once it finishes without error.
+    """
+
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self._done = asyncio.Event()
+        self.phases: Dict[str, float] = {}
+        self.current_phase: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time one startup phase."""
+        self.current_phase = name
+        start = time.perf_counter()
+        yield
+        self.phases[name] = round(time.perf_counter() - start, 3)
+        self.current_phase = None
+
+    async def run(self, build: Callable[["Warmup"], Awaitable[Any]]) -> None:
+        """Run the build and report phase timings."""
+        try:
+            await build(self)
+            self.finished = time.perf_counter()
+            self.ready.set()
+            timings = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.phases.items())
+            print(f"Startup complete in {self.finished - self.started:.2f}s ({timings})")
+        except Exception as e:
+            self.error = f"{self.current_phase or 'startup'}: {str(e)}"
+            print(f"Error during startup: {self.error}")
+        finally:
+            # Wake queued connections whether or not startup succeeded
+            self._done.set()
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until ready; False if the timeout expires or startup failed."""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.ready.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "ready": self.ready.is_set(),
+            "phase": self.current_phase,
+            "error": self.error,
+            "elapsed_seconds": round(elapsed, 3),
+            "phases": dict(self.phases)
+        }
@@ -1,9 +1,13 @@
-from typing import Dict, Any, Optional
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+# Recent turns kept verbatim; older ones are folded into ``summary``
+MAX_TURNS = 8
 
 class StateManager:
     """Manages conversation state and context."""
     
-    def __init__(self):
+    def __init__(self, max_turns: int = MAX_TURNS):
         self.state = {
             "travel_dates": None,
             "season_info": {},
@@ -14,7 +18,11 @@ class StateManager:
             "current_topic": None,
             "last_suggestions": []
         }
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=max(0, max_turns))
+        # Turns pushed out of the ring buffer, waiting to be summarized
+        self.evicted: List[Dict[str, str]] = []
+        self.summary = ""
+        self.summarizing = False
     
     def update_state(self, key: str, value: Any) -> None:
         """Update a state value."""
@@ -26,10 +34,19 @@ class StateManager:
     
     def add_to_conversation(self, user_input: str, bot_response: str) -> None:
         """Add an exchange to conversation history."""
-        self.conversation_history.append({
-            "user": user_input,
-            "bot": bot_response
-        })
+        turn = {"user": user_input, "bot": bot_response}
+        if not self.conversation_history.maxlen:
+            # No verbatim turns kept: every turn goes straight to the summary
+            self.evicted.append(turn)
+            return
+        if len(self.conversation_history) == self.conversation_history.maxlen:
+            self.evicted.append(self.conversation_history[0])
+        self.conversation_history.append(turn)
+    
+    def take_evicted(self) -> List[Dict[str, str]]:
+        """Hand over the evicted turns for summarizing."""
+        turns, self.evicted = self.evicted, []
+        return turns
     
     def get_context(self) -> Dict[str, Any]:
         """Get current context for LLM."""
@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import WebSocket
+
+import metrics
+
+TTFT_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "travelbot_stream_ttft_seconds", "Time to first streamed chunk of a turn.", ("intent", "handler")
+))
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        f"p{p}": round(ordered[min(last, int(round(p / 100 * last)))], 2)
+        for p in (50, 95, 99)
+    }
+
+class StreamStats:
+    """Time to first token and total latency for the most recent streamed turns."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._ttft_ms = deque(maxlen=window)
+        self._total_ms = deque(maxlen=window)
+        self.turns = 0
+
+    def record(self, ttft_ms: float, total_ms: float):
+        with self._lock:
+            self.turns += 1
+            self._ttft_ms.append(ttft_ms)
+            self._total_ms.append(total_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ttft, total = list(self._ttft_ms), list(self._total_ms)
+            turns = self.turns
+        return {
+            "turns": turns,
+            "window": len(ttft),
+            "ttft_ms": _percentiles(ttft),
+            "total_ms": _percentiles(total)
+        }
+
+async def send_stream(websocket: WebSocket, chunks: AsyncIterator[str], stats: StreamStats):
+    """Send one response as start/chunk/end JSON frames.
+
+    The end frame carries the turn's time to first token and total latency,
+    measured from the moment the turn started streaming.
+    """
+    started = time.perf_counter()
+    ttft_ms = None
+    await websocket.send_text(json.dumps({"type": "start"}))
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if ttft_ms is None:
+            ttft_ms = (time.perf_counter() - started) * 1000
+        with metrics.span("send"):
+            await websocket.send_text(json.dumps({"type": "chunk", "data": chunk}))
+    total_ms = (time.perf_counter() - started) * 1000
+    if ttft_ms is None:
+        ttft_ms = total_ms
+    stats.record(ttft_ms, total_ms)
+    TTFT_SECONDS.observe(ttft_ms / 1000, **metrics.current_labels())
+    await websocket.send_text(json.dumps({
+        "type": "end",
+        "ttft_ms": round(ttft_ms, 2),
+        "total_ms": round(total_ms, 2)
+    }))
@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from corpus import load_corpus
+
+def _compare(value: Any, condition: Any) -> bool:
+    """Evaluate one Pinecone-style metadata condition."""
+    if not isinstance(condition, dict):
+        return value == condition
+    for op, target in condition.items():
+        if op == "$eq" and not value == target:
+            return False
+        if op == "$ne" and not value != target:
+            return False
+        if op == "$in" and value not in target:
+            return False
+        if op == "$nin" and value in target:
+            return False
+        try:
+            if op == "$gt" and not value > target:
+                return False
+            if op == "$gte" and not value >= target:
+                return False
+            if op == "$lt" and not value < target:
+                return False
+            if op == "$lte" and not value <= target:
+                return False
+        except TypeError:
+            return False
+    return True
+
+def matches_filter(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """Check metadata against a Pinecone-style filter ($eq, $in, $and, $or, ...)."""
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, sub) for sub in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if isinstance(value, list) and not isinstance(condition, dict):
+                if condition not in value:
+                    return False
+            elif not _compare(value, condition):
+                return False
+    return True
+
+def csv_hash(*paths: Optional[str]) -> Optional[str]:
+    """Hash of the source CSVs' contents, in argument order; None when no CSV is given."""
+    if not any(paths):
+        return None
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(b"\0")
+        if path:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store over a contiguous float32 matrix.
+
+    Rows are L2-normalized so cosine similarity is a single matrix-vector
+    product. Metadata filters use the same syntax as Pinecone, and an optional
+    IVF index (k-means coarse quantizer) restricts unfiltered scoring to the
+    ``nprobe`` closest clusters for larger corpora.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        index_type: str = "flat",
+        nlist: int = 32,
+        nprobe: int = 4,
+        mask_cache_size: int = 256
+    ):
+        self._embedding = embedding
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+
+        self._mask_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._mask_cache_size = mask_cache_size
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    @property
+    def metadatas(self) -> List[Dict[str, Any]]:
+        """Metadata of every row, in insertion order (read-only)."""
+        return list(self._metadatas)
+
+    def add_vectors(
+        self,
+        vectors: Iterable[List[float]],
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Insert or replace rows with precomputed vectors."""
+        matrix = np.asarray(list(vectors), dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(texts):
+            raise ValueError("vectors and texts must have the same length")
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [f"doc_{len(self._ids) + i}" for i in range(len(texts))]
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+
+        if self._matrix.size == 0:
+            self._matrix = np.empty((0, matrix.shape[1]), dtype=np.float32)
+
+        existing = len(self._matrix)
+        new_rows = []
+        for row, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+            position = self._positions.get(doc_id)
+            if position is None:
+                self._positions[doc_id] = len(self._ids)
+                new_rows.append(row)
+                self._ids.append(doc_id)
+                self._texts.append(text)
+                self._metadatas.append(dict(metadata))
+                continue
+            if position < existing:
+                self._matrix[position] = matrix[row]
+            else:
+                # Repeated id within this call: last one wins
+                new_rows[position - existing] = row
+            self._texts[position] = text
+            self._metadatas[position] = dict(metadata)
+
+        if new_rows:
+            self._matrix = np.ascontiguousarray(np.vstack([self._matrix, matrix[new_rows]]))
+        self._invalidate()
+        return list(ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        texts = list(texts)
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas, ids)
+
+    def add_records(self, records: List[Dict[str, Any]], batch_size: int = 64) -> List[str]:
+        """Embed corpus records (see ``corpus.py``) and add them."""
+        ids = []
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            vectors = self._embedding.embed_documents([r["text"] for r in batch])
+            ids.extend(self.add_vectors(
+                vectors,
+                [r["content"] for r in batch],
+                [r["metadata"] for r in batch],
+                [r["id"] for r in batch]
+            ))
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        drop = {self._positions[i] for i in ids if i in self._positions}
+        if not drop:
+            return False
+        keep = [p for p in range(len(self._ids)) if p not in drop]
+        self._matrix = np.ascontiguousarray(self._matrix[keep])
+        self._ids = [self._ids[p] for p in keep]
+        self._texts = [self._texts[p] for p in keep]
+        self._metadatas = [self._metadatas[p] for p in keep]
+        self._positions = {doc_id: p for p, doc_id in enumerate(self._ids)}
+        self._invalidate()
+        return True
+
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        return [self._document(self._positions[i]) for i in ids if i in self._positions]
+
+    def _invalidate(self) -> None:
+        self._mask_cache.clear()
+        self._centroids = None
+        self._lists = []
+
+    def _filter_mask(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filter:
+            return None
+        key = json.dumps(filter, sort_keys=True, default=str)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (matches_filter(m, filter) for m in self._metadatas),
+                dtype=bool, count=len(self._metadatas)
+            )
+            self._mask_cache[key] = mask
+            if len(self._mask_cache) > self._mask_cache_size:
+                self._mask_cache.popitem(last=False)
+        else:
+            self._mask_cache.move_to_end(key)
+        return mask
+
+    def _build_ivf(self, iterations: int = 10) -> None:
+        """Cluster rows with a few rounds of spherical k-means."""
+        n = len(self._ids)
+        nlist = max(1, min(self.nlist, n))
+        rng = np.random.default_rng(0)
+        centroids = self._matrix[rng.choice(n, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(self._matrix @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = self._matrix[assign == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+        assign = np.argmax(self._matrix @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [np.flatnonzero(assign == c) for c in range(nlist)]
+
+    def _candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        """Row indices to score, or None for an exhaustive scan."""
+        if self.index_type != "ivf" or len(self._ids) <= self.nlist:
+            return None
+        if self._centroids is None:
+            self._build_ivf()
+        nprobe = min(self.nprobe, len(self._lists))
+        closest = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self._lists[c] for c in closest])
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        if not self._ids:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        mask = self._filter_mask(filter)
+        # Probed clusters may hold none of the matching rows, so filtered searches scan every match
+        rows = self._candidates(query) if mask is None else None
+        if rows is None:
+            scores = self._matrix @ query
+            rows = np.arange(len(self._ids))
+            if mask is not None:
+                rows = rows[mask]
+                scores = scores[mask]
+        else:
+            scores = self._matrix[rows] @ query
+
+        if len(rows) == 0:
+            return []
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._document(int(rows[i])), float(scores[i])) for i in top]
+
+    def _document(self, position: int) -> Document:
+        return Document(
+            id=self._ids[position],
+            page_content=self._texts[position],
+            metadata=dict(self._metadatas[position])
+        )
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    async def asimilarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        # Only the embedding leaves the event loop; scoring takes microseconds
+        embedding = await self._embedding.aembed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in await self.asimilarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are already cosine similarities
+        return lambda score: score
+
+    def save(self, path: str, source_hash: Optional[str] = None) -> None:
+        """Save vectors and metadata to ``<path>.npy`` and ``<path>.json``.
+
+        ``source_hash`` identifies the CSVs the rows came from (see ``from_csv``)
+        and goes to ``<path>.source``; without one, a stale ``<path>.source``
+        is removed so the index is never taken for a build of older CSVs.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.save(f"{path}.npy", self._matrix)
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump({"ids": self._ids, "texts": self._texts, "metadatas": self._metadatas}, f, ensure_ascii=False)
+        if source_hash:
+            with open(f"{path}.source", "w", encoding="utf-8") as f:
+                f.write(source_hash)
+        elif os.path.exists(f"{path}.source"):
+            os.remove(f"{path}.source")
+
+    @classmethod
+    def load(cls, path: str, embedding: Embeddings, **kwargs: Any) -> "LocalVectorStore":
+        """Load a store written by ``save``; no re-embedding needed."""
+        store = cls(embedding, **kwargs)
+        with open(f"{path}.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        store._matrix = np.ascontiguousarray(np.load(f"{path}.npy"), dtype=np.float32)
+        store._ids = data["ids"]
+        store._texts = data["texts"]
+        store._metadatas = data["metadatas"]
+        store._positions = {doc_id: p for p, doc_id in enumerate(store._ids)}
+        return store
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> "LocalVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    @classmethod
+    def from_csv(
+        cls,
+        embedding: Embeddings,
+        landmarks_csv: Optional[str] = None,
+        municipalities_csv: Optional[str] = None,
+        index_path: Optional[str] = None,
+        **kwargs: Any
+    ) -> "LocalVectorStore":
+        """Build from the notebooks' structured CSVs, reusing a saved index built from the same files.
+
+        The CSVs' hash is kept in ``<index_path>.source`` (also written by
+        ``reindex.py`` and ``loader.py``); when it is missing or no longer
+        matches, the index is rebuilt.
+        """
+        digest = csv_hash(landmarks_csv, municipalities_csv)
+        if index_path and os.path.exists(f"{index_path}.npy"):
+            saved = None
+            if os.path.exists(f"{index_path}.source"):
+                with open(f"{index_path}.source", "r", encoding="utf-8") as f:
+                    saved = f.read().strip()
+            if saved == digest:
+                return cls.load(index_path, embedding, **kwargs)
+            print(f"Rebuilding {index_path}: source CSVs changed since it was saved")
+        store = cls(embedding, **kwargs)
+        store.add_records(load_corpus(landmarks_csv, municipalities_csv))
+        if index_path:
+            store.save(index_path, source_hash=digest)
+        return store